@@ -1,11 +1,37 @@
 from __future__ import annotations
+import os
+import threading
+import time
+import uuid
+_T_IMPORTS = time.perf_counter()
+import numpy as np
 import streamlit as st
 from datetime import datetime
 
-from common import DocMeta, build_report_payload
-from report_kr import make_pdf_kr
-from report_en import make_pdf_en
-from whitepaper import make_whitepaper_12p
+import spans
+import startup
+from common import DocMeta, build_report_payload, parse_report_period
+from reports import report_filename, report_key, warm_up_renderers
+from render_cache import get_render_cache
+from render_jobs import STATUS_KR, get_job_queue
+from bundle import BUNDLE_FILENAME, BundleExport, bundle_key
+from archive import get_archive, revision_rows
+from prefetch import get_prefetcher, prefetch_enabled
+from risk_engine import CHANNELS, score_zones, facility_risk_history
+from demo_data import DEMO_SCENARIOS, load_latest_metrics
+from rules import fill_rules, get_rule_engine
+from window_agg import WindowedAggregator
+from shock_detector import ShockDetector
+from attribution import fill_causes
+# 보고서 렌더링 모듈(reportlab/matplotlib)은 reports 에서 처음 필요할 때 로드된다
+startup.record("app imports (streamlit/numpy/common)", time.perf_counter() - _T_IMPORTS)
+
+# 센서 이력 저장소 경로(설정 시 7일 추세를 실제 이력으로 표시)
+TS_STORE_DIR = os.environ.get("BIOOS_TS_STORE")
+# 센서 DB(설정 시 데모 시나리오 대신 DB 최신값 사용). 예: sqlite:///data/seed_m1.db
+SENSOR_DB_URL = os.environ.get("BIOOS_SENSOR_DB")
+# 메트릭 캐시 유지 시간(초) = 센서 갱신 주기. 이 시간 안의 재실행은 DB/저장소를 다시 읽지 않는다
+METRICS_TTL_SEC = float(os.environ.get("BIOOS_METRICS_TTL", "30"))
 
 # -----------------------------
 # UI 기본 설정
@@ -29,40 +55,83 @@ body {font-family: sans-serif;}
 st.markdown(CSS, unsafe_allow_html=True)
 
 # -----------------------------
-# 데모 데이터 (Seed-M1 실제 DB 연동 전)
+# 메트릭 소스(데모 / 센서 이력 / 센서 DB)
 # -----------------------------
-def load_latest_metrics(scenario: str = "일반") -> dict:
-    # 기본값(일반)
-    loop_a = dict(risk=52, shock_24h=1, exposure_7d=0.18, util=0.74, do=7.1, temp=16.7, ph=7.82, sal=31.1)
-    loop_b = dict(risk=44, shock_24h=0, exposure_7d=0.12, util=0.61, do=7.4, temp=16.6, ph=7.88, sal=31.0)
-
-    if scenario == "산소량 급락":
-        loop_a.update(dict(risk=82, shock_24h=9, exposure_7d=0.48, util=0.92, do=5.3, temp=16.8, ph=7.68, sal=31.2))
-        loop_b.update(dict(risk=34, shock_24h=0, exposure_7d=0.05, util=0.38, do=7.7, temp=16.6, ph=7.92, sal=31.0))
-        causes = [("산소량 급락", 0.52), ("출렁임 증가", 0.31), ("설비 사용률 상승", 0.17)]
-        actions = [("P1","산소 공급 단계 상향","즉시"), ("P2","산소 라인 점검","오늘"), ("P3","여유 용량 검토","계획")]
-    elif scenario == "물 흐름 저하":
-        loop_a.update(dict(risk=63, shock_24h=2, exposure_7d=0.28, util=0.88, do=6.6, temp=16.7, ph=7.74, sal=31.1))
-        loop_b.update(dict(risk=41, shock_24h=1, exposure_7d=0.12, util=0.62, do=7.2, temp=16.6, ph=7.88, sal=31.0))
-        causes = [("물 흐름 저하", 0.46), ("설비 사용률 상승", 0.29), ("산소량 변동", 0.25)]
-        actions = [("P1","펌프/밸브 점검 및 유량 복구","즉시"), ("P2","배관/필터 점검","오늘"), ("P3","예비 펌프/라인 계획","계획")]
-    elif scenario == "여과 부담 증가":
-        loop_a.update(dict(risk=58, shock_24h=1, exposure_7d=0.22, util=0.84, do=6.9, temp=16.8, ph=7.55, sal=31.2))
-        loop_b.update(dict(risk=46, shock_24h=0, exposure_7d=0.15, util=0.66, do=7.4, temp=16.6, ph=7.83, sal=31.0))
-        causes = [("여과 부담 증가", 0.44), ("pH 하락", 0.33), ("설비 사용률 상승", 0.23)]
-        actions = [("P1","여과 단계 강화/역세척 점검","즉시"), ("P2","pH 안정화 점검","오늘"), ("P3","여과 용량 증설 검토","계획")]
-    else:
-        causes = [("정상 변동", 0.41), ("운영 조건", 0.33), ("설비 사용률", 0.26)]
-        actions = [("P2","일일 점검 수행","오늘"), ("P3","운영 기록 정리","계획")]
+def load_risk_history(report_period: str):
+    # 보고 기간(날짜 2개)이 있으면 그 구간, 없으면 최근 7일
+    if not TS_STORE_DIR or not os.path.isdir(TS_STORE_DIR):
+        return None
+    TimeSeriesStore = startup.timed_import("tsstore").TimeSeriesStore
+    t0, t1 = parse_report_period(report_period) or (time.time() - 7 * 86400, time.time())
+    ts, risk = facility_risk_history(TimeSeriesStore(TS_STORE_DIR), t0, t1)
+    return (ts, risk) if ts.size else None
+
+@st.cache_resource
+def live_window():
+    # 프로세스 공용 슬라이딩 윈도우: 첫 호출에 7일 백필, 이후 새로고침마다 새 행만 반영
+    store = startup.timed_import("tsstore").TimeSeriesStore(TS_STORE_DIR)
+    zones = store.zones()
+    return store, WindowedAggregator(zones), ShockDetector(zones), threading.Lock()
+
+def apply_live_window(m: dict) -> dict:
+    # 이력 저장소가 있으면 노출 시간/사용률/갑작스런 변화(24시간)와 주요 원인을 실측 윈도우에서 채운다(없으면 데모 값 유지)
+    if not TS_STORE_DIR or not os.path.isdir(TS_STORE_DIR):
+        return m
+    store, agg, shock, lock = live_window()
+    if not agg.zones:
+        return m
+    with lock:
+        now = time.time()
+        agg.ingest_store(store, now)
+        shock.ingest_store(store, now)
+        agg.fill_metrics(m, now)
+        shock.fill_metrics(m, now)
+        fill_causes(m, agg, now)
+    return m
 
-    evidence = [
-        f"산소량(용존산소) {loop_a['do']:.1f} (기준 6.0~10.0)",
-        f"물 온도 {loop_a['temp']:.1f} (기준 14.0~20.0)",
-        f"물 산도(pH) {loop_a['ph']:.2f} (기준 7.6~8.3)",
-        f"염도 {loop_a['sal']:.1f} (기준 28.0~34.0)",
-    ]
+@st.cache_resource
+def live_source():
+    # 프로세스 공용 DB 폴러(연결 풀 + 구역별 워터마크): 첫 호출에 7일 백필, 이후 새 행만 조회
+    ingest = startup.timed_import("ingest")
+    poller = ingest.IngestPoller(ingest.open_source(SENSOR_DB_URL))
+    zones = poller.zones()
+    return poller, WindowedAggregator(zones), ShockDetector(zones), threading.Lock()
 
-    return dict(loop_a=loop_a, loop_b=loop_b, causes=causes, actions=actions, evidence=evidence)
+def load_sensor_metrics() -> dict:
+    # DB 새 행 → 구역 최신값(위험 점수) + 윈도우 집계(노출/사용률/갑작스런 변화/주요 원인)
+    poller, agg, shock, lock = live_source()
+    # 채널/사용률 열 위치는 폴러 필드 순서에서(없는 채널은 NaN)
+    ch_cols = [poller.fields.index(c) if c in poller.fields else None for c in CHANNELS]
+    u_col = poller.fields.index("util") if "util" in poller.fields else None
+    with lock:
+        now = time.time()
+        # 폴러가 새로 찾은 구역은 집계/감지기에 추가(새 구역은 워터마크가 없어 이번 폴링에서 백필됨)
+        zones = poller.zones()
+        agg.add_zones(zones)
+        shock.add_zones(zones)
+        prev = dict(poller.watermarks)
+        for zone, (ts, x) in poller.poll(now).items():
+            if zone not in agg.zones:
+                agg.add_zones([zone])
+                shock.add_zones([zone])
+            vals = np.stack([x[:, j] if j is not None else np.full(ts.size, np.nan) for j in ch_cols], axis=-1)
+            util = x[:, u_col] if u_col is not None else None
+            gaps = np.diff(ts, prepend=prev[zone][0] if zone in prev else ts[0])
+            dt = float(np.median(gaps[gaps > 0])) if np.any(gaps > 0) else 1.0
+            agg.backfill(ts, vals, util=util, dt=dt, zone=zone)
+            # 갑작스런 변화는 최근 24시간만 의미 있음 → 백필 구간에서는 윈도우 + 기준선 학습분만 반영
+            keep = ts >= ts[-1] - shock.events.n_buckets * shock.events.bucket_sec
+            first = max(0, int(np.argmax(keep)) - shock.warmup)
+            shock.update_zone(zone, ts[first:], vals[first:])
+        zones = poller.latest_zones()
+        m = dict(zones=zones, causes=[])
+        if agg.zones:
+            agg.fill_metrics(m, now)
+            shock.fill_metrics(m, now)
+            fill_causes(m, agg, now)
+    for name, score in score_zones(zones).items():
+        zones[name]["risk"] = score
+    return m
 
 # -----------------------------
 # 사이드바
@@ -71,30 +140,63 @@ st.sidebar.markdown("## Bio-OS 콘솔")
 st.sidebar.caption("표준 한글 고정(현장용)")
 
 st.sidebar.markdown("---")
-scenario = st.sidebar.radio("데모 시나리오", ["일반", "산소량 급락", "물 흐름 저하", "여과 부담 증가"], index=0)
-st.sidebar.info("※ 현재 화면은 데모(샘플 데이터) 기반입니다.\n실증 단계에서는 실제 센서/DB 값으로 자동 전환됩니다.")
+if SENSOR_DB_URL:
+    scenario = "센서 DB"
+    st.sidebar.success("센서 DB 연동 중")
+else:
+    scenario = st.sidebar.radio("데모 시나리오", list(DEMO_SCENARIOS), index=0)
+    st.sidebar.info("※ 현재 화면은 데모(샘플 데이터) 기반입니다.\n실증 단계에서는 실제 센서/DB 값으로 자동 전환됩니다.")
 
 st.sidebar.markdown("---")
 st.sidebar.markdown("### 제출 정보")
-meta = DocMeta(
-    facility_name=st.sidebar.text_input("시설명", value="BioModule 150"),
-    report_period=st.sidebar.text_input("보고 기간", value="(예: 2026-02-10 ~ 2026-02-16)"),
-    report_owner=st.sidebar.text_input("작성/담당", value="(예: 운영팀)"),
-    system_version=st.sidebar.text_input("시스템 버전", value="Bio-OS v1.0"),
-    doc_id=st.sidebar.text_input("문서 번호", value="BIO-OS-DOC-001"),
-    rev=st.sidebar.text_input("개정(Rev.)", value="v1.0"),
-    issuer=st.sidebar.text_input("발행 기관/회사", value="(예: BioModule Lab)"),
-    logo_text=st.sidebar.text_input("로고(텍스트)", value="Bio-OS"),
-    security_level=st.sidebar.selectbox("보안 등급", ["일반 공개", "내부 전용", "대외비"]),
-    rev_date=st.sidebar.text_input("개정 일자", value=datetime.now().strftime("%Y-%m-%d")),
-    rev_desc=st.sidebar.text_input("개정 내용", value="최초 발행"),
-)
+# 폼: 입력 중에는 재실행하지 않고 "적용"을 누를 때 1회만 반영
+with st.sidebar.form("doc_meta"):
+    meta = DocMeta(
+        facility_name=st.text_input("시설명", value="BioModule 150"),
+        report_period=st.text_input("보고 기간", value="(예: 2026-02-10 ~ 2026-02-16)"),
+        report_owner=st.text_input("작성/담당", value="(예: 운영팀)"),
+        system_version=st.text_input("시스템 버전", value="Bio-OS v1.0"),
+        doc_id=st.text_input("문서 번호", value="BIO-OS-DOC-001"),
+        rev=st.text_input("개정(Rev.)", value="v1.0"),
+        issuer=st.text_input("발행 기관/회사", value="(예: BioModule Lab)"),
+        logo_text=st.text_input("로고(텍스트)", value="Bio-OS"),
+        security_level=st.selectbox("보안 등급", ["일반 공개", "내부 전용", "대외비"]),
+        rev_date=st.text_input("개정 일자", value=datetime.now().strftime("%Y-%m-%d")),
+        rev_desc=st.text_input("개정 내용", value="최초 발행"),
+    )
+    st.form_submit_button("적용")
 
 # -----------------------------
-# 메트릭 로드
+# 메트릭 로드(캐시)
 # -----------------------------
-m = load_latest_metrics(scenario)
-payload = build_report_payload(m, meta)
+@st.cache_data(ttl=METRICS_TTL_SEC, show_spinner=False)
+def cached_metrics(scenario: str, report_period: str, rules_version: str) -> dict:
+    # TTL 안에서는 같은 스냅샷(snapshot_at 동일)을 모든 세션이 공유. 규칙 표가 바뀌면(rules_version) 다시 평가
+    with spans.span("metrics.load"):
+        m = load_sensor_metrics() if SENSOR_DB_URL else apply_live_window(load_latest_metrics(scenario))
+        fill_rules(m, get_rule_engine())
+    with spans.span("metrics.history"):
+        m["risk_history"] = load_risk_history(report_period)
+    m["snapshot_at"] = time.time()
+    return m
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_payload(snapshot_at: float, scenario: str, meta: DocMeta, _m: dict) -> dict:
+    # (스냅샷, 제출 정보) 당 1회 생성. _m 은 snapshot_at/scenario 로 식별되므로 해시하지 않음
+    payload = build_report_payload(_m, meta)
+    archive = get_archive()
+    if archive is not None:
+        # 국문 "개정 이력" 표: 보관함의 이 문서 개정 이력 + 지금 개정
+        payload["revisions"] = revision_rows(archive.revisions(meta.facility_name, meta.doc_id), payload["meta"])
+    return payload
+
+m = cached_metrics(scenario, meta.report_period, get_rule_engine().current().version_key)
+payload = cached_payload(m["snapshot_at"], scenario, meta, m)
+
+# 사전 생성(opt-in): 스냅샷/제출 정보가 바뀌고 입력이 멈추면 요약 보고서를 미리 생성
+if prefetch_enabled():
+    prefetch_owner = st.session_state.setdefault("prefetch_owner", uuid.uuid4().hex)
+    get_prefetcher().schedule(prefetch_owner, payload)
 
 # -----------------------------
 # 메인 화면
@@ -161,15 +263,103 @@ with col2:
 # 보고서 생성/다운로드
 # -----------------------------
 st.markdown("## 보고서")
+
+def _slot_job(variant: str, payload: dict):
+    # 이 세션이 등록한 작업(입력이 바뀌어 키가 달라지면 이전 작업은 숨김)
+    key = st.session_state.setdefault("report_jobs", {}).get(variant)
+    return get_job_queue().get(key) if key == report_key(variant, payload) else None
+
+def _archive_once(job, payload: dict):
+    # 완료된 보고서를 보관함에 1회 기록(BIOOS_ARCHIVE_DIR 지정 시)
+    archive = get_archive()
+    done = st.session_state.setdefault("archived_jobs", set())
+    if archive is None or job.key in done:
+        return
+    archive.put(job.result(), payload["meta"], job.variant, render_key=job.key)
+    done.add(job.key)
+
+def _report_slot(label: str, variant: str, dl_label: str, payload: dict, polling: bool):
+    job = _slot_job(variant, payload)
+    if st.button(label, key=f"btn_{variant}"):
+        job = get_job_queue().submit(variant, payload)
+        st.session_state["report_jobs"][variant] = job.key
+        if not job.done:
+            st.rerun()   # 진행 중 → 상태 폴링 모드로 다시 그림
+    if job is None:
+        return
+    if polling and job.done:
+        st.rerun()       # 완료 → 폴링 종료
+    if job.status == "failed":
+        st.error(f"생성 실패: {job.error}")
+    elif job.done:
+        _archive_once(job, payload)
+        with spans.span("report.download"):
+            st.download_button(dl_label, job.result(), file_name=report_filename(variant), mime="application/pdf",
+                               key=f"dl_{variant}")
+        st.caption(f"완료 · {job.elapsed():.1f}초")
+    else:
+        st.caption(f"{STATUS_KR[job.status]}… {job.elapsed():.1f}초")
+
+def report_slot(label: str, variant: str, dl_label: str, payload: dict):
+    """
+    보고서 버튼 1개: 클릭 → 공용 작업 큐에 등록(화면은 멈추지 않음) → 완료 시 다운로드 버튼.
+    진행 중 작업이 있을 때만 이 영역을 주기적으로 다시 그린다(fragment).
+    """
+    job = _slot_job(variant, payload)
+    polling = job is not None and not job.done
+    st.fragment(_report_slot, run_every=0.5 if polling else None)(label, variant, dl_label, payload, polling)
+
+def _bundle_export(payload: dict):
+    # 이 세션의 묶음 작업(입력이 바뀌면 이전 묶음은 숨김)
+    ex = st.session_state.get("bundle_export")
+    return ex if ex is not None and ex.key == bundle_key(payload) else None
+
+def _bundle_ready(key: str):
+    st.session_state["bundle_ready"] = key
+
+def _bundle_downloaded():
+    st.session_state.pop("bundle_ready", None)
+
+def _bundle_slot(payload: dict, polling: bool):
+    ex = _bundle_export(payload)
+    if st.button("전체 보고서 ZIP(5종 동시 생성)", key="btn_bundle"):
+        old = st.session_state.get("bundle_export")
+        if old is not None:
+            old.discard()
+        ex = st.session_state["bundle_export"] = BundleExport(payload)
+        st.session_state.pop("bundle_ready", None)
+        st.rerun()
+    if ex is None:
+        return
+    if polling and ex.done:
+        st.rerun()
+    if ex.status == "failed":
+        st.error(f"생성 실패: {ex.error}")
+    elif ex.done:
+        # ZIP 은 디스크에 둔다. 내려받기를 요청한 실행에서만 읽어 버튼에 넘기고,
+        # 받은 뒤에는 다시 준비 버튼으로(매 실행마다 묶음 bytes 를 읽지 않음)
+        if st.session_state.get("bundle_ready") != ex.key:
+            st.button("ZIP 내려받기", key="btn_bundle_ready", on_click=_bundle_ready, args=(ex.key,))
+        else:
+            with spans.span("report.download"):
+                st.download_button("다운로드(ZIP)", ex.read(), file_name=BUNDLE_FILENAME, mime="application/zip",
+                                   key="dl_bundle", on_click=_bundle_downloaded)
+        st.caption(f"완료 · {ex.elapsed():.1f}초 · {ex.size()/1024:.0f} KB · "
+                   f"캐시 적중 {sum(1 for e in ex.manifest if e['cached'])}/{ex.total}")
+    else:
+        st.caption(f"생성 중… {ex.completed}/{ex.total} · {ex.elapsed():.1f}초")
+
+def bundle_slot(payload: dict):
+    """전체 묶음 버튼: report_slot 과 같은 방식(진행 중일 때만 fragment 주기 갱신)."""
+    ex = _bundle_export(payload)
+    polling = ex is not None and not ex.done
+    st.fragment(_bundle_slot, run_every=0.5 if polling else None)(payload, polling)
+
 c1, c2, c3 = st.columns(3)
 with c1:
-    if st.button("1페이지 요약 PDF"):
-        pdf = make_pdf_kr(summary_only=True, payload=payload)
-        st.download_button("다운로드(요약)", pdf, file_name="Bio-OS_운영_요약보고서_1p.pdf", mime="application/pdf")
+    report_slot("1페이지 요약 PDF", "kr_1p", "다운로드(요약)", payload)
 with c2:
-    if st.button("3페이지 상세 PDF(정부용 포함)"):
-        pdf = make_pdf_kr(summary_only=False, payload=payload)
-        st.download_button("다운로드(상세)", pdf, file_name="Bio-OS_운영_상세보고서_3p.pdf", mime="application/pdf")
+    report_slot("3페이지 상세 PDF(정부용 포함)", "kr_3p", "다운로드(상세)", payload)
 with c3:
     admin = st.toggle("글로벌(관리자) 모드", value=False, help="현장 UI는 한글 고정. 영문/백서는 관리자용 출력물입니다.")
 
@@ -177,16 +367,84 @@ if admin:
     st.markdown("### 글로벌(관리자) 출력")
     a1, a2, a3 = st.columns(3)
     with a1:
-        if st.button("영문 1p PDF"):
-            pdf = make_pdf_en(summary_only=True, payload=payload)
-            st.download_button("다운로드(EN 1p)", pdf, file_name="Bio-OS_Report_EN_1p.pdf", mime="application/pdf")
+        report_slot("영문 1p PDF", "en_1p", "다운로드(EN 1p)", payload)
     with a2:
-        if st.button("영문 3p PDF(Glossary 포함)"):
-            pdf = make_pdf_en(summary_only=False, payload=payload)
-            st.download_button("다운로드(EN 3p)", pdf, file_name="Bio-OS_Report_EN_3p.pdf", mime="application/pdf")
+        report_slot("영문 3p PDF(Glossary 포함)", "en_3p", "다운로드(EN 3p)", payload)
     with a3:
-        if st.button("글로벌 백서 12p"):
-            pdf = make_whitepaper_12p(payload)
-            st.download_button("다운로드(Whitepaper)", pdf, file_name="Bio-OS_Global_Whitepaper_12p.pdf", mime="application/pdf")
+        report_slot("글로벌 백서 12p", "whitepaper_12p", "다운로드(Whitepaper)", payload)
+    bundle_slot(payload)
+
+    cs = get_render_cache().stats()
+    st.caption(f"렌더 캐시: 적중 {cs['hits']}(디스크 {cs['disk_hits']}) · 미적중 {cs['misses']} · 제거 {cs['evictions']} · "
+               f"{cs['entries']}건 / {cs['mem_bytes']/1024:.0f} KB")
+    js = get_job_queue().stats()
+    st.caption(f"작업 큐: 진행 중 {js['inflight']} · 렌더 {js['rendered']} · 중복 병합 {js['deduped']} · 실패 {js['failed']} · "
+               f"스레드 {js['workers']}")
+    if prefetch_enabled():
+        ps = get_prefetcher().stats()
+        st.caption(f"사전 생성: 렌더 {ps['rendered']} · 사용됨 {ps['used']} · 대체 {ps['superseded']} · 취소 {ps['cancelled']} · "
+                   f"대기 {ps['pending']} · CPU {ps['cpu_s']:.1f}초(예산 {ps['cpu_budget']:.0%}) · 조절 대기 {ps['throttled_s']:.1f}초")
+        if st.button("사전 생성 취소"):
+            get_prefetcher().cancel(prefetch_owner)
+
+    re_ = get_rule_engine()
+    rules_now = re_.current()
+    st.caption(f"규칙 표: {os.path.basename(rules_now.source)} v{rules_now.version} · 규칙 {len(rules_now.rules)}개 · "
+               f"다시 읽음 {re_.reloads}회" + (f" · 오류(이전 표 사용 중): {re_.last_error}" if re_.last_error else ""))
+
+    if SENSOR_DB_URL:
+        ist = live_source()[0].stats()
+        st.caption(f"센서 DB: 구역 {ist['zones']} · 폴링 {ist['polls']} · 쿼리 {ist['queries']} · 행 {ist['rows']} · "
+                   f"연결 {ist.get('pool_open', 0)}/{ist.get('pool_size', 0)}")
+
+    archive = get_archive()
+    if archive is not None:
+        with st.expander("보고서 보관함"):
+            arc = archive.stats()
+            st.caption(f"보관 {arc['reports']}건 · 본체 {arc['blobs']}개(중복 제거) · "
+                       f"{arc['stored_bytes']/1024:.0f} KB / 원본 {arc['bytes']/1024:.0f} KB")
+            rows = archive.find(meta.facility_name, meta.doc_id)
+            if not rows:
+                st.caption(f"{meta.doc_id}: 아직 보관된 보고서 없음")
+            else:
+                # 고른 1건만 읽는다(목록 전체의 PDF 를 매 실행마다 읽지 않음)
+                r = st.selectbox("보관본", rows[:20], key="arc_pick",
+                                 format_func=lambda r: f"Rev. {r['rev']} · {r['report_period']} · {r['variant']} · "
+                                                       f"{datetime.fromtimestamp(r['archived_at']):%Y-%m-%d %H:%M} · "
+                                                       f"{r['size']/1024:.0f} KB")
+                st.download_button("받기", archive.get(r["sha256"]), key="arc_dl",
+                                   file_name=f"{r['doc_id']}_{r['rev']}_{report_filename(r['variant'])}",
+                                   mime="application/pdf")
+
+    with st.expander("단계별 소요 시간(p50/p95/p99)"):
+        for err in spans.exporter_errors:
+            st.warning(f"계측 내보내기 시작 실패: {err}")
+        rows = spans.snapshot()
+        if not spans.ENABLED:
+            st.caption("계측 꺼짐(BIOOS_SPANS=0)")
+        elif not rows:
+            st.caption("아직 기록 없음")
+        else:
+            st.caption(f"최근 {spans.WINDOW}건 기준 · 프로세스 최대 RSS {spans.peak_rss_mb():.0f} MB")
+            st.dataframe([{k: r[k] for k in ("span", "count", "p50_ms", "p95_ms", "p99_ms", "max_ms", "total_s", "rss_grow_mb")}
+                          for r in rows], hide_index=True)
+            e1, e2 = st.columns(2)
+            e1.download_button("Prometheus 텍스트", spans.prometheus_text(), file_name="bioos_spans.prom", mime="text/plain")
+            e2.download_button("JSON", spans.to_json(), file_name="bioos_spans.json", mime="application/json")
+
+    with st.expander("시작 시간 분석(모듈 import 비용)"):
+        st.caption("워밍업 완료" if startup.warm_up_done() else "워밍업 진행 중(백그라운드)")
+        for label, sec in startup.breakdown():
+            st.write(f"• {label}: {sec*1000:.0f} ms")
+
+if SENSOR_DB_URL:
+    st.caption("※ Seed-M1 센서/DB 연동 값 기반.")
+else:
+    st.caption("※ 데모(샘플 데이터) 기반. 실증 단계에서는 Seed-M1 센서/DB 연동으로 자동 전환.")
 
-st.caption("※ 데모(샘플 데이터) 기반. 실증 단계에서는 Seed-M1 센서/DB 연동으로 자동 전환.")
+# 첫 화면을 모두 보낸 뒤: 프로세스 최초 1회 실행 시간 기록 + 렌더링 모듈 백그라운드 워밍업
+startup.record("first script run", time.perf_counter() - _T_IMPORTS)
+spans.record("app.rerun", time.perf_counter() - _T_IMPORTS)
+spans.start_exporter()
+if os.environ.get("BIOOS_WARMUP", "1") != "0":
+    warm_up_renderers()
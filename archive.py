@@ -0,0 +1,254 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# -----------------------------
+# 보고서 보관함(버전별, 내용 해시 중복 제거)
+# -----------------------------
+# 다운로드 후 버려지던 PDF 를 (시설, 문서번호, 개정, 보고 기간, 종류) 로 보관한다.
+#
+# 디렉터리 구조:
+#     root/index.db            색인(SQLite, WAL)
+#     root/blobs/ab/<sha256>   PDF 본체(내용 해시 이름, zlib 또는 원본)
+#
+# - 같은 bytes 는 한 번만 저장(여러 색인 행이 같은 blob 을 가리킴)
+# - 같은 (시설, 문서번호, 개정, 기간, 종류) 를 다시 보관하면 색인 행을 새 blob 으로 교체,
+#   더 이상 가리키는 행이 없는 blob 은 지운다
+# - 조회/목록은 모두 색인(B-tree) 범위 탐색 → 수만 건에서도 O(log n) (+ 결과 건수)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,          -- 원본 bytes
+    stored INTEGER NOT NULL,        -- 디스크 bytes
+    codec TEXT NOT NULL             -- 'zlib' 또는 'raw'
+);
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY,
+    facility TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    rev TEXT NOT NULL,
+    report_period TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    rev_date TEXT,
+    rev_desc TEXT,
+    sha256 TEXT NOT NULL REFERENCES blobs(sha256),
+    render_key TEXT,
+    archived_at REAL NOT NULL,
+    UNIQUE (facility, doc_id, rev, report_period, variant)
+);
+CREATE INDEX IF NOT EXISTS reports_period ON reports (facility, report_period, variant);
+CREATE INDEX IF NOT EXISTS reports_recent ON reports (facility, id);
+CREATE INDEX IF NOT EXISTS reports_sha ON reports (sha256);
+"""
+
+_COLUMNS = ("id", "facility", "doc_id", "rev", "report_period", "variant", "rev_date", "rev_desc",
+            "sha256", "render_key", "archived_at")
+_SELECT = f"SELECT r.{', r.'.join(_COLUMNS)}, b.size FROM reports r JOIN blobs b ON b.sha256 = r.sha256"
+
+# 압축으로 이만큼도 줄지 않으면 원본 저장(읽을 때 압축 해제 비용 절약)
+MIN_SAVING = 0.05
+
+class ReportArchive:
+    """
+    보고서 보관함(프로세스 내 여러 스레드에서 사용 가능, 쓰기는 잠금으로 직렬화).
+    - put(): 보관 → 색인 행 dict
+    - get()/find()/latest()/listing(): 조회
+    - revisions(): 문서의 개정 이력(rev, rev_date, rev_desc) — 국문 보고서 "10. 개정 이력" 표
+    """
+
+    def __init__(self, root: str, level: int = 6):
+        self.root = root
+        self.level = int(level)
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False, timeout=10.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._stats = dict(puts=0, deduped=0, blobs_written=0, blobs_removed=0)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- blob ---
+    def _blob_path(self, sha: str) -> str:
+        return os.path.join(self.root, "blobs", sha[:2], sha)
+
+    def _write_tmp(self, sha: str, pdf: bytes) -> Tuple[str, int, str]:
+        # 임시 파일까지만 기록. 제자리로 옮기는 것(os.replace)은 색인 커밋이 성공한 뒤
+        packed = zlib.compress(pdf, self.level)
+        codec = "zlib" if len(packed) <= len(pdf) * (1.0 - MIN_SAVING) else "raw"
+        data = packed if codec == "zlib" else pdf
+        path = self._blob_path(sha)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        return tmp, len(data), codec
+
+    def _drop_blob_row_if_orphan(self, sha: str) -> bool:
+        # 색인에서만 지운다(파일은 커밋 뒤 호출 측이 삭제)
+        if self._conn.execute("SELECT 1 FROM reports WHERE sha256 = ? LIMIT 1", (sha,)).fetchone():
+            return False
+        self._conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha,))
+        return True
+
+    # --- 쓰기 ---
+    def put(self, pdf: bytes, meta: Dict[str, Any], variant: str, render_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        PDF 1건 보관. meta 는 DocMeta 필드 dict(payload["meta"]).
+        - 같은 내용(sha256)의 blob 이 있으면 재사용
+        - 같은 (시설, 문서번호, 개정, 기간, 종류) 가 있으면 그 행을 교체
+        - 파일 변경(새 blob 배치/고아 blob 삭제)은 색인 커밋이 성공한 뒤에만 → 실패해도 기존 보관본은 그대로
+        """
+        sha = hashlib.sha256(pdf).hexdigest()
+        key = (str(meta.get("facility_name", "")), str(meta.get("doc_id", "")), str(meta.get("rev", "")),
+               str(meta.get("report_period", "")), variant)
+        with self._lock:
+            tmp, orphan = None, None
+            try:
+                with self._conn:
+                    if self._conn.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (sha,)).fetchone() is None:
+                        tmp, stored, codec = self._write_tmp(sha, pdf)
+                        self._conn.execute("INSERT INTO blobs (sha256, size, stored, codec) VALUES (?, ?, ?, ?)",
+                                           (sha, len(pdf), stored, codec))
+                    old = self._conn.execute(
+                        "SELECT sha256 FROM reports WHERE facility = ? AND doc_id = ? AND rev = ? "
+                        "AND report_period = ? AND variant = ?", key).fetchone()
+                    self._conn.execute(
+                        "INSERT INTO reports (facility, doc_id, rev, report_period, variant, rev_date, rev_desc, "
+                        "sha256, render_key, archived_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT (facility, doc_id, rev, report_period, variant) DO UPDATE SET "
+                        "rev_date = excluded.rev_date, rev_desc = excluded.rev_desc, sha256 = excluded.sha256, "
+                        "render_key = excluded.render_key, archived_at = excluded.archived_at",
+                        key + (meta.get("rev_date"), meta.get("rev_desc"), sha, render_key, time.time()))
+                    if old and old[0] != sha and self._drop_blob_row_if_orphan(old[0]):
+                        orphan = old[0]
+                # 커밋 완료
+                if tmp is not None:
+                    os.replace(tmp, self._blob_path(sha))
+                    tmp = None
+                    self._stats["blobs_written"] += 1
+                else:
+                    self._stats["deduped"] += 1
+                if orphan is not None:
+                    try:
+                        os.remove(self._blob_path(orphan))
+                    except OSError:
+                        pass
+                    self._stats["blobs_removed"] += 1
+                self._stats["puts"] += 1
+            finally:
+                if tmp is not None:
+                    try:
+                        os.remove(tmp)
+                    except OSError:
+                        pass
+        return self.find(*key[:2], rev=key[2], report_period=key[3], variant=variant)[0]
+
+    # --- 읽기 ---
+    def _rows(self, sql: str, args: Sequence[Any]) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(sql, tuple(args)).fetchall()
+        return [dict(zip(_COLUMNS + ("size",), r)) for r in rows]
+
+    def get(self, sha: str) -> bytes:
+        """blob 내용(원본 PDF bytes). 없으면 KeyError."""
+        with self._lock:
+            row = self._conn.execute("SELECT codec FROM blobs WHERE sha256 = ?", (sha,)).fetchone()
+        if row is None:
+            raise KeyError(sha)
+        with open(self._blob_path(sha), "rb") as f:
+            data = f.read()
+        return zlib.decompress(data) if row[0] == "zlib" else data
+
+    def find(self, facility: str, doc_id: str, rev: Optional[str] = None, report_period: Optional[str] = None,
+             variant: Optional[str] = None) -> List[Dict[str, Any]]:
+        """문서번호 기준 조회(개정/기간/종류는 선택). 최근 보관 순."""
+        sql, args = f"{_SELECT} WHERE r.facility = ? AND r.doc_id = ?", [facility, doc_id]
+        for col, val in (("rev", rev), ("report_period", report_period), ("variant", variant)):
+            if val is not None:
+                sql += f" AND r.{col} = ?"
+                args.append(val)
+        return self._rows(sql + " ORDER BY r.archived_at DESC", args)
+
+    def latest(self, facility: str, doc_id: str, variant: str,
+               report_period: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        rows = self.find(facility, doc_id, report_period=report_period, variant=variant)
+        return rows[0] if rows else None
+
+    def by_period(self, facility: str, report_period: str, variant: Optional[str] = None) -> List[Dict[str, Any]]:
+        """보고 기간 기준 조회(모든 문서번호/개정)."""
+        sql, args = f"{_SELECT} WHERE r.facility = ? AND r.report_period = ?", [facility, report_period]
+        if variant is not None:
+            sql += " AND r.variant = ?"
+            args.append(variant)
+        return self._rows(sql + " ORDER BY r.id DESC", args)
+
+    def listing(self, facility: Optional[str] = None, limit: int = 50,
+                before_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """최근 보관 순 목록. 다음 쪽은 before_id=마지막 행 id(키셋 페이지 → 깊은 쪽도 O(log n))."""
+        where, args = [], []
+        if facility is not None:
+            where.append("r.facility = ?")
+            args.append(facility)
+        if before_id is not None:
+            where.append("r.id < ?")
+            args.append(int(before_id))
+        sql = _SELECT + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY r.id DESC LIMIT ?"
+        return self._rows(sql, args + [int(limit)])
+
+    def revisions(self, facility: str, doc_id: str) -> List[Tuple[str, str, str]]:
+        """개정 이력: 개정마다 1행(처음 보관된 행의 개정 일자/내용), 개정 일자 → 최초 보관 순."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT rev, rev_date, rev_desc, MIN(archived_at) AS first FROM reports "
+                "WHERE facility = ? AND doc_id = ? GROUP BY rev ORDER BY rev_date, first",
+                (facility, doc_id)).fetchall()
+        return [(rev, rev_date or "-", rev_desc or "-") for rev, rev_date, rev_desc, _ in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            n_reports = self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+            n_blobs, size, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored), 0) FROM blobs").fetchone()
+            s = dict(self._stats)
+        s.update(reports=n_reports, blobs=n_blobs, bytes=size, stored_bytes=stored)
+        return s
+
+def revision_rows(history: Sequence[Tuple[str, str, str]], meta: Dict[str, Any]) -> List[List[str]]:
+    """
+    보관함 개정 이력 + 지금 만드는 개정(meta) → 개정 이력 표 행.
+    - 같은 개정이 이력에 있으면 그 자리의 값을 지금 입력값으로 교체, 없으면 맨 뒤에 추가
+    """
+    cur = [str(meta.get("rev", "-")), str(meta.get("rev_date", "-")), str(meta.get("rev_desc", "-"))]
+    rows = [cur if r[0] == cur[0] else list(r) for r in history]
+    if not any(r[0] == cur[0] for r in history):
+        rows.append(cur)
+    return rows
+
+# -----------------------------
+# 프로세스 공용 보관함
+# -----------------------------
+_default_archive: Optional[ReportArchive] = None
+_default_lock = threading.Lock()
+
+def get_archive() -> Optional[ReportArchive]:
+    """
+    프로세스 단위 공용 보관함.
+    - BIOOS_ARCHIVE_DIR: 보관함 경로(미지정 시 None → 보관하지 않음)
+    """
+    global _default_archive
+    root = os.environ.get("BIOOS_ARCHIVE_DIR")
+    if not root:
+        return None
+    with _default_lock:
+        if _default_archive is None:
+            _default_archive = ReportArchive(root)
+        return _default_archive
@@ -0,0 +1,71 @@
+from __future__ import annotations
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import numpy as np
+
+from risk_engine import CHANNELS
+
+# -----------------------------
+# 주요 원인 분석(채널 기여도)
+# -----------------------------
+# 구역별 최근 채널 점수(WindowedAggregator.channel_scores, (N, C))를 원인 가중치로 바꾼다.
+# - 구역 안에서: 채널 점수 비율로 정규화 → 구역별 원인 순위(argsort 1회)
+# - 시설 전체: 구역 가중치(위험 점수)로 합친 뒤 정규화 → 상위 3개가 payload 의 causes
+# - 방향(편차 부호)으로 원인 이름을 고른다: 산소량 저하 / 산소량 과다 등
+# 점수 합계는 슬라이딩 윈도우 링에서 O(1) 로 얻으므로, 새로고침마다 이력을 다시 읽지 않는다.
+
+CAUSE_LABELS_KR: Dict[Tuple[str, int], str] = {
+    ("do", -1): "산소량 저하",   ("do", 1): "산소량 과다",
+    ("temp", -1): "물 온도 하강", ("temp", 1): "물 온도 상승",
+    ("ph", -1): "pH 하락",      ("ph", 1): "pH 상승",
+    ("sal", -1): "염도 저하",    ("sal", 1): "염도 상승",
+}
+
+# 채널 평균 점수가 이 값 미만(기준 범위 중앙 ~ 반폭의 1/3 이내)이면 원인 후보에서 제외
+MIN_CAUSE_SCORE = 20.0
+
+def cause_label(channel: str, direction: float) -> str:
+    return CAUSE_LABELS_KR.get((channel, 1 if direction >= 0 else -1), channel)
+
+def attribute(scores: np.ndarray, direction: np.ndarray, channels: Sequence[str] = CHANNELS,
+              zone_weight: Optional[np.ndarray] = None, top: int = 3) -> Dict[str, Any]:
+    """
+    채널 기여도 → 원인 가중치/순위(전 구역 한 번에).
+    - scores, direction: (N, C)
+    - zone_weight: (N,) 시설 전체 합산 시 구역 가중치(기본: 구역별 최대 채널 점수)
+    - 반환:
+        zone_share (N, C) 구역 안 정규화 비율, zone_top (N, top) 채널 인덱스,
+        causes [(원인 이름, 가중치)] 시설 전체 상위 top 개(기준 미달이면 빈 목록)
+    """
+    s = np.asarray(scores, dtype=np.float64)
+    s = np.where(s >= MIN_CAUSE_SCORE, s, 0.0)
+    tot = s.sum(axis=1, keepdims=True)
+    share = np.divide(s, tot, out=np.zeros_like(s), where=tot > 0)
+    zone_top = np.argsort(-share, axis=1, kind="stable")[:, :top]
+
+    w = s.max(axis=1) if zone_weight is None else np.nan_to_num(np.asarray(zone_weight, dtype=np.float64))
+    fac = (share * w[:, None]).sum(axis=0)
+    total = fac.sum()
+    causes: List[Tuple[str, float]] = []
+    if total > 0:
+        fac /= total
+        # 방향: 구역 기여로 가중한 편차 부호 합
+        dirs = (np.asarray(direction, dtype=np.float64) * share * w[:, None]).sum(axis=0)
+        for c in np.argsort(-fac, kind="stable")[:top]:
+            if fac[c] > 0:
+                causes.append((cause_label(channels[c], dirs[c]), round(float(fac[c]), 2)))
+    return dict(zone_share=share, zone_top=zone_top, causes=causes)
+
+def fill_causes(m: Dict[str, Any], agg: Any, now: float, top: int = 3) -> Dict[str, Any]:
+    """
+    WindowedAggregator 상태로 m["causes"] 를 채운다.
+    - 기준 미달이면 빈 목록 → build_report_payload 가 "특이 이상 없음" 으로 표시
+    - 구역별 상위 원인은 m["zone_causes"] = {구역: [원인 이름, ...]}
+    """
+    direction = agg.channel_direction(now)
+    res = attribute(agg.channel_scores(now), direction, agg.channels, top=top)
+    m["zone_causes"] = {
+        z: [cause_label(agg.channels[c], direction[i, c]) for c in res["zone_top"][i] if res["zone_share"][i, c] > 0]
+        for i, z in enumerate(agg.zones)
+    }
+    m["causes"] = res["causes"]
+    return m
@@ -0,0 +1,282 @@
+"""
+대량(배치) 보고서 생성 CLI.
+
+사용 예:
+    python batch.py fleet.jsonl --variants kr_1p,kr_3p --out out/
+    python batch.py fleet.csv --variants all --out weekly.zip --workers 8 --retries 2
+    python batch.py fleet.jsonl --variants kr_3p --out out/ --archive /data/bioos_archive
+
+입력 형식
+- JSONL: 한 줄당 {"metrics": {...}, "meta": {...DocMeta 필드...}, "variants": [...](선택)}
+- CSV  : DocMeta 필드명 컬럼 + metrics(JSON 문자열) 컬럼 + variants(쉼표 구분, 선택) 컬럼
+- metrics 의 구역: "zones": {구역 이름: {...}} 또는 열 배열 {"name": [...], "risk": [...], ...}
+  (이전 형식 "loop_a"/"loop_b" 도 허용)
+"""
+from __future__ import annotations
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, fields
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+
+from common import DocMeta, build_report_payload
+from reports import VARIANTS
+
+_ALL_VARIANTS = list(VARIANTS)
+_META_FIELDS = {f.name for f in fields(DocMeta)}
+
+@dataclass
+class Job:
+    job_id: str
+    record_no: int
+    variant: str
+    metrics: Dict[str, Any]
+    meta: Dict[str, Any]
+    attempts: int = 0
+    revisions: Optional[List[List[str]]] = None   # 보관함 개정 이력(--archive)
+
+@dataclass
+class JobResult:
+    job_id: str
+    variant: str
+    ok: bool
+    seconds: float
+    attempt: int
+    pdf: Optional[bytes] = None
+    error: str = ""
+
+# -----------------------------
+# 입력 로드
+# -----------------------------
+def _parse_variants(spec: Any, default: List[str]) -> List[str]:
+    if not spec:
+        return default
+    items = spec if isinstance(spec, list) else [s.strip() for s in str(spec).split(",")]
+    out = _ALL_VARIANTS if "all" in items else [v for v in items if v]
+    unknown = [v for v in out if v not in _ALL_VARIANTS]
+    if unknown:
+        raise ValueError(f"unknown report variant(s): {', '.join(unknown)}")
+    return list(out)
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    recs: List[Dict[str, Any]] = []
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                recs.append(dict(
+                    metrics=json.loads(row.get("metrics") or "{}"),
+                    meta={k: v for k, v in row.items() if k in _META_FIELDS and v not in (None, "")},
+                    variants=row.get("variants") or None,
+                ))
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    recs.append(json.loads(line))
+    return recs
+
+def _safe_name(s: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", s).strip("_") or "report"
+
+def plan_jobs(records: List[Dict[str, Any]], default_variants: List[str]) -> List[Job]:
+    jobs: List[Job] = []
+    for i, rec in enumerate(records):
+        meta = {k: v for k, v in (rec.get("meta") or {}).items() if k in _META_FIELDS}
+        label = _safe_name(f"{meta.get('facility_name', 'facility')}_{meta.get('doc_id', i)}")
+        for v in _parse_variants(rec.get("variants"), default_variants):
+            jobs.append(Job(job_id=f"{i:04d}_{label}_{v}", record_no=i, variant=v,
+                            metrics=rec.get("metrics") or {}, meta=meta))
+    return jobs
+
+# -----------------------------
+# 워커
+# -----------------------------
+def _init_worker() -> None:
+    # 워커 프로세스 시작 시 1회: 렌더링 모듈/글꼴/스타일 준비 → 작업 시간에 포함되지 않게
+    from reports import prepare_renderers
+    prepare_renderers()
+
+def _run_job(job: Job) -> JobResult:
+    from reports import render_report
+    t0 = time.perf_counter()
+    try:
+        payload = build_report_payload(job.metrics, DocMeta(**job.meta))
+        if job.revisions:
+            payload["revisions"] = job.revisions
+        pdf = render_report(job.variant, payload)
+        return JobResult(job.job_id, job.variant, True, time.perf_counter() - t0, job.attempts, pdf=pdf)
+    except Exception as e:
+        return JobResult(job.job_id, job.variant, False, time.perf_counter() - t0, job.attempts,
+                         error=f"{type(e).__name__}: {e}")
+
+# -----------------------------
+# 출력
+# -----------------------------
+class _Sink:
+    """디렉터리 또는 ZIP 으로 완료 순서대로 바로 기록(결과를 메모리에 쌓지 않음)."""
+
+    def __init__(self, out: str):
+        self.zip: Optional[zipfile.ZipFile] = None
+        self.dir = None
+        if out.lower().endswith(".zip"):
+            parent = os.path.dirname(os.path.abspath(out))
+            os.makedirs(parent, exist_ok=True)
+            self.zip = zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED)
+        else:
+            os.makedirs(out, exist_ok=True)
+            self.dir = out
+
+    def write(self, name: str, data: bytes) -> None:
+        if self.zip is not None:
+            self.zip.writestr(name, data)
+        else:
+            with open(os.path.join(self.dir, name), "wb") as f:
+                f.write(data)
+
+    def close(self) -> None:
+        if self.zip is not None:
+            self.zip.close()
+
+# -----------------------------
+# 실행
+# -----------------------------
+def _run_pool(jobs: List[Job], workers: int, on_result, prepare=None) -> List[Job]:
+    """
+    jobs 를 병렬 실행. 풀 자체가 죽은 경우 완료되지 않은 작업을 반환.
+    - prepare(job): 제출 직전 호출(그때까지 끝난 작업의 on_result 가 반영된 상태)
+    """
+    pending = list(reversed(jobs))
+    lost: List[Job] = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as ex:
+        inflight = {}
+        try:
+            while pending or inflight:
+                while pending and len(inflight) < workers * 2:
+                    job = pending.pop()
+                    job.attempts += 1
+                    if prepare is not None:
+                        prepare(job)
+                    inflight[ex.submit(_run_job, job)] = job
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    job = inflight.pop(fut)
+                    on_result(job, fut.result())
+        except BrokenProcessPool:
+            lost = list(inflight.values()) + list(reversed(pending))
+    return lost
+
+def _revision_preparer(archive, jobs: List[Job]):
+    """제출 직전에 작업의 개정 이력(job.revisions)을 채우는 함수(_run_pool 의 prepare)."""
+    from archive import revision_rows
+    # 같은 문서의 개정이 한 배치에 여러 건이면 동시에 렌더될 수 있다 → 입력 순서상 앞선 개정은
+    # 보관 완료 전이라도 이력에 넣는다
+    in_batch: Dict[Tuple[str, str], List[Tuple[int, Tuple[str, str, str]]]] = {}
+    for job in jobs:
+        meta = DocMeta(**job.meta).__dict__
+        in_batch.setdefault((meta["facility_name"], meta["doc_id"]), []).append(
+            (job.record_no, (meta["rev"], meta["rev_date"], meta["rev_desc"])))
+
+    def prepare(job: Job) -> None:
+        # 보관함 이력은 제출 시점에 조회(그때까지 보관된 개정 반영)
+        meta = DocMeta(**job.meta).__dict__
+        history = archive.revisions(meta["facility_name"], meta["doc_id"])
+        known = {h[0] for h in history}
+        for no, rev in in_batch[(meta["facility_name"], meta["doc_id"])]:
+            if no < job.record_no and rev[0] not in known:
+                history.append(rev)
+                known.add(rev[0])
+        history.sort(key=lambda h: h[1])
+        job.revisions = revision_rows(history, meta)
+    return prepare
+
+def run_batch(jobs: List[Job], out: str, workers: int, retries: int, log=print,
+              archive_dir: Optional[str] = None) -> List[JobResult]:
+    sink = _Sink(out)
+    archive = None
+    if archive_dir:
+        from archive import ReportArchive
+        archive = ReportArchive(archive_dir)
+    prepare = _revision_preparer(archive, jobs) if archive is not None else None
+    results: List[JobResult] = []
+    failed: List[Job] = []
+
+    def on_result(job: Job, r: JobResult) -> None:
+        if r.ok:
+            sink.write(f"{job.job_id}.pdf", r.pdf)
+            if archive is not None:
+                archive.put(r.pdf, DocMeta(**job.meta).__dict__, job.variant)
+            r.pdf = None
+            results.append(r)
+            log(f"[ok]   {job.job_id}  {r.seconds:6.2f}s  (attempt {r.attempt})")
+        else:
+            failed.append(job)
+            log(f"[fail] {job.job_id}  {r.seconds:6.2f}s  (attempt {r.attempt})  {r.error}")
+            if job.attempts > retries:
+                results.append(r)
+
+    try:
+        lost = _run_pool(jobs, workers, on_result, prepare)
+        # 재시도는 작업마다 새 단일 워커 풀에서 격리 실행(다른 작업/워커 상태와 분리)
+        retry_q = [j for j in failed if j.attempts <= retries] + lost
+        failed.clear()
+        while retry_q:
+            job = retry_q.pop(0)
+            lost = _run_pool([job], 1, on_result, prepare)
+            if lost and job.attempts <= retries:
+                retry_q.append(job)
+            elif lost:
+                results.append(JobResult(job.job_id, job.variant, False, 0.0, job.attempts, error="worker crashed"))
+            retry_q.extend(j for j in failed if j.attempts <= retries)
+            failed.clear()
+    finally:
+        sink.close()
+        if archive is not None:
+            archive.close()
+    return results
+
+def _summary(results: List[JobResult], wall: float) -> Dict[str, Any]:
+    ok = sorted(r.seconds for r in results if r.ok)
+    def pct(p: float) -> float:
+        return ok[min(len(ok) - 1, int(round(p * (len(ok) - 1))))] if ok else 0.0
+    return dict(
+        jobs=len(results), ok=len(ok), failed=len(results) - len(ok),
+        wall_s=round(wall, 3), job_sum_s=round(sum(ok), 3),
+        p50_s=round(pct(0.50), 3), p95_s=round(pct(0.95), 3), max_s=round(ok[-1] if ok else 0.0, 3),
+    )
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Bio-OS 보고서 배치 생성")
+    ap.add_argument("input", help="시설 스냅샷 + DocMeta 목록(.jsonl 또는 .csv)")
+    ap.add_argument("--variants", default="kr_1p", help=f"쉼표 구분({', '.join(_ALL_VARIANTS)}) 또는 all")
+    ap.add_argument("--out", default="reports_out", help="출력 디렉터리 또는 .zip 경로")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--retries", type=int, default=1, help="실패 작업 재시도 횟수(격리 실행)")
+    ap.add_argument("--timings", default=None, help="작업별 소요 시간 JSON 저장 경로")
+    ap.add_argument("--archive", default=None, help="보고서 보관함 경로(시설/문서번호/개정/기간별 보관)")
+    args = ap.parse_args(argv)
+
+    jobs = plan_jobs(load_records(args.input), _parse_variants(args.variants, ["kr_1p"]))
+    print(f"{len(jobs)} jobs · {args.workers} workers → {args.out}")
+    t0 = time.perf_counter()
+    results = run_batch(jobs, args.out, max(1, args.workers), max(0, args.retries), archive_dir=args.archive)
+    summary = _summary(results, time.perf_counter() - t0)
+    print(json.dumps(summary, ensure_ascii=False))
+
+    if args.timings:
+        with open(args.timings, "w", encoding="utf-8") as f:
+            json.dump(dict(summary=summary, jobs=[
+                dict(job_id=r.job_id, variant=r.variant, ok=r.ok, seconds=round(r.seconds, 4),
+                     attempt=r.attempt, error=r.error) for r in results
+            ]), f, ensure_ascii=False, indent=2)
+    return 0 if summary["failed"] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+"""
+파이프라인 성능 벤치마크(메트릭 → payload → 차트 → PDF).
+
+사용 예:
+    python bench.py                                        # 전체 실행, 결과 표 출력
+    python bench.py --quick --save bench_baseline.json     # 기준(baseline) 저장
+    python bench.py --quick --compare bench_baseline.json  # 기준 대비 회귀 검사(회귀 시 종료 코드 1)
+    python bench.py --filter pdf_kr --repeat 7 --json result.json
+
+측정 항목(케이스마다)
+- wall_ms / cpu_ms: 반복 실행의 중앙값(첫 1회는 준비 실행으로 제외)
+- peak_rss_mb: 케이스를 실행한 프로세스의 최대 RSS(기본: 케이스마다 새 프로세스)
+- out_bytes: 출력 크기(PNG/PDF bytes, payload 는 JSON 직렬화 크기)
+
+입력은 seed 고정 합성 데이터(구역 수 × 이력 길이). 차트 PNG 메모 캐시는 반복마다 r_max 를
+아주 조금 바꿔 비켜 간다(매번 실제 래스터화/조판 비용 측정).
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+
+try:
+    import resource
+except ImportError:   # Windows: RSS 측정 생략
+    resource = None
+
+BENCH_VERSION = 1
+
+# 케이스 행렬: (구역 수, 이력 일수)
+FULL_MATRIX = dict(
+    payload=[(z, d) for z in (2, 20, 100, 300) for d in (0, 7, 30)],
+    chart=[(2, d) for d in (0, 7, 30)],
+    pdf=[(z, d) for z in (2, 100, 300) for d in (0, 7)],
+)
+QUICK_MATRIX = dict(
+    payload=[(2, 7), (100, 7)],
+    chart=[(2, 0), (2, 7)],
+    pdf=[(2, 7), (100, 7)],
+)
+
+# -----------------------------
+# 합성 입력
+# -----------------------------
+def make_metrics(n_zones: int, history_days: float, seed: int = 0) -> Dict[str, Any]:
+    """구역 n_zones 개(열 배열 표) + 1분 간격 이력 history_days 일 → load_latest_metrics 형식 dict."""
+    import numpy as np
+    from rules import fill_rules, get_rule_engine
+    from simstream import zone_names
+
+    rng = np.random.default_rng(seed)
+    names = zone_names(n_zones)
+    zones = {
+        "name": names,
+        "risk": np.round(rng.uniform(10, 90, n_zones), 1),
+        "shock_24h": rng.integers(0, 10, n_zones).astype(np.float64),
+        "exposure_7d": rng.uniform(0, 0.5, n_zones),
+        "util": rng.uniform(0.4, 0.95, n_zones),
+        "do": rng.normal(7.0, 0.8, n_zones),
+        "temp": rng.normal(17.0, 1.5, n_zones),
+        "ph": rng.normal(7.85, 0.12, n_zones),
+        "sal": rng.normal(31.0, 1.5, n_zones),
+    }
+    m: Dict[str, Any] = dict(zones=zones, causes=[("산소량 저하", 0.52), ("pH 하락", 0.31), ("물 온도 상승", 0.17)])
+    fill_rules(m, get_rule_engine())
+    if history_days > 0:
+        t1 = 1770681600.0
+        ts = np.arange(t1 - history_days * 86400, t1, 60.0)
+        base = 45 + 20 * np.sin(np.linspace(0, 6 * np.pi, ts.size))
+        m["risk_history"] = (ts, np.clip(base + rng.normal(0, 5, ts.size), 0, 100))
+    return m
+
+def _payload(n_zones: int, history_days: float) -> Dict[str, Any]:
+    from common import DocMeta, build_report_payload
+    meta = DocMeta(facility_name="벤치마크 시설", report_period="2026-02-10 ~ 2026-02-16")
+    return build_report_payload(make_metrics(n_zones, history_days), meta)
+
+def _nudge(payload: Dict[str, Any], i: int) -> Dict[str, Any]:
+    # 차트 메모 캐시 키만 바뀌도록 r_max 를 표시 정밀도 아래로 변경
+    p = dict(payload)
+    p["r_max"] = float(payload["r_max"]) + i * 1e-7
+    return p
+
+# -----------------------------
+# 케이스 정의: 이름 → (준비 함수 → 측정 함수(i) )
+# -----------------------------
+def _case_metrics(scenario: str) -> Callable[[int], Any]:
+    from demo_data import load_latest_metrics
+    return lambda i: load_latest_metrics(scenario)
+
+def _case_payload(n_zones: int, days: float) -> Callable[[int], Any]:
+    from common import DocMeta, build_report_payload
+    m = make_metrics(n_zones, days)
+    meta = DocMeta(facility_name="벤치마크 시설", report_period="2026-02-10 ~ 2026-02-16")
+    return lambda i: build_report_payload(m, meta)
+
+def _case_chart(n_zones: int, days: float) -> Callable[[int], Any]:
+    from charts import make_7d_trend_png
+    m = make_metrics(n_zones, days)
+    r_max = float(max(m["zones"]["risk"]))
+    hist = m.get("risk_history")
+    return lambda i: make_7d_trend_png(r_max + i * 1e-7, hist)
+
+def _case_pdf(variant: str, n_zones: int, days: float) -> Callable[[int], Any]:
+    from reports import VARIANTS
+    module, func, kwargs, _ = VARIANTS[variant]
+    fn = getattr(importlib.import_module(module), func)
+    payload = _payload(n_zones, days)
+    return lambda i: fn(payload=_nudge(payload, i), **kwargs)
+
+def plan_cases(quick: bool = False) -> List[Dict[str, Any]]:
+    from demo_data import DEMO_SCENARIOS
+    from reports import VARIANTS
+    mx = QUICK_MATRIX if quick else FULL_MATRIX
+    cases: List[Dict[str, Any]] = []
+    for sc in (DEMO_SCENARIOS[:2] if quick else DEMO_SCENARIOS):
+        cases.append(dict(name=f"metrics/load_latest_metrics/{sc}", kind="metrics", args=[sc]))
+    for z, d in mx["payload"]:
+        cases.append(dict(name=f"payload/build_report_payload/z{z}/h{d}d", kind="payload", args=[z, d]))
+    for z, d in mx["chart"]:
+        cases.append(dict(name=f"chart/make_7d_trend_png/h{d}d", kind="chart", args=[z, d]))
+    for v, (module, func, _, _) in VARIANTS.items():
+        for z, d in mx["pdf"]:
+            cases.append(dict(name=f"pdf/{func}/{v}/z{z}/h{d}d", kind="pdf", args=[v, z, d]))
+    return cases
+
+_CASE_KINDS: Dict[str, Callable[..., Callable[[int], Any]]] = {
+    "metrics": _case_metrics, "payload": _case_payload, "chart": _case_chart, "pdf": _case_pdf,
+}
+
+# -----------------------------
+# 실행
+# -----------------------------
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: bytes
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def _out_bytes(out: Any) -> int:
+    if isinstance(out, (bytes, bytearray)):
+        return len(out)
+    return len(json.dumps(out, ensure_ascii=False, default=lambda o: getattr(o, "tolist", lambda: str(o))()).encode("utf-8"))
+
+def run_case(case: Dict[str, Any], repeat: int = 5) -> Dict[str, Any]:
+    """케이스 1개: 준비 → 준비 실행 1회(제외) → repeat 회 측정."""
+    fn = _CASE_KINDS[case["kind"]](*case["args"])
+    out = fn(0)
+    walls: List[float] = []
+    cpus: List[float] = []
+    for i in range(1, repeat + 1):
+        t0, c0 = time.perf_counter(), time.process_time()
+        out = fn(i)
+        walls.append(time.perf_counter() - t0)
+        cpus.append(time.process_time() - c0)
+    return dict(
+        name=case["name"], repeat=repeat,
+        wall_ms=round(statistics.median(walls) * 1000, 3),
+        wall_min_ms=round(min(walls) * 1000, 3),
+        cpu_ms=round(statistics.median(cpus) * 1000, 3),
+        peak_rss_mb=_peak_rss_mb(),
+        out_bytes=_out_bytes(out),
+    )
+
+def _run_isolated(case: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    # 케이스마다 새 프로세스: import/캐시/최대 RSS 가 앞 케이스의 영향을 받지 않음
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as ex:
+        return ex.submit(run_case, case, repeat).result()
+
+def run_suite(cases: List[Dict[str, Any]], repeat: int = 5, isolate: bool = True, log=print) -> Dict[str, Any]:
+    from charts import CHART_ENGINE
+    from common import TEMPLATE_VERSION
+    results: Dict[str, Dict[str, Any]] = {}
+    for case in cases:
+        try:
+            r = _run_isolated(case, repeat) if isolate else run_case(case, repeat)
+        except Exception as e:
+            r = dict(name=case["name"], error=f"{type(e).__name__}: {e}")
+        results[case["name"]] = r
+        if log:
+            log(_fmt_row(r))
+    return dict(
+        meta=dict(bench_version=BENCH_VERSION, python=platform.python_version(), platform=platform.platform(),
+                  machine=platform.machine(), cpu_count=os.cpu_count(), isolate=isolate, repeat=repeat,
+                  template_version=TEMPLATE_VERSION, chart_engine=CHART_ENGINE,
+                  created=time.strftime("%Y-%m-%dT%H:%M:%S")),
+        cases=results,
+    )
+
+def _fmt_row(r: Dict[str, Any]) -> str:
+    if "error" in r:
+        return f"{r['name']:<52} ERROR {r['error']}"
+    rss = "-" if r.get("peak_rss_mb") is None else f"{r['peak_rss_mb']:.0f}MB"
+    return (f"{r['name']:<52} {r['wall_ms']:>9.1f} ms  cpu {r['cpu_ms']:>9.1f} ms  "
+            f"rss {rss:>6}  out {r['out_bytes']:>9,d} B")
+
+# -----------------------------
+# 기준 비교
+# -----------------------------
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25,
+            min_delta_ms: float = 5.0, rss_tolerance: float = 0.25,
+            partial: bool = False) -> Tuple[List[str], List[str]]:
+    """
+    기준 대비 회귀 판정 → (회귀 목록, 참고 목록).
+    - 시간: 중앙값이 기준 × (1 + tolerance) 초과이고 차이가 min_delta_ms 이상이면 회귀(작은 케이스의 잡음 제외)
+    - RSS: 기준 × (1 + rss_tolerance) 초과이면 회귀
+    - 출력 크기 변화(2% 초과, PDF 생성 시각 등 잡음 제외), 기준에 없는/사라진 케이스, 환경 차이는 참고로만 표시
+    - partial=True(--filter): 실행하지 않은 기준 케이스는 표시하지 않음
+    """
+    regressions: List[str] = []
+    notes: List[str] = []
+    bm, cm = baseline.get("meta", {}), current.get("meta", {})
+    for k in ("python", "machine", "cpu_count", "chart_engine", "isolate"):
+        if bm.get(k) != cm.get(k):
+            notes.append(f"environment differs: {k} {bm.get(k)!r} → {cm.get(k)!r}")
+    base_cases = baseline.get("cases", {})
+    for name, cur in current.get("cases", {}).items():
+        base = base_cases.get(name)
+        if base is None or "error" in base:
+            notes.append(f"new case (no baseline): {name}")
+            continue
+        if "error" in cur:
+            regressions.append(f"{name}: failed ({cur['error']})")
+            continue
+        for key in ("wall_ms", "cpu_ms"):
+            b, c = base[key], cur[key]
+            if c > b * (1 + tolerance) and c - b >= min_delta_ms:
+                regressions.append(f"{name}: {key} {b:.1f} → {c:.1f} (+{(c / b - 1) * 100:.0f}%)")
+        b, c = base.get("peak_rss_mb"), cur.get("peak_rss_mb")
+        if b and c and c > b * (1 + rss_tolerance):
+            regressions.append(f"{name}: peak_rss_mb {b:.0f} → {c:.0f}")
+        b, c = base.get("out_bytes") or 0, cur.get("out_bytes") or 0
+        if abs(c - b) > 0.02 * max(b, 1):
+            notes.append(f"{name}: out_bytes {base.get('out_bytes')} → {cur.get('out_bytes')}")
+    for name in ([] if partial else base_cases):
+        if name not in current.get("cases", {}):
+            notes.append(f"case not run: {name}")
+    return regressions, notes
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Bio-OS 파이프라인 성능 벤치마크")
+    ap.add_argument("--quick", action="store_true", help="작은 케이스 행렬(빠른 회귀 검사용)")
+    ap.add_argument("--filter", default=None, help="이름에 이 문자열이 포함된 케이스만")
+    ap.add_argument("--repeat", type=int, default=5, help="케이스당 측정 반복 수")
+    ap.add_argument("--inproc", action="store_true", help="한 프로세스에서 실행(빠름, RSS 는 누적 최대값)")
+    ap.add_argument("--save", default=None, help="결과를 기준(baseline) JSON 으로 저장")
+    ap.add_argument("--compare", default=None, help="기준 JSON 과 비교(회귀 시 종료 코드 1)")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="시간 허용 증가율(기본 0.25 = 25%%)")
+    ap.add_argument("--min-delta-ms", type=float, default=5.0, help="이보다 작은 시간 증가는 무시")
+    ap.add_argument("--json", default=None, help="결과 JSON 저장 경로")
+    args = ap.parse_args(argv)
+
+    cases = plan_cases(args.quick)
+    if args.filter:
+        cases = [c for c in cases if args.filter in c["name"]]
+    print(f"{len(cases)} cases · repeat {args.repeat} · {'in-process' if args.inproc else 'isolated'}")
+    result = run_suite(cases, repeat=max(1, args.repeat), isolate=not args.inproc)
+
+    for path in (args.json, args.save):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+    failed = [n for n, r in result["cases"].items() if "error" in r]
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions, notes = compare(result, baseline, args.tolerance, args.min_delta_ms,
+                                     partial=bool(args.filter))
+        for n in notes:
+            print(f"[note] {n}")
+        for r in regressions:
+            print(f"[REGRESSION] {r}")
+        print(f"{len(regressions)} regression(s) vs {args.compare} (tolerance {args.tolerance:.0%})")
+        return 1 if regressions or failed else 0
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
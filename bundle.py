@@ -0,0 +1,214 @@
+from __future__ import annotations
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Sequence, Union
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import atexit
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import zipfile
+
+from reports import VARIANTS, prepare_renderers, render_report, render_uncached, report_filename, report_key
+from render_cache import get_render_cache, payload_fingerprint
+from render_jobs import get_job_queue
+import spans
+
+# -----------------------------
+# 전체 보고서 묶음(ZIP) 내보내기
+# -----------------------------
+# 관리자 "전체 내려받기": 5종(KR 1p/3p, EN 1p/3p, 백서)을 동시에 렌더하고
+# 끝나는 순서대로 ZIP 에 바로 기록한다.
+# - 메모리: 기록을 마친 PDF 는 바로 놓는다 → 묶음 전체가 아니라 동시에 진행 중인 문서만큼
+# - 지연: 렌더가 병렬이면 합이 아니라 가장 느린 variant 근처
+# - 렌더 캐시 적중분은 렌더 없이 바로 기록, 새로 렌더한 결과는 공용 캐시에 넣는다(개별 버튼과 공유)
+#
+# 병렬 방식: 조판(reportlab)은 GIL 을 거의 놓지 않으므로 스레드로는 겹치지 않는다.
+# 코어가 2개 이상이면 프로세스 풀(spawn, 워커마다 렌더링 준비 1회)을 프로세스 공용으로 유지하고,
+# 1코어/BIOOS_BUNDLE_PROCS=0 이면 공용 작업 큐(스레드)로 렌더한다.
+
+ALL_VARIANTS = tuple(VARIANTS)
+BUNDLE_FILENAME = "Bio-OS_Reports_All.zip"
+MANIFEST_NAME = "manifest.json"
+
+# -----------------------------
+# 프로세스 공용 렌더 풀
+# -----------------------------
+_default_pool: Optional[ProcessPoolExecutor] = None
+_default_lock = threading.Lock()
+
+def _pool_size() -> int:
+    env = os.environ.get("BIOOS_BUNDLE_PROCS")
+    if env is not None:
+        return max(0, int(env))
+    return min(len(ALL_VARIANTS), os.cpu_count() or 1)
+
+def get_bundle_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    묶음 렌더용 프로세스 풀(처음 필요할 때 생성, 프로세스 공용).
+    - BIOOS_BUNDLE_PROCS: 워커 프로세스 수(기본 min(5, CPU 수)). 1 이하면 None → 작업 큐(스레드) 사용
+    """
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None and _pool_size() > 1:
+            _default_pool = ProcessPoolExecutor(max_workers=_pool_size(), initializer=prepare_renderers,
+                                                mp_context=multiprocessing.get_context("spawn"))
+        return _default_pool
+
+def _drop_pool(pool: ProcessPoolExecutor) -> None:
+    # 워커가 죽은 풀은 버리고 다음 호출에서 새로 만든다
+    global _default_pool
+    with _default_lock:
+        if _default_pool is pool:
+            _default_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+# -----------------------------
+# ZIP 기록
+# -----------------------------
+def write_bundle(payload: Dict[str, Any], out: Union[str, BinaryIO], variants: Sequence[str] = ALL_VARIANTS,
+                 progress: Optional[Callable[[int, int], None]] = None) -> List[Dict[str, Any]]:
+    """
+    variants 를 동시에 렌더해 완료 순서대로 out(경로 또는 바이너리 파일 객체)의 ZIP 에 기록한다.
+    - 마지막에 manifest.json(파일명/크기/sha256/완료 시각) 추가
+    - progress(완료 수, 전체 수): 문서 1건 기록마다 호출
+    - 반환: manifest 항목 목록(variants 순서)
+    """
+    unknown = [v for v in variants if v not in VARIANTS]
+    if unknown:
+        raise ValueError(f"unknown report variant(s): {', '.join(unknown)}")
+    variants = list(dict.fromkeys(variants))
+    cache = get_render_cache()
+    pool = get_bundle_pool()
+    t0 = time.perf_counter()
+    entries: Dict[str, Dict[str, Any]] = {}
+
+    # PDF 는 이미 압축돼 있어 deflate 이득이 거의 없음 → 저장만(STORED), manifest 만 압축
+    with spans.span("bundle.zip"), zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) as zf:
+        def add(variant: str, data: bytes, cached: bool) -> None:
+            name = report_filename(variant)
+            zf.writestr(name, data)
+            entries[variant] = dict(variant=variant, file=name, bytes=len(data),
+                                    sha256=hashlib.sha256(data).hexdigest(),
+                                    ready_s=round(time.perf_counter() - t0, 3), cached=cached)
+            if progress is not None:
+                progress(len(entries), len(variants))
+
+        inflight: Dict[Future, str] = {}
+        for v in variants:
+            if pool is None:
+                job = get_job_queue().submit(v, payload)
+                if job.status == "done":   # 이미 렌더된(캐시에 있는) 문서
+                    add(v, job.result(), cached=True)
+                else:
+                    inflight[job.future] = v
+                continue
+            data = cache.get(report_key(v, payload))
+            if data is not None:
+                add(v, data, cached=True)
+            else:
+                inflight[pool.submit(render_uncached, v, payload)] = v
+
+        lost: List[str] = []
+        for fut in as_completed(list(inflight)):
+            v = inflight.pop(fut)
+            try:
+                data = fut.result()
+            except BrokenProcessPool:
+                lost.append(v)
+                continue
+            if pool is not None:
+                cache.put(report_key(v, payload), data)
+            add(v, data, cached=False)
+            del data, fut   # 기록을 마친 문서는 바로 놓는다
+        if lost:
+            # 워커 프로세스가 죽은 경우: 풀을 버리고 남은 것은 이 프로세스에서 렌더
+            _drop_pool(pool)
+            for v in lost:
+                add(v, render_report(v, payload), cached=False)
+
+        manifest = [entries[v] for v in variants]
+        zf.writestr(MANIFEST_NAME, json.dumps(dict(generated_at=payload.get("generated_at"), files=manifest),
+                                              ensure_ascii=False, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+    return manifest
+
+# -----------------------------
+# 백그라운드 묶음 작업(앱용)
+# -----------------------------
+_tmp_paths: set = set()
+_tmp_lock = threading.Lock()
+
+@atexit.register
+def _remove_tmp() -> None:
+    with _tmp_lock:
+        for p in list(_tmp_paths):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+        _tmp_paths.clear()
+
+def bundle_key(payload: Dict[str, Any], variants: Sequence[str] = ALL_VARIANTS) -> str:
+    return f"{'+'.join(variants)}|{payload_fingerprint(payload)}"
+
+class BundleExport:
+    """
+    묶음 내보내기 1건. 생성 즉시 백그라운드 스레드에서 임시 ZIP 파일로 기록한다.
+    - ZIP 은 디스크에 두고, 내려받을 때 read() 로 읽는다(세션이 묶음 bytes 를 들고 있지 않음)
+    - BIOOS_BUNDLE_DIR: 임시 ZIP 위치(기본 시스템 임시 디렉터리)
+    """
+
+    def __init__(self, payload: Dict[str, Any], variants: Sequence[str] = ALL_VARIANTS):
+        self.variants = tuple(variants)
+        self.key = bundle_key(payload, self.variants)
+        self.total = len(self.variants)
+        self.completed = 0
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.manifest: List[Dict[str, Any]] = []
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        fd, self.path = tempfile.mkstemp(prefix="bioos-bundle-", suffix=".zip",
+                                         dir=os.environ.get("BIOOS_BUNDLE_DIR") or None)
+        os.close(fd)
+        with _tmp_lock:
+            _tmp_paths.add(self.path)
+        threading.Thread(target=self._run, args=(payload,), name="bioos-bundle", daemon=True).start()
+
+    def _run(self, payload: Dict[str, Any]) -> None:
+        try:
+            self.manifest = write_bundle(payload, self.path, self.variants, progress=self._progress)
+            self.status = "done"
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.status = "failed"
+        finally:
+            self.finished_at = time.time()
+
+    def _progress(self, completed: int, total: int) -> None:
+        self.completed = completed
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def elapsed(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+    def size(self) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def read(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def discard(self) -> None:
+        with _tmp_lock:
+            _tmp_paths.discard(self.path)
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -1,31 +1,130 @@
 from __future__ import annotations
-from typing import List
+from typing import Any, Dict, Optional, Sequence, Tuple
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
 import io
-import matplotlib.pyplot as plt
+import os
+import threading
+import numpy as np
 
-def make_7d_trend_png(risk_max: float) -> bytes:
+from downsample import lttb
+from spans import traced
+
+# 인쇄/화면용 최대 점 수: 이력 길이와 무관하게 렌더링 시간·PNG 크기를 일정하게 유지
+TREND_MAX_POINTS = 600
+
+# 보고서 차트 엔진(배포별 선택)
+# - "matplotlib": PNG 래스터 이미지(기본)
+# - "reportlab" : reportlab.graphics 벡터 Drawing(charts_rl) — matplotlib 불필요, PDF 용량 감소
+CHART_ENGINE = os.environ.get("BIOOS_CHART_ENGINE", "matplotlib").strip().lower()
+
+# 한글 글꼴 후보(앞에서부터 우선). 없으면 matplotlib 기본 글꼴
+_KR_FONT_CANDIDATES = (
+    "NanumGothic", "NanumBarunGothic", "Malgun Gothic", "AppleGothic",
+    "Noto Sans CJK KR", "Noto Sans KR", "Source Han Sans KR", "UnDotum",
+)
+
+@lru_cache(maxsize=1)
+def korean_font_family() -> Optional[str]:
+    """설치된 한글 글꼴을 프로세스당 1회만 탐색."""
+    from matplotlib import font_manager
+    installed = {f.name for f in font_manager.fontManager.ttflist}
+    for name in _KR_FONT_CANDIDATES:
+        if name in installed:
+            return name
+    return None
+
+def _demo_series(risk_max: float) -> Tuple[np.ndarray, np.ndarray]:
+    # 간단한 형태의 추세(근거용): 현재 위험을 기준으로 완만한 변동을 생성
+    factors = np.array([0.60, 0.70, 0.80, 0.90, 0.85, 0.75, 1.00])
+    return np.arange(7, dtype=np.float64), np.clip(float(risk_max) * factors, 0.0, 100.0)
+
+def trend_series(risk_max: float, history: Optional[Sequence[Any]] = None,
+                 max_points: int = TREND_MAX_POINTS) -> Tuple[np.ndarray, np.ndarray, bool]:
     """
-    데모용 7일 추세 그래프(PNG bytes).
-    - Streamlit Cloud 환경에서도 안전하게 BytesIO로만 처리
+    추세 그래프에 그릴 (x[일], y[점수], 실측 여부).
+    - history=(ts[epoch 초], risk) 가 있으면 마지막 시각 기준 경과 일수로 변환 후 LTTB 다운샘플링
+    - 없으면 데모 곡선
     """
-    # 간단한 형태의 추세(근거용): 현재 위험을 기준으로 완만한 변동을 생성
-    base = float(risk_max)
-    vals = [
-        max(0.0, min(100.0, base*0.60)),
-        max(0.0, min(100.0, base*0.70)),
-        max(0.0, min(100.0, base*0.80)),
-        max(0.0, min(100.0, base*0.90)),
-        max(0.0, min(100.0, base*0.85)),
-        max(0.0, min(100.0, base*0.75)),
-        max(0.0, min(100.0, base)),
-    ]
-
-    fig = plt.figure()
-    plt.plot(vals)
-    plt.title("7일 전체 위험 점수 추세(데모)")
-    plt.xlabel("일")
-    plt.ylabel("점수")
+    if history is not None and len(history[0]) > 0:
+        ts = np.asarray(history[0], dtype=np.float64)
+        x = (ts - ts[-1]) / 86400.0
+        x, y = lttb(x, history[1], max_points)
+        return x, y, True
+    x, y = _demo_series(risk_max)
+    return x, y, False
+
+# -----------------------------
+# PNG 메모 캐시(입력 시계열 해시 → PNG bytes)
+# -----------------------------
+_PNG_CACHE_MAX = 64
+_png_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_png_lock = threading.Lock()
+_png_stats = dict(hits=0, misses=0)
+
+def _series_key(kind: str, risk_max: float, history: Optional[Sequence[Any]]) -> str:
+    h = hashlib.sha256(f"{kind}|{float(risk_max)!r}|".encode("utf-8"))
+    if history is not None:
+        for arr in history[:2]:
+            h.update(np.ascontiguousarray(arr, dtype=np.float64).tobytes())
+            h.update(b"|")
+    return h.hexdigest()
+
+def _memo(key: str, render) -> bytes:
+    with _png_lock:
+        png = _png_cache.get(key)
+        if png is not None:
+            _png_cache.move_to_end(key)
+            _png_stats["hits"] += 1
+            return png
+        _png_stats["misses"] += 1
+    png = render()
+    with _png_lock:
+        _png_cache[key] = png
+        while len(_png_cache) > _PNG_CACHE_MAX:
+            _png_cache.popitem(last=False)
+    return png
+
+def chart_cache_stats() -> Dict[str, int]:
+    with _png_lock:
+        return dict(_png_stats, entries=len(_png_cache))
+
+# -----------------------------
+# 차트
+# -----------------------------
+@traced("chart.rasterize")
+def _render_trend_png(x: np.ndarray, y: np.ndarray, real: bool) -> bytes:
+    # pyplot(전역 상태 머신)을 쓰지 않는다: Figure + Agg 캔버스를 호출마다 따로 만들어
+    # 여러 세션이 동시에 차트를 그려도 서로 간섭하지 않게 한다.
+    # matplotlib 은 PNG 경로에서만 import(reportlab 엔진 배포에서는 로드되지 않음)
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.plot(x, y)
+    family = korean_font_family()
+    font = {"fontfamily": family} if family else {}
+    ax.set_title("7일 전체 위험 점수 추세" if real else "7일 전체 위험 점수 추세(데모)", **font)
+    ax.set_xlabel("일(마지막 측정 기준)" if real else "일", **font)
+    ax.set_ylabel("점수", **font)
+    if real:
+        ax.set_ylim(0, 100)
     buf = io.BytesIO()
-    plt.savefig(buf, format="png", bbox_inches="tight")
-    plt.close(fig)
+    fig.savefig(buf, format="png", bbox_inches="tight")
     return buf.getvalue()
+
+@traced("chart.trend_png")
+def make_7d_trend_png(risk_max: float, history: Optional[Sequence[Any]] = None) -> bytes:
+    """
+    7일 추세 그래프(PNG bytes).
+    - history(ts, risk) 가 있으면 실제 이력, 없으면 데모 곡선
+    - 같은 입력이면 래스터화 없이 캐시된 PNG 반환
+    - Streamlit Cloud 환경에서도 안전하게 BytesIO로만 처리
+    """
+    def render() -> bytes:
+        x, y, real = trend_series(risk_max, history)
+        return _render_trend_png(x, y, real)
+    return _memo(_series_key("trend7d", risk_max, history), render)
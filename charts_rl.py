@@ -0,0 +1,56 @@
+from __future__ import annotations
+from typing import Any, Optional, Sequence
+
+from reportlab.graphics.shapes import Drawing, String, Group, Rect
+from reportlab.graphics.charts.lineplots import LinePlot
+from reportlab.lib import colors
+
+from charts import trend_series
+from pdf_resources import PDF_FONT
+from spans import traced
+
+# matplotlib 기본 색상(C0)과 맞춰 두 엔진의 출력이 같은 모양이 되게 한다
+_LINE_COLOR = colors.HexColor("#1F77B4")
+
+@traced("chart.trend_drawing")
+def make_7d_trend_drawing(risk_max: float, history: Optional[Sequence[Any]] = None,
+                          width: float = 446.4, height: float = 187.2) -> Drawing:
+    """
+    7일 추세 그래프(reportlab 벡터 Drawing flowable).
+    - make_7d_trend_png 와 같은 데이터/제목/축 이름, PNG 인코딩·디코딩 없이 PDF에 직접 그림
+    - 기본 크기는 보고서 이미지 영역(6.2 × 2.6 inch)
+    """
+    x, y, real = trend_series(risk_max, history)
+
+    d = Drawing(width, height)
+    left, bottom, top = 44.0, 30.0, 20.0
+    title = "7일 전체 위험 점수 추세" if real else "7일 전체 위험 점수 추세(데모)"
+    d.add(String(width / 2, height - 13, title, fontName=PDF_FONT, fontSize=10, textAnchor="middle"))
+
+    lp = LinePlot()
+    lp.x, lp.y = left, bottom
+    lp.width, lp.height = width - left - 12, height - bottom - top
+    lp.data = [list(zip(x.tolist(), y.tolist()))]
+    lp.lines[0].strokeColor = _LINE_COLOR
+    lp.lines[0].strokeWidth = 1.2
+    lp.joinedLines = 1
+
+    xa, ya = lp.xValueAxis, lp.yValueAxis
+    xa.valueMin, xa.valueMax = float(x.min()), float(x.max())
+    if real:
+        ya.valueMin, ya.valueMax, ya.valueStep = 0.0, 100.0, 20.0
+    for ax in (xa, ya):
+        ax.labels.fontName = PDF_FONT
+        ax.labels.fontSize = 7.5
+        ax.strokeColor = colors.black
+    xa.labelTextFormat = "%g"
+    ya.labelTextFormat = "%g"
+    d.add(Rect(lp.x, lp.y, lp.width, lp.height, strokeColor=colors.black, strokeWidth=0.6, fillColor=None))
+    d.add(lp)
+
+    xlabel = "일(마지막 측정 기준)" if real else "일"
+    d.add(String(lp.x + lp.width / 2, 4, xlabel, fontName=PDF_FONT, fontSize=8.5, textAnchor="middle"))
+    ylabel = Group(String(0, 0, "점수", fontName=PDF_FONT, fontSize=8.5, textAnchor="middle"))
+    ylabel.transform = (0, 1, -1, 0, 12, lp.y + lp.height / 2)   # 90도 회전
+    d.add(ylabel)
+    return d
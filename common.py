@@ -1,7 +1,14 @@
 from __future__ import annotations
 from dataclasses import dataclass
+import re
 from datetime import datetime
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, Optional, Tuple
+
+from spans import traced
+from zones import zone_rollup, zones_from_metrics
+
+# 보고서 레이아웃/문구를 바꾸면 올린다 → 렌더 캐시/정적 템플릿이 자동으로 무효화됨
+TEMPLATE_VERSION = "2026.02-2"
 
 def risk_label_kr(score: float) -> str:
     if score < 40: return "정상"
@@ -29,10 +36,28 @@ class DocMeta:
     rev_date: str = datetime.now().strftime("%Y-%m-%d")
     rev_desc: str = "최초 발행"
 
+def parse_report_period(text: str) -> Optional[Tuple[float, float]]:
+    """
+    "2026-02-10 ~ 2026-02-16" → (시작 epoch 초, 종료일 다음날 0시 epoch 초).
+    - 날짜 2개를 찾지 못하면 None
+    """
+    days = re.findall(r"\d{4}-\d{2}-\d{2}", text or "")
+    if len(days) < 2:
+        return None
+    try:
+        t0 = datetime.strptime(days[0], "%Y-%m-%d").timestamp()
+        t1 = datetime.strptime(days[1], "%Y-%m-%d").timestamp() + 86400.0
+    except ValueError:
+        return None
+    return (t0, t1) if t1 > t0 else None
+
+@traced("payload.build")
 def build_report_payload(m: Dict[str, Any], meta: DocMeta) -> Dict[str, Any]:
-    la, lb = m["loop_a"], m["loop_b"]
-    r_max = float(max(la["risk"], lb["risk"]))
-    culprit = "A구역" if la["risk"] >= lb["risk"] else "B구역"
+    # 구역 수 N 은 고정되지 않음: 열 배열 표 + 배열 축약으로 시설 전체 값 계산
+    zones = zones_from_metrics(m)
+    roll = zone_rollup(zones)
+    r_max = roll["r_max"]
+    culprit = roll["culprit"]
     status = risk_label_kr(r_max)
 
     causes_pairs = m.get("causes", [])
@@ -40,11 +65,12 @@ def build_report_payload(m: Dict[str, Any], meta: DocMeta) -> Dict[str, Any]:
         causes_pairs = [("특이 이상 없음", 1.0)]
     causes_top = causes_pairs[:3]
     actions = m.get("actions", [])
-    p1 = actions[0][1] if actions else "운영 조건 점검"
+    # 최우선 조치: 첫 P1 조치(없으면 가장 앞선 조치)
+    p1 = next((a[1] for a in actions if a[0] == "P1"), actions[0][1] if actions else "운영 조건 점검")
 
-    shock = int(la["shock_24h"] + lb["shock_24h"])
-    exposure = float(max(la["exposure_7d"], lb["exposure_7d"])) * 100.0
-    util = float(max(la["util"], lb["util"])) * 100.0
+    shock = roll["shock_24h"]
+    exposure = roll["exposure_7d"] * 100.0
+    util = roll["util"] * 100.0
 
     if r_max >= 75:
         stage = "즉시 증설 검토"
@@ -69,7 +95,7 @@ def build_report_payload(m: Dict[str, Any], meta: DocMeta) -> Dict[str, Any]:
         "util_pct": util,
         "expansion_stage": stage,
         "evidence": m.get("evidence", []),
-        "loop_a": la,
-        "loop_b": lb,
+        "zones": zones,   # {"name", "label", "risk", "shock_24h", "exposure_7d", "util"} (열 배열)
+        "risk_history": m.get("risk_history"),   # (ts, risk) 실측 이력(없으면 None → 데모 추세)
     }
     return payload
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from risk_engine import score_zones
+
+# -----------------------------
+# 데모 데이터 (Seed-M1 실제 DB 연동 전)
+# -----------------------------
+# 콘솔(app.py)과 벤치마크(bench.py)가 함께 쓰므로 Streamlit 에 의존하지 않는다.
+
+DEMO_SCENARIOS = ("일반", "산소량 급락", "물 흐름 저하", "여과 부담 증가")
+
+def load_latest_metrics(scenario: str = "일반") -> dict:
+    # 기본값(일반)
+    loop_a = dict(shock_24h=1, exposure_7d=0.18, util=0.74, do=7.1, temp=16.7, ph=7.82, sal=31.1)
+    loop_b = dict(shock_24h=0, exposure_7d=0.12, util=0.61, do=7.4, temp=16.6, ph=7.88, sal=31.0)
+
+    if scenario == "산소량 급락":
+        loop_a.update(dict(shock_24h=9, exposure_7d=0.48, util=0.92, do=5.3, temp=16.8, ph=7.68, sal=31.2))
+        loop_b.update(dict(shock_24h=0, exposure_7d=0.05, util=0.38, do=7.7, temp=16.6, ph=7.92, sal=31.0))
+        causes = [("산소량 급락", 0.52), ("출렁임 증가", 0.31), ("설비 사용률 상승", 0.17)]
+    elif scenario == "물 흐름 저하":
+        loop_a.update(dict(shock_24h=2, exposure_7d=0.28, util=0.88, do=6.6, temp=16.7, ph=7.74, sal=31.1))
+        loop_b.update(dict(shock_24h=1, exposure_7d=0.12, util=0.62, do=7.2, temp=16.6, ph=7.88, sal=31.0))
+        causes = [("물 흐름 저하", 0.46), ("설비 사용률 상승", 0.29), ("산소량 변동", 0.25)]
+    elif scenario == "여과 부담 증가":
+        loop_a.update(dict(shock_24h=1, exposure_7d=0.22, util=0.84, do=6.9, temp=16.8, ph=7.55, sal=31.2))
+        loop_b.update(dict(shock_24h=0, exposure_7d=0.15, util=0.66, do=7.4, temp=16.6, ph=7.83, sal=31.0))
+        causes = [("여과 부담 증가", 0.44), ("pH 하락", 0.33), ("설비 사용률 상승", 0.23)]
+    else:
+        causes = [("정상 변동", 0.41), ("운영 조건", 0.33), ("설비 사용률", 0.26)]
+
+    # 전체 위험 점수: 수질 측정값 → 기준 범위 대비 점수(위험 엔진)
+    zones = dict(loop_a=loop_a, loop_b=loop_b)
+    for name, score in score_zones(zones).items():
+        zones[name]["risk"] = score
+
+    # 근거/조치는 실측 윈도우 반영 뒤 규칙 표로 채운다(fill_rules)
+    return dict(zones=zones, causes=causes)
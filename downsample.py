@@ -0,0 +1,57 @@
+from __future__ import annotations
+from typing import Any, Tuple
+import numpy as np
+
+def _clean(x: Any, y: Any) -> Tuple[np.ndarray, np.ndarray]:
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ok = ~(np.isnan(x) | np.isnan(y))
+    if not np.all(ok):
+        x, y = x[ok], y[ok]
+    return x, y
+
+def lttb(x: Any, y: Any, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets 다운샘플링.
+    - 모양(최고/최저점)을 최대한 보존하면서 n_out 개 점으로 줄인다
+    - 첫/마지막 점은 항상 유지, x 는 오름차순이어야 함
+    - 입력 길이에 대해 O(n)
+    """
+    x, y = _clean(x, y)
+    n = x.size
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    # 가운데 점들을 n_out-2 개 버킷으로 나눔
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        s, e = edges[i], edges[i + 1]
+        # 다음 버킷 평균점(마지막 버킷은 마지막 점)
+        ns, ne = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        cx, cy = x[ns:ne].mean(), y[ns:ne].mean()
+        bx, by = x[s:e], y[s:e]
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = s + int(np.argmax(area))
+        idx[i + 1] = a
+    return x[idx], y[idx]
+
+def minmax_envelope(x: Any, y: Any, n_buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    버킷별 최소/최대값만 남기는 엔벨로프(최대 2 × n_buckets 점).
+    - 짧은 급변(스파이크)을 절대 놓치지 않아야 할 때 사용, 완전 벡터화
+    """
+    x, y = _clean(x, y)
+    n = x.size
+    if n <= 2 * n_buckets or n_buckets < 1:
+        return x, y
+    b = np.minimum((np.arange(n) * n_buckets) // n, n_buckets - 1)
+    starts = np.searchsorted(b, np.arange(n_buckets), side="left")
+    ends = np.append(starts[1:], n)
+    # (버킷, 값) 순 정렬 → 각 버킷의 첫 원소가 최소, 마지막 원소가 최대
+    order = np.lexsort((y, b))
+    i_min, i_max = order[starts], order[ends - 1]
+    keep = np.unique(np.concatenate([i_min, i_max]))
+    return x[keep], y[keep]
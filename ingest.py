@@ -0,0 +1,320 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+from contextlib import contextmanager
+import os
+import pathlib
+import queue
+import re
+import sqlite3
+import threading
+import math
+import time
+import numpy as np
+
+from risk_engine import CHANNELS
+
+# -----------------------------
+# 센서/DB 수집 어댑터
+# -----------------------------
+# load_latest_metrics 뒤에 붙는 수집 계층. 백엔드는 SensorSource 를 구현하고(기본: SQLite),
+# IngestPoller 가 구역별 high-water mark(마지막으로 읽은 행의 (시각, 행 키)) 이후의 행만 묶어서 가져온다.
+# - 구역마다 왕복하지 않는다: 구역별 키셋 조회를 UNION ALL 로 묶어 쿼리 1개(구역 300개 단위)로 조회
+# - 구역별 조회는 (zone, ts) 인덱스를 순서대로 읽다가 LIMIT 에서 멈춤 → 밀린 행 전체를 정렬하지 않음
+# - 결과는 구역별 (ts (T,), 값 (T, F)) NumPy 배열 → 위험 점수/윈도우 집계에 그대로 전달
+# - 연결은 풀에서 재사용(콘솔 여러 개가 동시에 폴링해도 연결 수는 pool_size 이하)
+
+INGEST_FIELDS: Tuple[str, ...] = CHANNELS + ("util",)
+
+# 워터마크: (마지막 시각, 같은 시각 안에서의 행 키). 키가 inf 면 "그 시각까지 모두 읽음"
+Watermark = Tuple[float, float]
+
+_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+# SQLite 바인딩 변수 제한(구버전 999, 구역당 3개)을 넘지 않도록 구역을 나눈다
+_ZONES_PER_QUERY = 300
+
+def _ident(name: str) -> str:
+    if not _IDENT.match(name):
+        raise ValueError(f"invalid SQL identifier: {name!r}")
+    return name
+
+class SensorSource:
+    """
+    센서/DB 어댑터 인터페이스.
+    - zones(): 구역 이름 목록
+    - fetch_since(watermarks, until, limit): 구역별 워터마크 (시각, 행 키) 초과 ~ until 이하 행
+        반환 ({구역: (ts (T,), 값 (T, F))}, {구역: 새 워터마크}, 잘림 여부) — 잘렸으면(limit 도달) 이어서 다시 호출
+    - 행 키는 같은 시각의 행을 구분하는 단조 증가 값(SQLite: rowid). 한 배치의 경계가 같은 시각 행들
+      사이에 걸려도 남은 행을 다음 호출에서 이어 읽는다
+    """
+
+    fields: Tuple[str, ...] = INGEST_FIELDS
+
+    def zones(self) -> List[str]:
+        raise NotImplementedError
+
+    def fetch_since(self, watermarks: Mapping[str, Watermark], until: float, limit: int
+                    ) -> Tuple[Dict[str, Tuple[np.ndarray, np.ndarray]], Dict[str, Watermark], bool]:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+    def close(self) -> None:
+        pass
+
+# -----------------------------
+# SQLite (로컬 기준 백엔드)
+# -----------------------------
+def init_sqlite(path: str, table: str = "readings", fields: Sequence[str] = INGEST_FIELDS) -> None:
+    """측정값 표 생성: (zone, ts, 필드...) + (zone, ts) 인덱스. WAL 모드(읽기/쓰기 동시 진행)."""
+    cols = ", ".join(f"{_ident(f)} REAL" for f in fields)
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {_ident(table)} (zone TEXT NOT NULL, ts REAL NOT NULL, {cols})")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_zone_ts ON {table} (zone, ts)")
+
+def append_sqlite(conn: sqlite3.Connection, zone: str, ts: Any, values: Mapping[str, Any],
+                  table: str = "readings") -> int:
+    """한 구역의 행 묶음 추가(executemany 1회, 커밋은 호출 측). 반환: 추가한 행 수."""
+    ts = np.asarray(ts, dtype=np.float64)
+    names = [_ident(f) for f in values]
+    cols = [np.asarray(values[f], dtype=np.float64) for f in values]
+    rows = zip([zone] * ts.size, ts.tolist(), *[c.tolist() for c in cols])
+    conn.executemany(
+        f"INSERT INTO {_ident(table)} (zone, ts{''.join(', ' + n for n in names)}) "
+        f"VALUES (?, ?{', ?' * len(names)})", rows)
+    return int(ts.size)
+
+class SqliteSource(SensorSource):
+    """
+    SQLite 측정값 표 어댑터.
+    - 읽기 전용 연결 풀(pool_size 개까지 생성, 반납 후 재사용)
+    - 워터마크 조회는 (zone, ts) 인덱스 범위 탐색으로 처리(인덱스 끝에 rowid 가 붙어 있어 (ts, rowid) 순서 그대로)
+    """
+
+    def __init__(self, path: str, table: str = "readings", fields: Sequence[str] = INGEST_FIELDS,
+                 pool_size: int = 4, timeout: float = 5.0):
+        self.path = path
+        self.table = _ident(table)
+        self.fields = tuple(_ident(f) for f in fields)
+        self.pool_size = max(1, int(pool_size))
+        self.timeout = float(timeout)
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._stats = dict(queries=0, rows=0, waits=0)
+
+    # --- 연결 풀 ---
+    def _connect(self) -> sqlite3.Connection:
+        uri = pathlib.Path(os.path.abspath(self.path)).as_uri() + "?mode=ro"
+        return sqlite3.connect(uri, uri=True, timeout=self.timeout, check_same_thread=False)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._opened < self.pool_size
+                if create:
+                    self._opened += 1
+                else:
+                    self._stats["waits"] += 1
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                conn = self._pool.get(timeout=self.timeout)
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._opened -= 1
+
+    # --- 조회 ---
+    def zones(self) -> List[str]:
+        with self.connection() as conn:
+            rows = conn.execute(f"SELECT DISTINCT zone FROM {self.table} ORDER BY zone").fetchall()
+        with self._lock:
+            self._stats["queries"] += 1
+        return [r[0] for r in rows]
+
+    def fetch_since(self, watermarks: Mapping[str, Watermark], until: float, limit: int = 50_000
+                    ) -> Tuple[Dict[str, Tuple[np.ndarray, np.ndarray]], Dict[str, Watermark], bool]:
+        """
+        구역별 (ts, rowid) > 워터마크 인 행을 키 순서로 최대 limit 행(구역마다 고르게 나눔).
+        - 구역별 하위 쿼리를 UNION ALL 로 묶어 쿼리 1개로 조회(구역이 많으면 _ZONES_PER_QUERY 단위로 나눔)
+        - 구역 하나라도 몫을 다 채우면 잘림 → 새 워터마크로 이어서 다시 호출
+        """
+        items = list(watermarks.items())
+        per_zone = max(1, int(limit) // max(1, len(items)))
+        cols = ", ".join(f"r.{f}" for f in self.fields)
+        sub = (f"SELECT * FROM (SELECT r.zone, r.ts, r.rowid, {cols} FROM {self.table} r "
+               f"WHERE r.zone = ?{{z}} AND (r.ts, r.rowid) > (?{{t}}, ?{{k}}) AND r.ts <= ?1 "
+               f"ORDER BY r.ts, r.rowid LIMIT ?2)")
+        rows: List[tuple] = []
+        with self.connection() as conn:
+            for i in range(0, len(items), _ZONES_PER_QUERY):
+                part = items[i:i + _ZONES_PER_QUERY]
+                sql = " UNION ALL ".join(sub.format(z=3 + 3 * j, t=4 + 3 * j, k=5 + 3 * j) for j in range(len(part)))
+                params: List[Any] = [float(until), per_zone]
+                for zone, (since, key) in part:
+                    params += [zone, float(since), float(key)]
+                rows.extend(conn.execute(sql, params).fetchall())
+        with self._lock:
+            self._stats["queries"] += (len(items) + _ZONES_PER_QUERY - 1) // _ZONES_PER_QUERY
+            self._stats["rows"] += len(rows)
+        got, keys = _group_rows(rows, len(self.fields))
+        truncated = any(ts.size >= per_zone for ts, _ in got.values())
+        return got, keys, truncated
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+            s["pool_open"] = self._opened
+        s["pool_size"] = self.pool_size
+        return s
+
+def _group_rows(rows: List[tuple], n_fields: int) -> Tuple[Dict[str, Tuple[np.ndarray, np.ndarray]], Dict[str, Watermark]]:
+    # [(zone, ts, rowid, 필드...)] → ({구역: (ts, (T, F))}, {구역: 마지막 (ts, rowid)}), 구역 안에서는 키 순서 유지
+    if not rows:
+        return {}, {}
+    zone = np.array([r[0] for r in rows], dtype=object)
+    num = np.array([r[1:] for r in rows], dtype=np.float64).reshape(len(rows), n_fields + 2)   # None → NaN
+    names, inv = np.unique(zone, return_inverse=True)
+    order = np.argsort(inv, kind="stable")
+    bounds = np.searchsorted(inv[order], np.arange(len(names) + 1))
+    out, keys = {}, {}
+    for k, name in enumerate(names):
+        sel = num[order[bounds[k]:bounds[k + 1]]]
+        out[str(name)] = (sel[:, 0], sel[:, 2:])
+        keys[str(name)] = (float(sel[-1, 0]), float(sel[-1, 1]))
+    return out, keys
+
+# -----------------------------
+# 어댑터 등록/생성
+# -----------------------------
+SOURCE_TYPES: Dict[str, Callable[[str], SensorSource]] = {
+    "sqlite": lambda target: SqliteSource(target),
+}
+
+def register_source(scheme: str, factory: Callable[[str], SensorSource]) -> None:
+    """다른 DB 어댑터 등록(예: register_source("postgres", PgSource))."""
+    SOURCE_TYPES[scheme] = factory
+
+def open_source(url: str) -> SensorSource:
+    """
+    "sqlite:///절대/경로.db", "sqlite:상대경로.db" 또는 파일 경로(.db/.sqlite) → 어댑터.
+    """
+    scheme, sep, target = url.partition(":")
+    if not sep or len(scheme) == 1:   # 경로만 주어진 경우(윈도우 드라이브 문자 포함)
+        scheme, target = "sqlite", url
+    if target.startswith("//"):
+        target = target[2:]
+    factory = SOURCE_TYPES.get(scheme)
+    if factory is None:
+        raise ValueError(f"unknown sensor source {scheme!r} (known: {sorted(SOURCE_TYPES)})")
+    return factory(target)
+
+# -----------------------------
+# 증분 폴링
+# -----------------------------
+class IngestPoller:
+    """
+    구역별 high-water mark 를 유지하며 새 행만 가져온다.
+    - 첫 폴링: 구역마다 backfill_sec(기본 7일) 이전부터
+    - 워터마크는 (시각, 행 키): 같은 시각의 행이 배치 경계에 걸리거나 나중에 들어와도 빠지지 않는다.
+      워터마크보다 이른 시각의 행이 나중에 들어오면 읽지 않는다(센서 시각은 구역 안에서 증가한다고 가정)
+    - 구역 목록은 zones_refresh_sec 마다 다시 읽음(새 구역 자동 추가)
+    """
+
+    def __init__(self, source: SensorSource, backfill_sec: float = 7 * 24 * 3600,
+                 batch_rows: int = 50_000, max_batches: int = 20, zones_refresh_sec: float = 60.0):
+        self.source = source
+        self.fields = tuple(source.fields)
+        self.backfill_sec = float(backfill_sec)
+        self.batch_rows = int(batch_rows)
+        self.max_batches = int(max_batches)
+        self.zones_refresh_sec = float(zones_refresh_sec)
+        self.watermarks: Dict[str, Watermark] = {}
+        self._latest: Dict[str, np.ndarray] = {}
+        self._zones: List[str] = []
+        self._zones_at = -np.inf
+        self._lock = threading.Lock()
+        self._stats = dict(polls=0, batches=0, rows=0)
+
+    def zones(self) -> List[str]:
+        with self._lock:
+            return list(self._refresh_zones())
+
+    def _refresh_zones(self) -> List[str]:
+        now = time.monotonic()
+        if now - self._zones_at >= self.zones_refresh_sec:
+            self._zones = self.source.zones()
+            self._zones_at = now
+        return self._zones
+
+    def poll(self, until: Optional[float] = None) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        워터마크 이후 ~ until 의 새 행을 가져오고 워터마크를 올린다.
+        - 반환: {구역: (ts (T,), 값 (T, F))} — 새 행이 있는 구역만(F 순서 = self.fields)
+        - 한 번에 batch_rows 행씩, 최대 max_batches 번(남은 행은 다음 폴링에)
+        """
+        until = time.time() if until is None else float(until)
+        with self._lock:
+            zones = self._refresh_zones()
+            start = until - self.backfill_sec
+            wm = {z: self.watermarks.get(z, (start, math.inf)) for z in zones}
+            parts: Dict[str, List[Tuple[np.ndarray, np.ndarray]]] = {}
+            for _ in range(self.max_batches):
+                got, keys, truncated = self.source.fetch_since(wm, until, self.batch_rows)
+                self._stats["batches"] += 1
+                for z, (ts, x) in got.items():
+                    parts.setdefault(z, []).append((ts, x))
+                wm.update(keys)
+                if not truncated:
+                    break
+            out = {}
+            for z, chunks in parts.items():
+                ts = np.concatenate([c[0] for c in chunks])
+                x = np.concatenate([c[1] for c in chunks])
+                out[z] = (ts, x)
+                self._latest[z] = _last_valid(x, self._latest.get(z))
+                self._stats["rows"] += int(ts.size)
+            self.watermarks.update({z: wm[z] for z in out})
+            self._stats["polls"] += 1
+        return out
+
+    def latest_zones(self) -> Dict[str, Dict[str, float]]:
+        """구역별 최신값 {구역: {필드: 값}} — 필드마다 가장 최근의 NaN 아닌 값."""
+        with self._lock:
+            return {z: {f: float(v) for f, v in zip(self.fields, row) if not np.isnan(v)}
+                    for z, row in self._latest.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+            s["zones"] = len(self._zones)
+        s.update(self.source.stats())
+        return s
+
+def _last_valid(x: np.ndarray, prev: Optional[np.ndarray]) -> np.ndarray:
+    # (T, F) → 필드별 마지막 NaN 아닌 값(없으면 이전 값 유지)
+    ok = ~np.isnan(x)
+    idx = x.shape[0] - 1 - np.argmax(ok[::-1], axis=0)
+    last = x[idx, np.arange(x.shape[1])]
+    has = ok.any(axis=0)
+    base = np.full(x.shape[1], np.nan) if prev is None else prev
+    return np.where(has, last, base)
@@ -0,0 +1,241 @@
+"""
+합성 센서 스트림 부하 시험(장비 용량 산정).
+
+사용 예:
+    python loadtest.py --zones 8 --rate 1000 --scenario 산소량 급락 --duration 1800
+    python loadtest.py --zones 200 --rate 1 --duration 86400 --tick 10 --report-every 3600 --variants kr_1p,kr_3p
+    python loadtest.py --zones 4 --rate 50 --duration 300 --realtime --sqlite /tmp/load.db --json load.json
+
+경로(tick 마다)
+  생성(simstream) → [SQLite 기록 → 워터마크 폴링(--sqlite)] → 수집(윈도우 집계 + 변화 감지)
+  → 메트릭(위험 점수/원인/규칙) → payload → 보고서 렌더(--report-every 마다, 캐시 없이)
+
+- 기본은 시뮬레이션 시각으로 가능한 한 빠르게 실행 → 처리량/배속(시뮬레이션 초 ÷ 실제 초)
+- --realtime: tick 을 실제 시각에 맞춰 실행 → tick 마감 대비 지연(lag)으로 장비가 따라가는지 확인
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import json
+import math
+import sys
+import time
+import numpy as np
+
+from common import DocMeta, build_report_payload
+from risk_engine import score_zones
+from simstream import SCENARIOS, SyntheticStream
+from window_agg import WindowedAggregator
+from shock_detector import ShockDetector
+from attribution import fill_causes
+from rules import fill_rules, get_rule_engine
+from reports import VARIANTS
+
+_ALL_VARIANTS = list(VARIANTS)
+# 시뮬레이션 시작 시각(결정적 출력을 위해 고정)
+SIM_START = 1770681600.0   # 2026-02-10 00:00 UTC
+
+STAGES = ("generate", "db_write", "db_poll", "ingest", "metrics", "payload", "render")
+
+class _Timer:
+    """단계별 소요 시간(초) 기록."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {s: [] for s in STAGES}
+
+    def run(self, stage: str, fn, *args, **kw):
+        t0 = time.perf_counter()
+        out = fn(*args, **kw)
+        self.samples[stage].append(time.perf_counter() - t0)
+        return out
+
+def _pct(xs: List[float], p: float) -> float:
+    if not xs:
+        return 0.0
+    s = sorted(xs)
+    return s[min(len(s) - 1, int(round(p * (len(s) - 1))))]
+
+def _ms(xs: List[float]) -> Dict[str, float]:
+    return dict(n=len(xs), p50_ms=round(_pct(xs, 0.50) * 1000, 2), p95_ms=round(_pct(xs, 0.95) * 1000, 2),
+                p99_ms=round(_pct(xs, 0.99) * 1000, 2), max_ms=round(max(xs) * 1000 if xs else 0.0, 2))
+
+class _SqlitePath:
+    """--sqlite: 생성 값을 DB에 기록하고 IngestPoller 로 다시 읽어 수집 단계에 넘긴다(실제 연동 경로)."""
+
+    def __init__(self, path: str, stream: SyntheticStream):
+        import sqlite3
+        from ingest import IngestPoller, SqliteSource, init_sqlite
+        init_sqlite(path)
+        self.stream = stream
+        self.conn = sqlite3.connect(path)
+        self.poller = IngestPoller(SqliteSource(path), backfill_sec=0.0, zones_refresh_sec=0.0)
+        self.poller.watermarks.update({z: (SIM_START - 1.0, math.inf) for z in stream.zones})
+        self._held: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def write(self, ts: np.ndarray, x: np.ndarray, util: np.ndarray) -> None:
+        from ingest import append_sqlite
+        for i, z in enumerate(self.stream.zones):
+            cols = {ch: x[:, i, j] for j, ch in enumerate(self.stream.channels)}
+            cols["util"] = util[:, i]
+            append_sqlite(self.conn, z, ts, cols)
+        self.conn.commit()
+
+    def poll(self, until: float):
+        # 폴링이 batch_rows × max_batches 에서 잘리면 구역마다 읽힌 길이가 다르다
+        # → 모든 구역에 도착한 시각까지만 넘기고 나머지는 다음 폴링 결과 앞에 붙인다
+        for z, (ts, v) in self.poller.poll(until).items():
+            if z in self._held:
+                ts, v = np.concatenate([self._held[z][0], ts]), np.concatenate([self._held[z][1], v])
+            self._held[z] = (ts, v)
+        zones = self.stream.zones
+        if any(z not in self._held or not self._held[z][0].size for z in zones):
+            return None
+        end = min(float(self._held[z][0][-1]) for z in zones)
+        cut = {}
+        for z in zones:
+            ts, v = self._held[z]
+            n = int(np.searchsorted(ts, end, side="right"))
+            cut[z] = (ts[:n], v[:n])
+            self._held[z] = (ts[n:], v[n:])
+        ts = cut[zones[0]][0]
+        nc = len(self.stream.channels)
+        x = np.stack([cut[z][1][:, :nc] for z in zones], axis=1)
+        util = np.stack([cut[z][1][:, nc] for z in zones], axis=1)
+        return ts, x, util
+
+def run_load(zones: int, rate_hz: float, scenario: str, duration: float, tick: float = 1.0,
+             report_every: float = 0.0, variants: Optional[List[str]] = None, seed: int = 0,
+             realtime: bool = False, sqlite_path: Optional[str] = None, onset_sec: float = 600.0, log=print) -> Dict[str, Any]:
+    """부하 시험 1회 실행 → 요약 dict."""
+    from reports import prepare_renderers, render_report
+    from render_cache import RenderCache
+
+    variants = variants or ["kr_1p"]
+    stream = SyntheticStream(zones=zones, rate_hz=rate_hz, scenario=scenario, seed=seed, start=SIM_START,
+                             onset_sec=onset_sec)
+    agg = WindowedAggregator(stream.zones)
+    shock = ShockDetector(stream.zones)
+    rules = get_rule_engine()
+    meta = DocMeta(facility_name="부하 시험", report_period="합성 스트림")
+    db = _SqlitePath(sqlite_path, stream) if sqlite_path else None
+    no_cache = RenderCache(max_bytes=0)
+    if report_every > 0:
+        prepare_renderers()
+
+    timer = _Timer()
+    e2e: List[float] = []
+    e2e_report: List[float] = []
+    lag: List[float] = []
+    n_ticks = int(np.ceil(duration / tick))
+    samples = 0
+    reports = 0
+    out_bytes = 0
+    next_report = report_every
+    payload: Dict[str, Any] = {}
+    m: Dict[str, Any] = {}
+    wall0 = time.perf_counter()
+
+    for k in range(n_ticks):
+        if realtime:
+            # tick k 의 데이터는 (k+1)·tick 시점에 모두 도착
+            wait = wall0 + (k + 1) * tick - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+
+        ts, x, util = timer.run("generate", stream.next, tick)
+        if ts.size == 0:
+            continue
+        t_start = time.perf_counter()
+        now = float(ts[-1])
+        if db is not None:
+            timer.run("db_write", db.write, ts, x, util)
+            got = timer.run("db_poll", db.poll, now)
+            if got is None:
+                continue
+            ts, x, util = got
+
+        def ingest() -> None:
+            agg.backfill(ts, x, util=util, dt=1.0 / rate_hz)
+            shock.update_batch(ts, x)
+        timer.run("ingest", ingest)
+
+        def metrics() -> Dict[str, Any]:
+            zs = stream.latest(x, util)
+            for name, score in score_zones(zs).items():
+                zs[name]["risk"] = score
+            m: Dict[str, Any] = dict(zones=zs, causes=[])
+            agg.fill_metrics(m, now)
+            shock.fill_metrics(m, now)
+            fill_causes(m, agg, now)
+            return fill_rules(m, rules)
+        m = timer.run("metrics", metrics)
+        payload = timer.run("payload", build_report_payload, m, meta)
+        e2e.append(time.perf_counter() - t_start)
+        samples += int(ts.size) * len(stream.zones)
+
+        el = now - SIM_START
+        if report_every > 0 and el >= next_report:
+            next_report += report_every
+            for v in variants:
+                pdf = timer.run("render", render_report, v, payload, cache=no_cache)
+                reports += 1
+                out_bytes += len(pdf)
+            e2e_report.append(time.perf_counter() - t_start)
+        if realtime:
+            lag.append(max(0.0, time.perf_counter() - (wall0 + (k + 2) * tick)))
+        if log and n_ticks >= 10 and (k + 1) % max(1, n_ticks // 10) == 0:
+            log(f"  {k + 1}/{n_ticks} ticks · {samples} samples · status {payload.get('status')} · r_max {payload.get('r_max', 0):.0f}")
+
+    wall = time.perf_counter() - wall0
+    busy = sum(sum(v) for v in timer.samples.values())
+    ingest_s = sum(timer.samples["ingest"]) + sum(timer.samples["db_write"]) + sum(timer.samples["db_poll"])
+    summary: Dict[str, Any] = dict(
+        scenario=scenario, zones=len(stream.zones), rate_hz=rate_hz, tick_s=tick, sim_s=duration,
+        realtime=realtime, sqlite=bool(db), seed=seed,
+        samples=samples, ticks=len(e2e), reports=reports, report_bytes=out_bytes,
+        wall_s=round(wall, 3), busy_s=round(busy, 3),
+        speedup=round(duration / busy, 2) if busy > 0 else None,
+        ingest_samples_per_s=round(samples / ingest_s) if ingest_s > 0 else None,
+        stages={s: _ms(v) for s, v in timer.samples.items() if v},
+        e2e_payload=_ms(e2e),
+        e2e_report=_ms(e2e_report),
+        final=dict(status=payload.get("status"), r_max=payload.get("r_max"),
+                   causes=payload.get("causes"), actions=m.get("actions", [])[:3]),
+    )
+    if realtime:
+        summary["lag"] = _ms(lag)
+        summary["kept_up"] = bool(lag) and _pct(lag, 0.95) == 0.0
+    return summary
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Bio-OS 합성 센서 스트림 부하 시험")
+    ap.add_argument("--zones", type=int, default=2, help="구역 수")
+    ap.add_argument("--rate", type=float, default=1.0, help="구역당 초당 샘플 수(Hz)")
+    ap.add_argument("--scenario", default="일반", choices=SCENARIOS)
+    ap.add_argument("--duration", type=float, default=3600.0, help="시뮬레이션 길이(초)")
+    ap.add_argument("--tick", type=float, default=1.0, help="수집/메트릭 갱신 주기(초)")
+    ap.add_argument("--report-every", type=float, default=600.0, help="보고서 렌더 주기(시뮬레이션 초, 0 = 렌더 안 함)")
+    ap.add_argument("--variants", default="kr_1p", help=f"쉼표 구분({', '.join(_ALL_VARIANTS)})")
+    ap.add_argument("--onset", type=float, default=600.0, help="고장 모드 시작 시각(시뮬레이션 초)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--realtime", action="store_true", help="실제 시각에 맞춰 실행(지연 측정)")
+    ap.add_argument("--sqlite", default=None, help="SQLite DB 경로: 기록 → 워터마크 폴링 경로까지 포함")
+    ap.add_argument("--json", default=None, help="요약 JSON 저장 경로")
+    args = ap.parse_args(argv)
+
+    variants = [v.strip() for v in args.variants.split(",") if v.strip()]
+    unknown = [v for v in variants if v not in _ALL_VARIANTS]
+    if unknown:
+        ap.error(f"unknown report variant(s): {', '.join(unknown)}")
+    print(f"{args.zones} zones × {args.rate:g} Hz · {args.scenario} · {args.duration:g}s (tick {args.tick:g}s)")
+    summary = run_load(args.zones, args.rate, args.scenario, args.duration, tick=args.tick,
+                       report_every=args.report_every, variants=variants, seed=args.seed,
+                       realtime=args.realtime, sqlite_path=args.sqlite, onset_sec=args.onset)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+    return 0 if not args.realtime or summary.get("kept_up") else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
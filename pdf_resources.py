@@ -0,0 +1,123 @@
+from __future__ import annotations
+from typing import Mapping, Optional
+from functools import lru_cache
+from types import MappingProxyType
+import threading
+
+from reportlab.lib import colors
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import TableStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+
+# -----------------------------
+# 프로세스 공용 PDF 리소스
+# -----------------------------
+# 글꼴 등록, ParagraphStyle, TableStyle 을 프로세스당 1회만 만들고 모든 보고서가 공유한다.
+# 스타일 묶음은 읽기 전용 매핑으로 반환한다. 공유 객체이므로 속성을 직접 바꾸지 말고,
+# 변형이 필요하면 ParagraphStyle(..., parent=공유 스타일) 로 새로 만들 것.
+
+PDF_FONT = "HYSMyeongJo-Medium"
+
+_font_lock = threading.Lock()
+_font_ready = False
+
+def register_fonts() -> None:
+    global _font_ready
+    if _font_ready:
+        return
+    with _font_lock:
+        if _font_ready:
+            return
+        try:
+            pdfmetrics.registerFont(UnicodeCIDFont(PDF_FONT))
+        except Exception:
+            pass
+        _font_ready = True
+
+register_fonts()
+
+@lru_cache(maxsize=1)
+def _sample():
+    return getSampleStyleSheet()
+
+@lru_cache(maxsize=None)
+def paragraph_styles(kind: str) -> Mapping[str, ParagraphStyle]:
+    """
+    보고서 종류별 문단 스타일(읽기 전용 매핑).
+    - "kr" / "en": title, h2, body
+    - "whitepaper": h1, h2, body
+    """
+    ss = _sample()
+    if kind in ("kr", "en"):
+        sfx = "" if kind == "kr" else "_en"
+        out = dict(
+            title=ParagraphStyle("title" + sfx, parent=ss["Heading1"], fontName=PDF_FONT, fontSize=18, leading=22, spaceAfter=12),
+            h2=ParagraphStyle("h2" + sfx, parent=ss["Heading2"], fontName=PDF_FONT, fontSize=13, leading=17, spaceBefore=10, spaceAfter=6),
+            body=ParagraphStyle("body" + sfx, parent=ss["BodyText"], fontName=PDF_FONT, fontSize=10.8, leading=15),
+        )
+    elif kind == "whitepaper":
+        out = dict(
+            h1=ParagraphStyle("h1", parent=ss["Heading1"], fontName=PDF_FONT, fontSize=18, leading=22),
+            h2=ParagraphStyle("h2", parent=ss["Heading2"], fontName=PDF_FONT, fontSize=13, leading=17),
+            body=ParagraphStyle("body", parent=ss["BodyText"], fontName=PDF_FONT, fontSize=10.8, leading=15),
+        )
+    else:
+        raise ValueError(f"unknown style kind: {kind}")
+    return MappingProxyType(out)
+
+# -----------------------------
+# 표 스타일
+# -----------------------------
+_GRID_COLOR = colors.HexColor("#CBD5E1")
+
+@lru_cache(maxsize=None)
+def label_grid_style(label_bg: str, font_size: float) -> TableStyle:
+    """첫 열(항목명)에 배경색이 있는 2열 표: 요약/핵심 지표/의사결정 흐름."""
+    return TableStyle([
+        ("FONTNAME",(0,0),(-1,-1),PDF_FONT),
+        ("FONTSIZE",(0,0),(-1,-1),font_size),
+        ("BACKGROUND",(0,0),(0,-1),colors.HexColor(label_bg)),
+        ("GRID",(0,0),(-1,-1),0.5,_GRID_COLOR),
+        ("VALIGN",(0,0),(-1,-1),"MIDDLE"),
+        ("LEFTPADDING",(0,0),(-1,-1),8),
+        ("RIGHTPADDING",(0,0),(-1,-1),8),
+        ("TOPPADDING",(0,0),(-1,-1),6),
+        ("BOTTOMPADDING",(0,0),(-1,-1),6),
+    ])
+
+@lru_cache(maxsize=None)
+def header_dark_style(font_size: float, center_from_col: Optional[int] = None) -> TableStyle:
+    """어두운 머리행 표: 구역 비교/개정 이력/용어집. center_from_col 부터 본문 가운데 정렬."""
+    cmds = [
+        ("FONTNAME",(0,0),(-1,-1),PDF_FONT),
+        ("FONTSIZE",(0,0),(-1,-1),font_size),
+        ("BACKGROUND",(0,0),(-1,0),colors.HexColor("#111827")),
+        ("TEXTCOLOR",(0,0),(-1,0),colors.white),
+        ("GRID",(0,0),(-1,-1),0.5,_GRID_COLOR),
+    ]
+    if center_from_col is not None:
+        cmds.append(("ALIGN",(center_from_col,1),(-1,-1),"CENTER"))
+    cmds += [
+        ("VALIGN",(0,0),(-1,-1),"MIDDLE"),
+        ("TOPPADDING",(0,0),(-1,-1),6),
+        ("BOTTOMPADDING",(0,0),(-1,-1),6),
+    ]
+    return TableStyle(cmds)
+
+# -----------------------------
+# 워밍업
+# -----------------------------
+_KR_SAMPLE = "가나다라마바사아자차카타파하 전체 위험 점수 0123456789 ABC abc"
+
+def warm_up() -> None:
+    """글꼴 등록 + 글꼴 폭 테이블 + 모든 스타일을 미리 생성(배치/서버 워커 시작 시 호출)."""
+    register_fonts()
+    pdfmetrics.stringWidth(_KR_SAMPLE, PDF_FONT, 10)
+    for kind in ("kr", "en", "whitepaper"):
+        paragraph_styles(kind)
+    for bg in ("#F2F4FF", "#F7F7F7"):
+        for size in (10.0, 10.5):
+            label_grid_style(bg, size)
+    header_dark_style(9.6)
+    header_dark_style(9.6, 2)
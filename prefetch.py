@@ -0,0 +1,166 @@
+from __future__ import annotations
+from typing import Dict, Any, Optional, Tuple
+import os
+import threading
+import time
+
+from render_cache import payload_fingerprint
+from render_jobs import RenderJobQueue, get_job_queue
+
+# -----------------------------
+# 보고서 사전 생성(prefetch)
+# -----------------------------
+# 대시보드가 갱신되면 사용자는 거의 항상 1페이지 요약을 바로 내려받는다.
+# 메트릭 스냅샷이나 제출 정보(사이드바)가 바뀌고 debounce 동안 더 바뀌지 않으면,
+# 자주 쓰는 보고서를 공용 작업 큐에 미리 넣어 둔다 → 다운로드 버튼이 즉시 뜬다.
+#
+# - 세션(owner)별로 마지막 입력만 유지: 입력 중 바뀐 이전 스냅샷은 렌더하지 않음
+# - CPU 예산: 사전 생성이 쓴 CPU 시간 비율을 cpu_budget 이하로 유지(렌더 후 쉬는 시간)
+# - 취소: cancel(owner) 또는 새 스냅샷 도착 시 남은 variant 는 건너뜀
+# - 사용자가 같은 보고서를 누르면 작업 큐에서 사전 생성 작업으로 합쳐짐
+
+class Prefetcher:
+    def __init__(self, queue: RenderJobQueue, variants: Tuple[str, ...] = ("kr_1p",),
+                 debounce_sec: float = 1.5, cpu_budget: float = 0.25):
+        self.queue = queue
+        self.variants = tuple(variants)
+        self.debounce_sec = float(debounce_sec)
+        self.cpu_budget = min(max(float(cpu_budget), 0.01), 1.0)
+        self._cv = threading.Condition()
+        self._pending: Dict[str, Tuple[float, int, Dict[str, Any]]] = {}   # owner -> (실행 시각, 세대, payload)
+        self._last: Dict[str, str] = {}                                    # owner -> 마지막 스냅샷 지문
+        self._gen: Dict[str, int] = {}                                     # owner -> 세대(취소/대체 판정)
+        self._not_before = 0.0                                             # CPU 예산상 다음 렌더 가능 시각
+        self._thread: Optional[threading.Thread] = None
+        self._stats = dict(scheduled=0, superseded=0, cancelled=0, started=0, rendered=0, failed=0,
+                           cpu_s=0.0, throttled_s=0.0)
+
+    # --- 공개 API ---
+    def schedule(self, owner: str, payload: Dict[str, Any]) -> bool:
+        """
+        스냅샷이 바뀌었으면 debounce 후 사전 생성을 예약(같으면 무시).
+        - 반환: 이번 호출로 예약되었으면 True
+        """
+        fp = payload_fingerprint(payload)
+        with self._cv:
+            if self._last.get(owner) == fp:
+                return False
+            self._last[owner] = fp
+            gen = self._gen.get(owner, 0) + 1
+            self._gen[owner] = gen
+            if owner in self._pending:
+                self._stats["superseded"] += 1
+            self._pending[owner] = (time.monotonic() + self.debounce_sec, gen, payload)
+            self._stats["scheduled"] += 1
+            self._ensure_thread()
+            self._cv.notify()
+        return True
+
+    def cancel(self, owner: str) -> None:
+        """예약/진행 중인 사전 생성 취소(이미 시작된 렌더 1건은 끝까지 실행)."""
+        with self._cv:
+            self._gen[owner] = self._gen.get(owner, 0) + 1
+            self._last.pop(owner, None)
+            if self._pending.pop(owner, None) is not None:
+                self._stats["cancelled"] += 1
+            self._cv.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cv:
+            s = dict(self._stats)
+            s["pending"] = len(self._pending)
+        s["used"] = self.queue.stats()["prefetch_used"]
+        s["cpu_budget"] = self.cpu_budget
+        return s
+
+    # --- 내부 ---
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="bioos-prefetch", daemon=True)
+            self._thread.start()
+
+    def _next_due(self) -> Tuple[str, int, Dict[str, Any]]:
+        # _cv 보유 상태에서 호출: 실행 시각이 된 항목 1개를 꺼내거나, 될 때까지 대기
+        while True:
+            now = time.monotonic()
+            if self._pending:
+                owner, (due, gen, payload) = min(self._pending.items(), key=lambda kv: kv[1][0])
+                due = max(due, self._not_before)
+                if due <= now:
+                    del self._pending[owner]
+                    return owner, gen, payload
+                self._cv.wait(due - now)
+            else:
+                self._cv.wait()
+
+    def _current(self, owner: str, gen: int) -> bool:
+        with self._cv:
+            return self._gen.get(owner) == gen
+
+    def _loop(self) -> None:
+        while True:
+            with self._cv:
+                owner, gen, payload = self._next_due()
+            for variant in self.variants:
+                if not self._current(owner, gen):
+                    with self._cv:
+                        self._stats["cancelled"] += 1
+                    break
+                self._throttle()
+                t0 = time.time()
+                job = self.queue.submit(variant, payload, speculative=True)
+                fresh = job.speculative and job.submitted_at >= t0   # 이미 있던 작업에 합쳐졌으면 비용 0
+                if fresh:
+                    with self._cv:
+                        self._stats["started"] += 1
+                try:
+                    job.result()
+                except Exception:
+                    if fresh:
+                        with self._cv:
+                            self._stats["failed"] += 1
+                    continue
+                if fresh:
+                    with self._cv:
+                        self._stats["rendered"] += 1
+                        self._charge(job.cpu_s)
+
+    def _throttle(self) -> None:
+        wait = self._not_before - time.monotonic()
+        if wait > 0:
+            with self._cv:
+                self._stats["throttled_s"] += wait
+            time.sleep(wait)
+
+    def _charge(self, cpu_s: float) -> None:
+        # 렌더에 cpu_s 를 썼으면 cpu_s * (1/budget - 1) 만큼 쉬어서 점유율을 budget 이하로
+        self._stats["cpu_s"] += cpu_s
+        self._not_before = time.monotonic() + cpu_s * (1.0 / self.cpu_budget - 1.0)
+
+# -----------------------------
+# 프로세스 공용 prefetcher
+# -----------------------------
+_default_prefetcher: Optional[Prefetcher] = None
+_default_lock = threading.Lock()
+
+def prefetch_enabled() -> bool:
+    return os.environ.get("BIOOS_PREFETCH", "0") == "1"
+
+def get_prefetcher() -> Prefetcher:
+    """
+    프로세스 단위 공용 prefetcher(opt-in: BIOOS_PREFETCH=1).
+    - BIOOS_PREFETCH_VARIANTS: 사전 생성할 보고서(쉼표 구분, 기본 kr_1p)
+    - BIOOS_PREFETCH_DEBOUNCE: 입력이 멈춘 뒤 대기 시간(초, 기본 1.5)
+    - BIOOS_PREFETCH_CPU: CPU 예산(코어 1개 대비 비율, 기본 0.25)
+    """
+    global _default_prefetcher
+    with _default_lock:
+        if _default_prefetcher is None:
+            variants = tuple(v.strip() for v in os.environ.get("BIOOS_PREFETCH_VARIANTS", "kr_1p").split(",") if v.strip())
+            _default_prefetcher = Prefetcher(
+                get_job_queue(),
+                variants=variants,
+                debounce_sec=float(os.environ.get("BIOOS_PREFETCH_DEBOUNCE", "1.5")),
+                cpu_budget=float(os.environ.get("BIOOS_PREFETCH_CPU", "0.25")),
+            )
+        return _default_prefetcher
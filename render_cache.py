@@ -0,0 +1,210 @@
+from __future__ import annotations
+from typing import Dict, Any, Callable, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import threading
+
+# -----------------------------
+# 캐시 키
+# -----------------------------
+# 휘발성 필드 정책:
+# - generated_at 처럼 호출할 때마다 바뀌는 값은 키 계산에서 제외한다.
+# - 캐시 적중 시 PDF에는 "최초 렌더 시각"이 그대로 남는다(같은 데이터로 만든 같은 문서).
+VOLATILE_KEYS: Tuple[str, ...] = ("generated_at",)
+
+def _json_default(o: Any) -> Any:
+    # numpy 배열/스칼라 등 JSON 비호환 값을 안정적인 표현으로 변환
+    if hasattr(o, "tobytes") and hasattr(o, "dtype") and hasattr(o, "shape"):
+        return {"__nd__": str(o.dtype), "shape": list(o.shape), "sha256": hashlib.sha256(o.tobytes()).hexdigest()}
+    if hasattr(o, "item"):
+        return o.item()
+    if isinstance(o, (set, frozenset)):
+        return sorted(o)
+    return str(o)
+
+def payload_fingerprint(payload: Dict[str, Any]) -> str:
+    stable = {k: v for k, v in payload.items() if k not in VOLATILE_KEYS}
+    blob = json.dumps(stable, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def cache_key(variant: str, payload: Dict[str, Any], template_version: str) -> str:
+    h = hashlib.sha256()
+    h.update(f"{variant}|{template_version}|".encode("utf-8"))
+    h.update(payload_fingerprint(payload).encode("ascii"))
+    return h.hexdigest()
+
+# -----------------------------
+# 렌더 캐시 (메모리 LRU + 선택적 디스크)
+# -----------------------------
+class RenderCache:
+    """
+    완성된 PDF bytes 캐시.
+    - 메모리: 바이트 예산(max_bytes) 기반 LRU
+    - 디스크(선택): disk_dir 지정 시 <key>.pdf 로 저장 → Streamlit 재시작 후에도 유지
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[str] = None,
+                 disk_max_bytes: Optional[int] = None):
+        self.max_bytes = int(max_bytes)
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._mem: "OrderedDict[str, bytes]" = OrderedDict()
+        self._mem_bytes = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._stats = dict(hits=0, disk_hits=0, misses=0, evictions=0, disk_evictions=0, puts=0)
+        self._disk_bytes = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_bytes = sum(s for _, s, _ in self._disk_entries())
+
+    # --- 메모리 계층 ---
+    def _mem_put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._mem_bytes -= len(old)
+        self._mem[key] = data
+        self._mem_bytes += len(data)
+        while self._mem_bytes > self.max_bytes and self._mem:
+            _, dropped = self._mem.popitem(last=False)
+            self._mem_bytes -= len(dropped)
+            self._stats["evictions"] += 1
+
+    # --- 디스크 계층 ---
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.pdf")
+
+    def _disk_entries(self):
+        out = []
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".pdf"):
+                continue
+            p = os.path.join(self.disk_dir, name)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            out.append((p, st.st_size, st.st_mtime))
+        return out
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        p = self._disk_path(key)
+        try:
+            with open(p, "rb") as f:
+                data = f.read()
+            os.utime(p, None)   # 최근 사용 표시(디스크 정리 시 LRU 근사)
+            return data
+        except OSError:
+            return None
+
+    def _disk_put(self, key: str, data: bytes) -> None:
+        if not self.disk_dir:
+            return
+        p = self._disk_path(key)
+        if os.path.exists(p):
+            return
+        tmp = f"{p}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, p)   # 원자적 교체: 읽는 쪽은 완성된 파일만 본다
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        with self._disk_lock:
+            self._disk_bytes += len(data)
+            if self.disk_max_bytes is not None and self._disk_bytes > self.disk_max_bytes:
+                self._disk_prune()
+
+    def _disk_prune(self) -> None:
+        entries = sorted(self._disk_entries(), key=lambda e: e[2])
+        total = sum(s for _, s, _ in entries)
+        for p, size, _ in entries:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(p)
+            except OSError:
+                continue
+            total -= size
+            self._stats["disk_evictions"] += 1
+        self._disk_bytes = total
+
+    # --- 공개 API ---
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._mem.get(key)
+            if data is not None:
+                self._mem.move_to_end(key)
+                self._stats["hits"] += 1
+                return data
+        data = self._disk_get(key)
+        with self._lock:
+            if data is not None:
+                self._stats["disk_hits"] += 1
+                self._mem_put(key, data)
+            else:
+                self._stats["misses"] += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._stats["puts"] += 1
+            self._mem_put(key, data)
+        self._disk_put(key, data)
+
+    def get_or_render(self, key: str, render: Callable[[], bytes]) -> bytes:
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.put(key, data)
+        return data
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self._mem_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+            s["entries"] = len(self._mem)
+            s["mem_bytes"] = self._mem_bytes
+        s["disk_bytes"] = self._disk_bytes
+        lookups = s["hits"] + s["disk_hits"] + s["misses"]
+        s["hit_rate"] = (s["hits"] + s["disk_hits"]) / lookups if lookups else 0.0
+        return s
+
+# -----------------------------
+# 프로세스 공용 캐시
+# -----------------------------
+_default_cache: Optional[RenderCache] = None
+_default_lock = threading.Lock()
+
+def get_render_cache() -> RenderCache:
+    """
+    프로세스 단위 공용 캐시(Streamlit 세션 간 공유).
+    - BIOOS_RENDER_CACHE_MB: 메모리 예산(MB, 기본 64)
+    - BIOOS_RENDER_CACHE_DIR: 디스크 계층 경로(미지정 시 메모리만 사용)
+    - BIOOS_RENDER_CACHE_DISK_MB: 디스크 예산(MB, 미지정 시 무제한)
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            mb = float(os.environ.get("BIOOS_RENDER_CACHE_MB", "64"))
+            disk_mb = os.environ.get("BIOOS_RENDER_CACHE_DISK_MB")
+            _default_cache = RenderCache(
+                max_bytes=int(mb * 1024 * 1024),
+                disk_dir=os.environ.get("BIOOS_RENDER_CACHE_DIR") or None,
+                disk_max_bytes=int(float(disk_mb) * 1024 * 1024) if disk_mb else None,
+            )
+        return _default_cache
@@ -0,0 +1,141 @@
+from __future__ import annotations
+from typing import Dict, Any, Optional
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+import threading
+import time
+
+from reports import render_report, report_key
+import spans
+
+# -----------------------------
+# 백그라운드 보고서 작업 큐
+# -----------------------------
+# Streamlit 스크립트 실행 안에서 PDF를 동기로 만들면 렌더가 끝날 때까지 화면이 멈춘다.
+# 버튼은 작업만 등록하고, 렌더는 프로세스 공용 스레드 풀에서 실행한다(세션 간 공유).
+# 같은 (variant, payload) 의 진행 중 작업은 렌더 캐시 키로 합친다
+# → 운영자 10명이 동시에 눌러도 렌더는 1회.
+#
+# 스레드 풀을 쓰는 이유: 결과를 프로세스 공용 렌더 캐시에 바로 넣고, payload 를 pickle 하지 않기 위해.
+# 대량 생성은 batch.py(프로세스 풀)를 쓴다.
+
+STATUS_KR = {"queued": "대기 중", "running": "생성 중", "done": "완료", "failed": "실패"}
+
+class RenderJob:
+    """보고서 렌더 작업 1건(같은 키의 요청은 이 객체를 공유)."""
+
+    def __init__(self, key: str, variant: str, speculative: bool = False):
+        self.key = key
+        self.variant = variant
+        self.speculative = speculative   # 사전 생성(prefetch) 작업
+        self.claimed = False             # 사전 생성 결과를 사용자가 요청했는지
+        self.cpu_s = 0.0
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future: Optional[Future] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def elapsed(self) -> float:
+        return (self.finished_at or time.time()) - self.submitted_at
+
+    def result(self, timeout: Optional[float] = None) -> bytes:
+        return self.future.result(timeout)
+
+class RenderJobQueue:
+    """
+    보고서 렌더 작업 큐.
+    - submit(): 즉시 반환(작업 객체). 진행 중/최근 완료된 같은 키는 기존 작업을 반환
+    - 완료 작업은 keep_done 건까지만 보관(PDF 본체는 렌더 캐시에도 있음)
+    """
+
+    def __init__(self, max_workers: int = 2, keep_done: int = 64):
+        self.max_workers = int(max_workers)
+        self.keep_done = int(keep_done)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bioos-render")
+        self._jobs: "OrderedDict[str, RenderJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = dict(submitted=0, deduped=0, rendered=0, failed=0, prefetch_used=0)
+
+    def submit(self, variant: str, payload: Dict[str, Any], speculative: bool = False) -> RenderJob:
+        key = report_key(variant, payload)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.status != "failed":
+                self._jobs.move_to_end(key)
+                self._stats["deduped"] += 1
+                if job.speculative and not speculative and not job.claimed:
+                    job.claimed = True
+                    self._stats["prefetch_used"] += 1
+                return job
+            job = RenderJob(key, variant, speculative)
+            self._jobs[key] = job
+            self._stats["submitted"] += 1
+            job.future = self._pool.submit(self._run, job, payload)
+            self._trim()
+        return job
+
+    def _run(self, job: RenderJob, payload: Dict[str, Any]) -> bytes:
+        job.started_at = time.time()
+        job.status = "running"
+        spans.record("job.queue_wait", job.started_at - job.submitted_at)
+        cpu0 = time.thread_time()
+        try:
+            data = render_report(job.variant, payload)
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = "failed"
+            with self._lock:
+                self._stats["failed"] += 1
+            raise
+        finally:
+            job.cpu_s = time.thread_time() - cpu0
+            job.finished_at = time.time()
+        job.status = "done"
+        with self._lock:
+            self._stats["rendered"] += 1
+        return data
+
+    def _trim(self) -> None:
+        # 오래된 완료 작업부터 제거(진행 중 작업은 유지)
+        n_done = sum(1 for j in self._jobs.values() if j.done)
+        for key in list(self._jobs):
+            if n_done <= self.keep_done:
+                break
+            if self._jobs[key].done:
+                del self._jobs[key]
+                n_done -= 1
+
+    def get(self, key: str) -> Optional[RenderJob]:
+        with self._lock:
+            return self._jobs.get(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+            s["inflight"] = sum(1 for j in self._jobs.values() if not j.done)
+        s["workers"] = self.max_workers
+        return s
+
+# -----------------------------
+# 프로세스 공용 큐
+# -----------------------------
+_default_queue: Optional[RenderJobQueue] = None
+_default_lock = threading.Lock()
+
+def get_job_queue() -> RenderJobQueue:
+    """
+    프로세스 단위 공용 작업 큐(Streamlit 세션 간 공유).
+    - BIOOS_RENDER_WORKERS: 렌더 스레드 수(기본 2)
+    """
+    global _default_queue
+    with _default_lock:
+        if _default_queue is None:
+            _default_queue = RenderJobQueue(max_workers=int(os.environ.get("BIOOS_RENDER_WORKERS", "2")))
+        return _default_queue
@@ -0,0 +1,317 @@
+"""
+로컬 보고서 렌더 서비스(HTTP). Streamlit 화면 없이 다른 시스템(MES, 야간 스케줄러)이 PDF를 받아 간다.
+
+사용 예:
+    python render_server.py --port 8765 --workers 4 --queue 16
+    curl -s -X POST --data @snapshot.json http://127.0.0.1:8765/render/kr_1p -o report.pdf -D headers.txt
+    curl -s -X POST --data @snapshot.json -H 'If-None-Match: "<ETag>"' http://127.0.0.1:8765/render/kr_1p   # 바뀌지 않았으면 304
+
+요청/응답
+- POST /render/<variant>  본문: {"metrics": {...}, "meta": {...DocMeta 필드...}} (batch.py JSONL 한 줄과 같은 형식)
+  → 200 application/pdf, ETag(약한 검증자 W/"..."), X-Render-Source(cache/render/shared)
+  → 304: If-None-Match 가 ETag 와 같으면 렌더/전송 없이 응답
+  → 400 잘못된 본문 · 404 알 수 없는 variant · 413 본문 초과 · 503 대기열 가득(Retry-After) · 504 시간 초과
+- GET /healthz, GET /stats(JSON), GET /metrics(단계별 계측 Prometheus 텍스트)
+
+ETag = W/"렌더 캐시 키"(variant + 템플릿 버전 + payload 지문, generated_at 제외).
+같은 입력이면 렌더 전에 304 를 판정할 수 있다. 키는 입력을 가리킬 뿐 bytes 를 보장하지 않으므로
+(캐시에서 밀려나 다시 렌더하면 생성 시각 등이 달라짐) 약한(weak) ETag 로 보낸다.
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+from common import DocMeta, build_report_payload
+from reports import VARIANTS, prepare_renderers, render_uncached, report_filename, report_key
+from render_cache import RenderCache, get_render_cache
+import spans
+
+_META_FIELDS = {f.name for f in fields(DocMeta)}
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+class ServiceBusy(Exception):
+    """대기열이 가득 참(503). retry_after: 다시 시도할 때까지 권장 대기(초)."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"render queue full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+# -----------------------------
+# 렌더 서비스
+# -----------------------------
+class RenderService:
+    """
+    제한된 워커 풀 + 대기열 + 역압(backpressure).
+    - 동시에 받아 두는 렌더는 workers + queue_size 건까지, 넘으면 ServiceBusy(503)
+    - 같은 키의 진행 중 렌더는 합친다(캐시 적중/합친 요청은 대기열 자리를 쓰지 않음)
+    - processes=True: 워커 프로세스(spawn, 워커마다 렌더링 준비 1회) → 조판이 실제로 병렬
+    - 결과는 렌더 캐시에 넣는다(시간 초과로 응답하지 못한 렌더도 끝나면 캐시에 남음)
+    """
+
+    def __init__(self, workers: int = 2, queue_size: int = 8, timeout: float = 120.0, processes: bool = True,
+                 cache: Optional[RenderCache] = None):
+        self.workers = max(1, int(workers))
+        self.queue_size = max(0, int(queue_size))
+        self.timeout = float(timeout)
+        self.processes = bool(processes)
+        self.cache = cache if cache is not None else get_render_cache()
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._render_s = 0.0   # 렌더 소요 시간 지수 평균(Retry-After 추정)
+        self._stats = dict(requests=0, rendered=0, cache_hits=0, shared=0, not_modified=0, rejected=0,
+                           failed=0, timeouts=0, pool_restarts=0)
+        self._pool = self._new_pool()
+
+    def _new_pool(self) -> Executor:
+        if self.processes:
+            return ProcessPoolExecutor(max_workers=self.workers, initializer=prepare_renderers,
+                                       mp_context=multiprocessing.get_context("spawn"))
+        prepare_renderers()
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bioos-serve")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def etag(self, variant: str, payload: Dict[str, Any]) -> str:
+        return f'W/"{report_key(variant, payload)}"'
+
+    def render(self, variant: str, payload: Dict[str, Any]) -> Tuple[bytes, str]:
+        """PDF bytes 와 출처("cache"/"render"/"shared"). 대기열이 가득 차면 ServiceBusy."""
+        key = report_key(variant, payload)
+        data = self.cache.get(key)
+        if data is not None:
+            self._count("cache_hits")
+            return data, "cache"
+        with self._lock:
+            fut = self._inflight.get(key)
+            source = "shared"
+            if fut is None:
+                if not self._slots.acquire(blocking=False):
+                    self._stats["rejected"] += 1
+                    raise ServiceBusy(self._retry_after())
+                source = "render"
+                pool = self._pool
+                try:
+                    fut = pool.submit(render_uncached, variant, payload)
+                except Exception:
+                    self._slots.release()
+                    raise
+                self._inflight[key] = fut
+            else:
+                self._stats["shared"] += 1
+        if source == "render":
+            # 잠금 밖에서 등록(이미 끝난 future 면 콜백이 이 스레드에서 바로 실행됨)
+            fut.add_done_callback(lambda f, k=key, p=pool, t0=time.perf_counter(): self._finished(k, f, p, t0))
+        try:
+            return fut.result(timeout=self.timeout), source
+        except FutureTimeout:
+            self._count("timeouts")
+            raise
+
+    def _finished(self, key: str, fut: Future, pool: Executor, t0: float) -> None:
+        dt = time.perf_counter() - t0
+        self._slots.release()
+        with self._lock:
+            self._inflight.pop(key, None)
+        if fut.cancelled():
+            return
+        exc = fut.exception()
+        if exc is None:
+            self.cache.put(key, fut.result())
+            spans.record("server.render", dt)
+            with self._lock:
+                self._stats["rendered"] += 1
+                self._render_s = dt if self._render_s == 0.0 else 0.8 * self._render_s + 0.2 * dt
+            return
+        self._count("failed")
+        if isinstance(exc, BrokenProcessPool):
+            self._restart_pool(pool)
+
+    def _restart_pool(self, broken: Executor) -> None:
+        # 워커 프로세스가 죽으면 풀 전체를 쓸 수 없다 → 새 풀로 교체.
+        # 같은 풀에서 실패한 future 가 여러 개여도 교체는 1회(이미 교체된 뒤면 새 풀은 건드리지 않음)
+        with self._lock:
+            if self._pool is not broken:
+                return
+            self._pool = self._new_pool()
+            self._stats["pool_restarts"] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _retry_after(self) -> int:
+        # 대기열을 다 비우는 데 걸릴 시간의 대략값(최소 1초)
+        per = self._render_s or 1.0
+        return max(1, math.ceil(per * (self.workers + self.queue_size) / self.workers))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+            s["inflight"] = len(self._inflight)
+            s["avg_render_s"] = round(self._render_s, 3)
+        s.update(workers=self.workers, queue_size=self.queue_size, processes=self.processes)
+        return s
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+# -----------------------------
+# HTTP
+# -----------------------------
+def payload_from_request(body: bytes) -> Dict[str, Any]:
+    """요청 본문(JSON) → 보고서 payload. 형식 오류는 ValueError."""
+    try:
+        rec = json.loads(body.decode("utf-8") or "{}")
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"invalid JSON: {e}") from None
+    if not isinstance(rec, dict) or not isinstance(rec.get("metrics", {}), dict):
+        raise ValueError('body must be {"metrics": {...}, "meta": {...}}')
+    meta = {k: v for k, v in (rec.get("meta") or {}).items() if k in _META_FIELDS}
+    try:
+        return build_report_payload(rec.get("metrics") or {}, DocMeta(**meta))
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"invalid metrics: {type(e).__name__}: {e}") from None
+
+def _etag_match(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # 약한 비교(RFC 9110 8.8.3.2): W/ 접두어는 무시하고 따옴표 안의 값만 비교
+    weak = lambda t: t[2:] if t.startswith("W/") else t
+    return any(weak(t.strip()) == weak(etag) for t in header.split(","))
+
+def make_handler(service: RenderService, quiet: bool = False):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, code: int, body: bytes = b"", ctype: str = "application/json; charset=utf-8",
+                  headers: Optional[Dict[str, str]] = None) -> None:
+            self.send_response(code)
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            if code != 304:
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body and code != 304:
+                self.wfile.write(body)
+
+        def _json(self, code: int, obj: Any, headers: Optional[Dict[str, str]] = None) -> None:
+            self._send(code, json.dumps(obj, ensure_ascii=False).encode("utf-8"), headers=headers)
+
+        def do_GET(self) -> None:
+            path = self.path.split("?", 1)[0]
+            if path == "/healthz":
+                self._json(200, dict(ok=True))
+            elif path == "/stats":
+                self._json(200, service.stats())
+            elif path == "/metrics":
+                self._send(200, spans.prometheus_text().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8")
+            else:
+                self._json(404, dict(error="not found"))
+
+        def do_POST(self) -> None:
+            with spans.span("server.request"):
+                self._post()
+
+        def _post(self) -> None:
+            path = self.path.split("?", 1)[0]
+            if not path.startswith("/render/"):
+                self._json(404, dict(error="not found"))
+                return
+            variant = path[len("/render/"):]
+            if variant not in VARIANTS:
+                self._json(404, dict(error=f"unknown report variant: {variant}", variants=list(VARIANTS)))
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0 or length > MAX_BODY_BYTES:
+                self.close_connection = True
+                self._json(413, dict(error=f"body must be 0..{MAX_BODY_BYTES} bytes"))
+                return
+            service._count("requests")
+            try:
+                payload = payload_from_request(self.rfile.read(length))
+            except ValueError as e:
+                self._json(400, dict(error=str(e)))
+                return
+
+            etag = service.etag(variant, payload)
+            if _etag_match(self.headers.get("If-None-Match"), etag):
+                service._count("not_modified")
+                self._send(304, headers={"ETag": etag})
+                return
+            try:
+                pdf, source = service.render(variant, payload)
+            except ServiceBusy as e:
+                self._json(503, dict(error=str(e)), headers={"Retry-After": str(e.retry_after)})
+                return
+            except FutureTimeout:
+                self._json(504, dict(error=f"render timed out after {service.timeout:g}s (result will be cached)"))
+                return
+            except Exception as e:
+                self._json(500, dict(error=f"{type(e).__name__}: {e}"))
+                return
+            name = report_filename(variant)
+            self._send(200, pdf, "application/pdf", headers={
+                "ETag": etag,
+                "Cache-Control": "no-cache",
+                "Content-Disposition": f"attachment; filename=\"{variant}.pdf\"; filename*=UTF-8''{quote(name)}",
+                "X-Render-Source": source,
+            })
+
+        def log_message(self, fmt: str, *args) -> None:
+            if not quiet:
+                sys.stderr.write(f"{self.address_string()} {fmt % args}\n")
+
+    return Handler
+
+def serve(service: RenderService, host: str = "127.0.0.1", port: int = 8765, quiet: bool = False) -> ThreadingHTTPServer:
+    """서버 객체 생성(serve_forever 는 호출 측에서)."""
+    server = ThreadingHTTPServer((host, port), make_handler(service, quiet))
+    server.daemon_threads = True
+    return server
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Bio-OS 보고서 렌더 서비스(로컬 HTTP)")
+    ap.add_argument("--host", default="127.0.0.1", help="바인드 주소(기본 로컬 전용)")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="렌더 워커 수")
+    ap.add_argument("--queue", type=int, default=8, help="워커가 모두 바쁠 때 받아 둘 요청 수(넘으면 503)")
+    ap.add_argument("--timeout", type=float, default=120.0, help="요청당 렌더 대기 한도(초, 넘으면 504)")
+    ap.add_argument("--threads", action="store_true", help="워커 프로세스 대신 스레드 사용(단일 코어/디버깅)")
+    ap.add_argument("--quiet", action="store_true", help="요청 로그 끄기")
+    args = ap.parse_args(argv)
+
+    service = RenderService(workers=args.workers, queue_size=args.queue, timeout=args.timeout,
+                            processes=not args.threads)
+    server = serve(service, args.host, args.port, quiet=args.quiet)
+    print(f"Bio-OS render service on http://{args.host}:{args.port} · {service.workers} "
+          f"{'threads' if args.threads else 'processes'} · queue {service.queue_size}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+from __future__ import annotations
+from typing import Dict, Any, Optional, Tuple
+import os
+
+from common import TEMPLATE_VERSION
+from render_cache import RenderCache, cache_key, get_render_cache
+from charts import CHART_ENGINE
+from spans import span
+from startup import timed_import, warm_up_async
+
+# variant -> (모듈, 함수, 추가 인자, 다운로드 파일명)
+# 렌더링 모듈(reportlab, 글꼴 등록, matplotlib)은 처음 필요할 때 import 한다.
+VARIANTS: Dict[str, Tuple[str, str, Dict[str, Any], str]] = {
+    "kr_1p": ("report_kr", "make_pdf_kr", {"summary_only": True}, "Bio-OS_운영_요약보고서_1p.pdf"),
+    "kr_3p": ("report_kr", "make_pdf_kr", {"summary_only": False}, "Bio-OS_운영_상세보고서_3p.pdf"),
+    "en_1p": ("report_en", "make_pdf_en", {"summary_only": True}, "Bio-OS_Report_EN_1p.pdf"),
+    "en_3p": ("report_en", "make_pdf_en", {"summary_only": False}, "Bio-OS_Report_EN_3p.pdf"),
+    "whitepaper_12p": ("whitepaper", "make_whitepaper_12p", {}, "Bio-OS_Global_Whitepaper_12p.pdf"),
+}
+
+RENDER_MODULES: Tuple[str, ...] = tuple(dict.fromkeys(v[0] for v in VARIANTS.values()))
+
+# 정적 페이지 템플릿 모드(templates.py). 출력 바이트가 달라지므로 캐시 키에 포함
+TEMPLATE_MODE = "tpl" if os.environ.get("BIOOS_TEMPLATE_MODE", "0") == "1" else "full"
+
+def report_key(variant: str, payload: Dict[str, Any]) -> str:
+    # 차트 엔진/조판 모드에 따라 PDF 내용이 달라지므로 키에 포함
+    return cache_key(variant, payload, f"{TEMPLATE_VERSION}/{CHART_ENGINE}/{TEMPLATE_MODE}")
+
+def _render(variant: str, payload: Dict[str, Any]) -> bytes:
+    module, func, kwargs, _ = VARIANTS[variant]
+    fn = getattr(timed_import(module), func)
+    with span(f"report.{variant}"):
+        return fn(payload=payload, **kwargs)
+
+def render_uncached(variant: str, payload: Dict[str, Any]) -> bytes:
+    """캐시 없이 렌더(워커 프로세스용: 결과는 부모 프로세스가 자기 캐시에 넣는다)."""
+    if variant not in VARIANTS:
+        raise ValueError(f"unknown report variant: {variant}")
+    return _render(variant, payload)
+
+def render_report(variant: str, payload: Dict[str, Any], cache: Optional[RenderCache] = None) -> bytes:
+    """
+    variant 이름으로 PDF를 생성한다(캐시 우선).
+    - cache=None 이면 프로세스 공용 캐시 사용
+    """
+    if variant not in VARIANTS:
+        raise ValueError(f"unknown report variant: {variant}")
+    cache = cache if cache is not None else get_render_cache()
+    return cache.get_or_render(report_key(variant, payload), lambda: _render(variant, payload))
+
+def report_filename(variant: str) -> str:
+    return VARIANTS[variant][3]
+
+def prepare_renderers() -> None:
+    """
+    현재 스레드에서 렌더링 준비를 끝낸다(배치/서버 워커 초기화용).
+    - 렌더링 모듈 import + 공용 PDF 리소스(글꼴/스타일) 생성 + 차트 글꼴 탐색
+    """
+    for name in RENDER_MODULES:
+        timed_import(name)
+    timed_import("pdf_resources").warm_up()
+    if CHART_ENGINE == "reportlab":
+        timed_import("charts_rl")
+    else:
+        # matplotlib 경로: Figure/Agg import + 한글 글꼴 탐색(글꼴 목록 스캔)
+        timed_import("matplotlib.figure")
+        timed_import("matplotlib.backends.backend_agg")
+        timed_import("charts").korean_font_family()
+
+def warm_up_renderers() -> bool:
+    """prepare_renderers() 를 백그라운드 스레드에서 실행(프로세스당 1회)."""
+    return warm_up_async((), extra=prepare_renderers)
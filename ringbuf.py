@@ -0,0 +1,91 @@
+from __future__ import annotations
+from typing import Any, Optional, Sequence, Tuple, Union
+import numpy as np
+
+class BucketRing:
+    """
+    시간 버킷 링 버퍼(슬라이딩 윈도우 합계).
+    - 버킷 n_buckets 개 × bucket_sec 초 = 윈도우 길이
+    - 버킷마다 shape(예: 구역 N개) 배열을 누적하고, 윈도우 합계(total)를 함께 유지 → 조회 O(1)
+    - 메모리는 데이터 양과 무관하게 n_buckets × shape 로 고정
+    """
+
+    def __init__(self, window_sec: float, bucket_sec: float, shape: Union[int, Sequence[int]] = (),
+                 dtype: Any = np.float64):
+        self.bucket_sec = float(bucket_sec)
+        self.n_buckets = max(1, int(round(float(window_sec) / self.bucket_sec)))
+        self.shape: Tuple[int, ...] = (shape,) if isinstance(shape, int) else tuple(shape)
+        self.buckets = np.zeros((self.n_buckets,) + self.shape, dtype=dtype)
+        self.total = np.zeros(self.shape, dtype=dtype)
+        self.head = None   # 가장 최근 버킷 번호(절대값 = floor(ts / bucket_sec))
+
+    def _bucket_no(self, ts: Any) -> Any:
+        return np.floor(np.asarray(ts, dtype=np.float64) / self.bucket_sec).astype(np.int64)
+
+    def advance(self, ts: float) -> None:
+        """ts 가 속한 버킷까지 윈도우를 전진시키고, 밀려난 버킷을 합계에서 뺀다."""
+        b = int(self._bucket_no(ts))
+        if self.head is None:
+            self.head = b
+            return
+        if b <= self.head:
+            return
+        gap = b - self.head
+        if gap >= self.n_buckets:
+            self.buckets[...] = 0
+            self.total[...] = 0
+        else:
+            idx = np.arange(self.head + 1, b + 1) % self.n_buckets
+            self.total -= self.buckets[idx].sum(axis=0)
+            self.buckets[idx] = 0
+            # 부동소수 누적 오차 방지: 한 바퀴마다 합계를 다시 계산
+            if (self.head // self.n_buckets) != (b // self.n_buckets):
+                self.total = self.buckets.sum(axis=0)
+        self.head = b
+
+    def add(self, ts: float, values: Any) -> None:
+        """단일 시각 값 누적. 윈도우보다 오래된 값은 버린다."""
+        self.advance(ts)
+        b = int(self._bucket_no(ts))
+        if b <= self.head - self.n_buckets:
+            return
+        v = np.asarray(values, dtype=self.buckets.dtype)
+        self.buckets[b % self.n_buckets] += v
+        self.total += v
+
+    def add_many(self, ts: Any, values: Any, index: Optional[int] = None) -> None:
+        """
+        여러 시각 값 일괄 누적(벡터화) — 과거 데이터 백필 경로.
+        - ts: (T,), values: (T,) + shape
+        - index 지정 시 첫 축(예: 구역)의 한 칸에만 누적: values 는 (T,) + shape[1:]
+        """
+        ts = np.asarray(ts, dtype=np.float64)
+        if ts.size == 0:
+            return
+        values = np.asarray(values, dtype=self.buckets.dtype)
+        self.advance(float(ts.max()))
+        b = self._bucket_no(ts)
+        keep = b > self.head - self.n_buckets
+        if not np.all(keep):
+            b, values = b[keep], values[keep]
+        if index is None:
+            np.add.at(self.buckets, b % self.n_buckets, values)
+            self.total += values.sum(axis=0)
+        else:
+            np.add.at(self.buckets, (b % self.n_buckets, index), values)
+            self.total[index] += values.sum(axis=0)
+
+    def grow(self, n: int) -> None:
+        """첫 축(예: 구역)을 n 칸으로 늘린다(새 칸은 0). 기존 누적값은 그대로."""
+        extra = int(n) - self.shape[0]
+        if extra <= 0:
+            return
+        self.buckets = np.concatenate([self.buckets, np.zeros((self.n_buckets, extra) + self.shape[1:], self.buckets.dtype)], axis=1)
+        self.total = np.concatenate([self.total, np.zeros((extra,) + self.shape[1:], self.total.dtype)])
+        self.shape = (int(n),) + self.shape[1:]
+
+    def window_total(self, now: Optional[float] = None) -> np.ndarray:
+        """현재 윈도우 합계(복사본). now 지정 시 해당 시각까지 전진 후 반환."""
+        if now is not None:
+            self.advance(now)
+        return self.total.copy()
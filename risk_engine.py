@@ -0,0 +1,105 @@
+from __future__ import annotations
+from typing import Dict, Any, Mapping, Optional, Sequence, Tuple
+import numpy as np
+
+# -----------------------------
+# 기준 범위 (근거 문구와 동일한 값)
+# -----------------------------
+CHANNELS: Tuple[str, ...] = ("do", "temp", "ph", "sal")
+REFERENCE_BANDS: Dict[str, Tuple[float, float]] = {
+    "do": (6.0, 10.0),
+    "temp": (14.0, 20.0),
+    "ph": (7.6, 8.3),
+    "sal": (28.0, 34.0),
+}
+CHANNEL_LABELS_KR: Dict[str, str] = {
+    "do": "산소량(용존산소)",
+    "temp": "물 온도",
+    "ph": "물 산도(pH)",
+    "sal": "염도",
+}
+
+# 점수 곡선
+# - 기준 범위 중앙: 0점, 기준 경계: EDGE_SCORE(경계 단계 시작점)
+# - 범위 밖: 100점을 향해 지수적으로 포화(OUTSIDE_GAIN 이 클수록 빠르게 상승)
+EDGE_SCORE = 60.0
+OUTSIDE_GAIN = 3.0
+
+def _band_arrays(channels: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    lo = np.array([REFERENCE_BANDS[c][0] for c in channels], dtype=np.float64)
+    hi = np.array([REFERENCE_BANDS[c][1] for c in channels], dtype=np.float64)
+    return (lo + hi) / 2.0, (hi - lo) / 2.0
+
+def stack_channels(readings: Mapping[str, Any], channels: Sequence[str] = CHANNELS) -> np.ndarray:
+    """
+    {채널: 배열(N) 또는 (N, T)} → (C, N[, T]) float64 배열.
+    - 값이 없는 채널은 NaN 으로 채운다(점수 계산에서 제외됨).
+    """
+    arrs = [readings.get(c) for c in channels]
+    shape = next((np.shape(a) for a in arrs if a is not None), ())
+    return np.stack([
+        np.asarray(a, dtype=np.float64) if a is not None else np.full(shape, np.nan)
+        for a in arrs
+    ])
+
+def signed_deviation(values: np.ndarray, channels: Sequence[str] = CHANNELS) -> np.ndarray:
+    """(C, ...) 측정값 → 기준 중앙 대비 부호 있는 편차(반폭 단위). 음수 = 중앙보다 낮음."""
+    center, half = _band_arrays(channels)
+    extra = (1,) * (values.ndim - 1)
+    return (values - center.reshape(-1, *extra)) / half.reshape(-1, *extra)
+
+def normalized_deviation(values: np.ndarray, channels: Sequence[str] = CHANNELS) -> np.ndarray:
+    """(C, ...) 측정값 → 기준 중앙 대비 편차(반폭 단위). 1.0 = 기준 경계."""
+    center, half = _band_arrays(channels)
+    extra = (1,) * (values.ndim - 1)
+    return np.abs(values - center.reshape(-1, *extra)) / half.reshape(-1, *extra)
+
+def risk_from_deviation(d: np.ndarray) -> np.ndarray:
+    """편차(반폭 단위, 0 이상) → 위험 점수(0~100)."""
+    inside = EDGE_SCORE * d
+    outside = EDGE_SCORE + (100.0 - EDGE_SCORE) * (1.0 - np.exp(-OUTSIDE_GAIN * (d - 1.0)))
+    return np.where(d <= 1.0, inside, outside)
+
+def channel_risk(values: np.ndarray, channels: Sequence[str] = CHANNELS) -> np.ndarray:
+    """(C, ...) 측정값 → 채널별 위험 점수(0~100), 같은 shape."""
+    return risk_from_deviation(normalized_deviation(values, channels))
+
+def global_risk(values: np.ndarray, channels: Sequence[str] = CHANNELS) -> np.ndarray:
+    """
+    전체 위험 점수(0~100) = 채널별 점수 중 최대값.
+    - values: (C, N) 또는 (C, N, T) → 결과 (N,) 또는 (N, T)
+    - 모든 채널이 NaN 인 지점은 NaN
+    """
+    r = channel_risk(values, channels)
+    all_nan = np.all(np.isnan(r), axis=0)
+    out = np.max(np.where(np.isnan(r), -np.inf, r), axis=0)
+    return np.where(all_nan, np.nan, out)
+
+def score_zones(zones: Mapping[str, Mapping[str, Any]], channels: Sequence[str] = CHANNELS) -> Dict[str, float]:
+    """구역 dict 묶음(예: loop_a/loop_b)의 최신값으로 구역별 전체 위험 점수를 한 번에 계산."""
+    names = list(zones.keys())
+    readings = {c: [zones[n].get(c, np.nan) for n in names] for c in channels}
+    scores = global_risk(stack_channels(readings, channels), channels)
+    return {n: round(float(s), 1) for n, s in zip(names, scores)}
+
+def facility_risk_history(store: Any, t0: float, t1: float, zones: Optional[Sequence[str]] = None,
+                          bin_sec: float = 60.0, channels: Sequence[str] = CHANNELS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    센서 이력(tsstore) → 시설 전체 위험 점수 시계열(구역 최대값).
+    - 구역마다 채널 배열을 한 번에 점수화한 뒤 bin_sec 단위 최대값으로 합친다
+    - 반환: (bin 시작 시각, 점수) — 데이터가 없는 bin 은 제외
+    """
+    zones = store.zones() if zones is None else list(zones)
+    n_bins = max(1, int(np.ceil((t1 - t0) / bin_sec)))
+    out = np.full(n_bins, -np.inf)
+    for z in zones:
+        avail = [c for c in channels if c in store.channels(z)]
+        ts, cols = store.read_range(z, t0, t1, avail)
+        if ts.size == 0:
+            continue
+        r = global_risk(stack_channels(cols, channels), channels)
+        b = ((ts - t0) // bin_sec).astype(np.int64)
+        ok = ~np.isnan(r)
+        np.maximum.at(out, b[ok], r[ok])
+    keep = np.nonzero(np.isfinite(out))[0]
+    return t0 + keep * bin_sec, out[keep]
@@ -0,0 +1,246 @@
+from __future__ import annotations
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+import json
+import os
+import threading
+import time
+import numpy as np
+
+from risk_engine import REFERENCE_BANDS
+from zones import ZONE_LABELS_KR
+
+# -----------------------------
+# 임계값 규칙 엔진(근거/조치 생성)
+# -----------------------------
+# 규칙 표(rules.json): 지표(field)별 표시 형식 + 규칙(below/above 임계값, 우선순위, 조치).
+# 수질 지표의 기준 범위는 위험 점수와 같은 risk_engine.REFERENCE_BANDS 를 쓴다(근거 문구와 점수가 어긋나지 않게).
+# 규칙 표는 한 번 "컴파일"해 규칙별 배열(지표 열 번호, 하한, 상한, 우선순위)로 만들어 두고,
+# 평가 시에는 (구역 N × 지표 F) 값 행렬에서 (N × 규칙 R) 발동 마스크를 NumPy 1회 연산으로 얻는다.
+# 같은 구역에서 한 지표에 규칙이 여럿 발동하면 가장 높은 우선순위만 남기고(예: 산소 P1 이면 산소 P2 생략),
+# 규칙의 "unless"(규칙 id 목록) 중 하나가 같은 구역에서 발동하면 그 규칙은 생략한다(다른 원인으로 설명되는 경우).
+# 둘 다 컴파일 시 (R × R) 억제 행렬 하나로 만들어 두고 평가 때는 행렬 곱 1회로 적용한다.
+# 파일이 바뀌면(mtime) 다음 조회 때 다시 컴파일한다(콘솔 재시작 불필요). 오류가 있으면 이전 표를 유지.
+
+SEVERITY_ORDER = ("P1", "P2", "P3")
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json")
+
+class CompiledRules:
+    """컴파일된 규칙 표(읽기 전용)."""
+
+    def __init__(self, spec: Mapping[str, Any], source: str = "", mtime: float = 0.0):
+        self.version = str(spec.get("version", ""))
+        self.source = source
+        self.mtime = mtime
+        self.fields: Dict[str, Dict[str, Any]] = {k: dict(v) for k, v in spec.get("fields", {}).items()}
+        for f, info in self.fields.items():
+            if "band" in info:
+                raise ValueError(f"field {f}: 'band' is taken from risk_engine.REFERENCE_BANDS")
+            if f in REFERENCE_BANDS:
+                info["band"] = REFERENCE_BANDS[f]
+        rules = list(spec.get("rules", []))
+        self.field_names: Tuple[str, ...] = tuple(dict.fromkeys(
+            list(self.fields) + [r["field"] for r in rules]))
+        col = {f: i for i, f in enumerate(self.field_names)}
+
+        self.rule_ids: List[str] = []
+        self.rules: List[Dict[str, Any]] = []
+        for r in rules:
+            if r.get("severity") not in SEVERITY_ORDER:
+                raise ValueError(f"rule {r.get('id')}: severity must be one of {SEVERITY_ORDER}")
+            if "below" not in r and "above" not in r:
+                raise ValueError(f"rule {r.get('id')}: needs 'below' or 'above'")
+            self.rule_ids.append(str(r.get("id", len(self.rule_ids))))
+            self.rules.append(dict(r))
+        self.col = np.array([col[r["field"]] for r in self.rules], dtype=np.int64)
+        self.below = np.array([float(r.get("below", -np.inf)) for r in self.rules])
+        self.above = np.array([float(r.get("above", np.inf)) for r in self.rules])
+        self.rank = np.array([SEVERITY_ORDER.index(r["severity"]) for r in self.rules], dtype=np.int64)
+        # suppress[a, b]: 규칙 b 가 발동하면 a 를 생략(같은 지표의 더 높은 우선순위, 또는 a 의 unless)
+        self.suppress = (self.col[:, None] == self.col[None, :]) & (self.rank[None, :] < self.rank[:, None])
+        idx = {rid: i for i, rid in enumerate(self.rule_ids)}
+        for a, r in enumerate(self.rules):
+            for rid in r.get("unless", []):
+                if rid not in idx:
+                    raise ValueError(f"rule {self.rule_ids[a]}: unknown rule in 'unless': {rid}")
+                self.suppress[a, idx[rid]] = True
+        self.default_actions = [tuple(a) for a in spec.get("default_actions", [])]
+
+    @property
+    def version_key(self) -> str:
+        # 캐시 키용: 파일이 바뀌면 달라짐
+        return f"{self.version}@{self.mtime}"
+
+    # --- 평가 ---
+    def field_matrix(self, zones: Mapping[str, Any]) -> Tuple[List[str], np.ndarray]:
+        """
+        구역 → (구역 라벨 목록, (N, F) 값 행렬). 없는 값은 NaN.
+        - zones: 구역 이름 → dict, 또는 열 배열 표({"name": [...], 필드: 배열})
+        """
+        if "name" in zones and isinstance(zones["name"], (list, tuple, np.ndarray)):
+            names = [str(n) for n in zones["name"]]
+            labels = [str(x) for x in zones.get("label", [ZONE_LABELS_KR.get(n, n) for n in names])]
+            cols = [np.asarray(zones[f], dtype=np.float64) if f in zones else np.full(len(names), np.nan)
+                    for f in self.field_names]
+            return labels, np.stack(cols, axis=-1) if cols else np.zeros((len(names), 0))
+        names = list(zones)
+        labels = [str(zones[n].get("label") or ZONE_LABELS_KR.get(n, n)) for n in names]
+        x = np.array([[zones[n].get(f, np.nan) for f in self.field_names] for n in names], dtype=np.float64)
+        return labels, x.reshape(len(names), len(self.field_names))
+
+    def fire(self, x: np.ndarray) -> np.ndarray:
+        """(N, F) 값 → (N, R) 규칙 발동 마스크(NaN 은 발동 안 함, 억제된 규칙 제외)."""
+        v = x[:, self.col]
+        raw = (v < self.below) | (v > self.above)
+        return raw & ~((raw.astype(np.int64) @ self.suppress.T.astype(np.int64)) > 0)
+
+    def _fmt(self, field: str, value: float) -> str:
+        fmt = self.fields.get(field, {}).get("fmt", "{:g}")
+        return fmt.format(value)
+
+    def _reference(self, rule: Mapping[str, Any]) -> str:
+        # 임계값이 기준 범위 안쪽이면(주의 단계 규칙) 범위 대신 규칙 자신의 임계값을 보인다
+        f = rule["field"]
+        band = self.fields.get(f, {}).get("band")
+        t = rule["above"] if "above" in rule else rule["below"]
+        if band and not band[0] < t < band[1]:
+            lo, hi = band
+            return f"기준 {lo}~{hi}"
+        if "above" in rule:
+            return f"기준 {self._fmt(f, rule['above'])} 이하"
+        return f"기준 {self._fmt(f, rule['below'])} 이상"
+
+    def evaluate(self, zones: Mapping[str, Any], max_evidence: int = 6, focus: Optional[int] = None) -> Dict[str, Any]:
+        """
+        구역 값 → 근거 문구/조치 목록.
+        - actions: [(P1/P2/P3, 조치, 시점)] 우선순위 → 발동 구역 수 순, 같은 조치는 1회
+        - evidence: 발동 규칙의 (구역, 지표) 현재값/기준(우선순위 순), 남는 줄은 focus 구역(기본: 발동이 가장 많은 구역)의 기준 범위 지표
+        - fired: (N, R) 마스크
+        """
+        labels, x = self.field_matrix(zones)
+        fired = self.fire(x) if len(self.rules) else np.zeros((len(labels), 0), dtype=bool)
+        multi = len(labels) > 1
+
+        counts = fired.sum(axis=0)
+        order = [int(r) for r in np.lexsort((-counts, self.rank)) if counts[r] > 0]
+        actions: List[Tuple[str, str, str]] = []
+        seen_action = set()
+        for r in order:
+            rule = self.rules[r]
+            if rule["action"] in seen_action:
+                continue
+            seen_action.add(rule["action"])
+            actions.append((rule["severity"], rule["action"], rule.get("when", "")))
+        if not actions:
+            actions = list(self.default_actions)
+
+        evidence: List[str] = []
+        seen_cell = set()
+        for r in order:
+            rule = self.rules[r]
+            c = int(self.col[r])
+            for z in np.nonzero(fired[:, r])[0]:
+                if len(evidence) >= max_evidence:
+                    break
+                if (z, c) in seen_cell:
+                    continue
+                seen_cell.add((z, c))
+                prefix = f"{labels[z]} · " if multi else ""
+                label = self.fields.get(rule["field"], {}).get("label", rule["field"])
+                evidence.append(f"{prefix}{label} {self._fmt(rule['field'], x[z, c])} ({self._reference(rule)})")
+        if focus is None and len(labels):
+            focus = int(np.argmax(fired.sum(axis=1))) if fired.size else 0
+        if focus is not None and len(evidence) < max_evidence:
+            for f, info in self.fields.items():
+                c = self.field_names.index(f)
+                if not info.get("band") or (focus, c) in seen_cell or np.isnan(x[focus, c]):
+                    continue
+                lo, hi = info["band"]
+                prefix = f"{labels[focus]} · " if multi else ""
+                evidence.append(f"{prefix}{info.get('label', f)} {self._fmt(f, x[focus, c])} (기준 {lo}~{hi})")
+        return dict(actions=actions, evidence=evidence[:max_evidence], fired=fired)
+
+# -----------------------------
+# 규칙 표 로드/핫 리로드
+# -----------------------------
+class RuleEngine:
+    """
+    규칙 파일을 감시하며 컴파일된 표를 제공.
+    - current(): 최소 check_sec 간격으로 mtime 확인 → 바뀌었으면 다시 컴파일
+    - 컴파일 실패 시 이전 표 유지 + last_error 기록
+    """
+
+    def __init__(self, path: str = RULES_PATH, check_sec: float = 2.0):
+        self.path = path
+        self.check_sec = float(check_sec)
+        self.last_error: Optional[str] = None
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._checked = 0.0
+        self._failed_mtime: Optional[float] = None
+        self._rules = self._compile()
+        if self._rules is None:
+            raise ValueError(f"cannot load rule table {path}: {self.last_error}")
+
+    def _compile(self) -> Optional[CompiledRules]:
+        try:
+            mtime = os.stat(self.path).st_mtime
+            with open(self.path, encoding="utf-8") as f:
+                rules = CompiledRules(json.load(f), source=self.path, mtime=mtime)
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            return None
+        self.last_error = None
+        return rules
+
+    def current(self) -> CompiledRules:
+        now = time.monotonic()
+        if now - self._checked < self.check_sec:
+            return self._rules
+        with self._lock:
+            self._checked = now
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                return self._rules
+            if mtime != self._rules.mtime and mtime != self._failed_mtime:
+                new = self._compile()
+                if new is None:
+                    self._failed_mtime = mtime   # 같은 파일을 반복해서 컴파일하지 않음
+                else:
+                    self._rules = new
+                    self.reloads += 1
+            return self._rules
+
+    def evaluate(self, zones: Mapping[str, Any], **kw) -> Dict[str, Any]:
+        return self.current().evaluate(zones, **kw)
+
+def fill_rules(m: Dict[str, Any], engine: RuleEngine, **kw) -> Dict[str, Any]:
+    """
+    구역 지표로 m["evidence"], m["actions"] 를 채운다(윈도우 집계/변화 감지 반영 뒤 호출).
+    - 구역별 발동 규칙 id 는 m["zone_rules"] = {구역: [규칙 id, ...]}
+    """
+    rules = engine.current()
+    zones = m["zones"] if "zones" in m else {k: m[k] for k in ("loop_a", "loop_b")}
+    res = rules.evaluate(zones, **kw)
+    names = [str(n) for n in zones["name"]] if "name" in zones and isinstance(zones["name"], (list, tuple, np.ndarray)) else list(zones)
+    m["zone_rules"] = {n: [rules.rule_ids[r] for r in np.nonzero(res["fired"][i])[0]] for i, n in enumerate(names)}
+    m["evidence"] = res["evidence"]
+    m["actions"] = res["actions"]
+    return m
+
+_default_engine: Optional[RuleEngine] = None
+_default_lock = threading.Lock()
+
+def get_rule_engine() -> RuleEngine:
+    """
+    프로세스 공용 규칙 엔진.
+    - BIOOS_RULES: 규칙 파일 경로(기본: 저장소의 rules.json)
+    - BIOOS_RULES_CHECK_SEC: 파일 변경 확인 간격(초, 기본 2)
+    """
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            _default_engine = RuleEngine(os.environ.get("BIOOS_RULES") or RULES_PATH,
+                                         check_sec=float(os.environ.get("BIOOS_RULES_CHECK_SEC", "2")))
+        return _default_engine
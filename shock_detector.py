@@ -0,0 +1,182 @@
+from __future__ import annotations
+from typing import Any, Dict, Sequence
+import math
+import numpy as np
+
+from ringbuf import BucketRing
+from risk_engine import CHANNELS
+from tsstore import StoreCursor
+from zones import set_zone_field
+
+class ShockDetector:
+    """
+    갑작스런 변화(Shock Event) 스트리밍 감지기.
+    - 구역 × 채널마다 EWMA 평균/분산만 유지 → 샘플 수와 무관한 고정 메모리
+    - |x - 평균| > z_enter × 표준편차 인 채널이 하나라도 있으면 구역이 '변화 중' 상태로 진입(이벤트 1회)
+    - 모든 채널이 z_exit 이하로 돌아와야 해제(히스테리시스: 한 번의 출렁임을 여러 번 세지 않음)
+    - 최근 24시간 이벤트 수는 분 단위 버킷 링으로 유지 → 과거 재스캔 없음
+    """
+
+    def __init__(self, zones: Sequence[str], channels: Sequence[str] = CHANNELS, alpha: float = 0.02,
+                 z_enter: float = 5.0, z_exit: float = 2.5, warmup: int = 60,
+                 window_sec: float = 24 * 3600, bucket_sec: float = 60.0):
+        self.zones = list(zones)
+        self.channels = tuple(channels)
+        self.alpha = float(alpha)
+        self.z_enter = float(z_enter)
+        self.z_exit = float(z_exit)
+        self.warmup = int(warmup)
+        n, c = len(self.zones), len(self.channels)
+        self.mean = np.zeros((n, c))
+        self.var = np.zeros((n, c))
+        self.count = np.zeros((n, c), dtype=np.int64)
+        self.in_shock = np.zeros(n, dtype=bool)
+        self.events = BucketRing(window_sec, bucket_sec, shape=n, dtype=np.int64)
+        self.samples = 0
+        self._cursor = StoreCursor()   # ingest_store: 구역별 반영 완료 행
+
+    def add_zones(self, zones: Sequence[str]) -> None:
+        """새 구역 추가(기존 구역 상태 유지, 새 구역은 기준선 학습부터)."""
+        new = [z for z in zones if z not in self.zones]
+        if not new:
+            return
+        self.zones += new
+        k, c = len(new), len(self.channels)
+        self.mean = np.vstack([self.mean, np.zeros((k, c))])
+        self.var = np.vstack([self.var, np.zeros((k, c))])
+        self.count = np.vstack([self.count, np.zeros((k, c), dtype=np.int64)])
+        self.in_shock = np.concatenate([self.in_shock, np.zeros(k, dtype=bool)])
+        self.events.grow(len(self.zones))
+
+    def update(self, ts: float, values: Any) -> np.ndarray:
+        """
+        한 시각의 측정값 반영.
+        - values: (N, C) — 결측은 NaN(해당 채널 상태는 갱신하지 않음, 값이 하나도 없는 구역은 상태 유지)
+        - 반환: 이번 시각에 새로 발생한 이벤트 여부 (N,) bool
+        """
+        x = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(x)
+        ready = valid & (self.count >= self.warmup)
+
+        diff = np.where(valid, x - self.mean, 0.0)
+        # EWMA 분산 초기 편향 보정(0 에서 시작하므로 초기에는 과소 추정됨)
+        bias = 1.0 - np.power(1.0 - self.alpha, np.maximum(self.count - 1, 1))
+        std = np.sqrt(self.var / bias) + 1e-9
+        z = np.where(ready, np.abs(diff) / std, 0.0)
+
+        over_enter = np.any(z > self.z_enter, axis=1)
+        over_exit = np.any(z > self.z_exit, axis=1)
+        new_event = over_enter & ~self.in_shock
+        self.in_shock = np.where(valid.any(axis=1), np.where(self.in_shock, over_exit, over_enter), self.in_shock)
+
+        # EWMA 갱신(첫 샘플은 평균 초기화)
+        # - 변화 중인 구역은 학습률을 낮춰 기준선이 이상값에 끌려가지 않게 한다
+        #   (지속적인 수준 변화라면 천천히 새 기준선으로 수렴)
+        first = valid & (self.count == 0)
+        a = np.where(self.in_shock, self.alpha * 0.05, self.alpha)[:, None]
+        self.mean = np.where(first, x, self.mean + np.where(valid, a * diff, 0.0))
+        self.var = np.where(valid & ~first, (1.0 - a) * (self.var + a * diff * diff), self.var)
+        self.count += valid
+
+        if new_event.any():
+            self.events.add(ts, new_event.astype(np.int64))
+        else:
+            self.events.advance(ts)
+        self.samples += 1
+        return new_event
+
+    def update_batch(self, ts: Any, values: Any) -> np.ndarray:
+        """
+        마이크로 배치 반영.
+        - ts: (T,) 오름차순, values: (T, N, C)
+        - 시각 순서대로 상태를 갱신(구역/채널 방향은 벡터화), 반환: 구역별 신규 이벤트 수 (N,)
+        """
+        ts = np.asarray(ts, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        fired = np.zeros(len(self.zones), dtype=np.int64)
+        for t, row in zip(ts, values):
+            fired += self.update(float(t), row)
+        return fired
+
+    def update_zone(self, zone: str, ts: Any, values: Any) -> int:
+        """
+        한 구역의 마이크로 배치 반영(구역마다 시각이 다른 소스: 센서 DB/이력 저장소).
+        - ts: (T,) 오름차순, values: (T, C) — 다른 구역 상태는 건드리지 않음
+        - update() 와 같은 계산을 구역 1개의 스칼라로 수행(행마다 배열 연산을 만들지 않음 → 백필이 빠름)
+        - 반환: 신규 이벤트 수
+        """
+        i = self.zones.index(zone)
+        mean, var, count = self.mean[i].tolist(), self.var[i].tolist(), self.count[i].tolist()
+        shock = bool(self.in_shock[i])
+        c_range = range(len(self.channels))
+        keep = 1.0 - self.alpha
+        one = np.zeros(len(self.zones), dtype=np.int64)
+        one[i] = 1
+        ts = np.asarray(ts, dtype=np.float64)
+        fired = 0
+        for t, row in zip(ts.tolist(), np.asarray(values, dtype=np.float64).tolist()):
+            enter = over_exit = seen = False
+            for j in c_range:
+                v = row[j]
+                if v != v:   # NaN
+                    continue
+                seen = True
+                if count[j] >= self.warmup:
+                    std = math.sqrt(var[j] / (1.0 - keep ** max(count[j] - 1, 1))) + 1e-9
+                    z = abs(v - mean[j]) / std
+                    enter = enter or z > self.z_enter
+                    over_exit = over_exit or z > self.z_exit
+            if enter and not shock:
+                self.events.add(t, one)
+                fired += 1
+            if seen:
+                shock = over_exit if shock else enter
+            a = self.alpha * 0.05 if shock else self.alpha
+            for j in c_range:
+                v = row[j]
+                if v != v:
+                    continue
+                if count[j] == 0:
+                    mean[j] = v
+                else:
+                    d = v - mean[j]
+                    mean[j] += a * d
+                    var[j] = (1.0 - a) * (var[j] + a * d * d)
+                count[j] += 1
+        self.mean[i], self.var[i], self.count[i], self.in_shock[i] = mean, var, count, shock
+        if ts.size:
+            self.events.advance(float(ts[-1]))
+            self.samples += int(ts.size)
+        return fired
+
+    def ingest_store(self, store: Any, until: float) -> int:
+        """
+        센서 이력 저장소(tsstore)의 새 행만 반영(구역별 마지막으로 읽은 행 다음부터, 확정된 행까지).
+        - 첫 호출은 이벤트 윈도우(24시간) 시작보다 warmup 행 앞에서 시작(기준선 학습, 그 구간 이벤트는
+          윈도우 밖이라 세지 않음), 이후에는 증분만 읽음
+        - 반환: 반영한 행 수
+        """
+        n = 0
+        start = until - self.events.n_buckets * self.events.bucket_sec
+        present = set(store.zones())
+        for zone in self.zones:
+            if zone not in present:
+                continue
+            ts, x = self._cursor.read_new(store, zone, self.channels, start, lookback=self.warmup)
+            if ts.size:
+                self.update_zone(zone, ts, x)
+                n += int(ts.size)
+        return n
+
+    def counts_24h(self, now: float) -> np.ndarray:
+        """구역별 최근 윈도우(기본 24시간) 이벤트 수 (N,)."""
+        return self.events.window_total(now)
+
+    def fill_metrics(self, m: Dict[str, Any], now: float) -> Dict[str, Any]:
+        """
+        load_latest_metrics 결과의 구역 지표에 shock_24h 를 채운다.
+        - build_report_payload 는 기존처럼 구역별 shock_24h 를 합산
+        """
+        counts = self.counts_24h(now)
+        set_zone_field(m, self.zones, "shock_24h", [int(c) for c in counts])
+        return m
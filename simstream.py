@@ -0,0 +1,133 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Sequence, Tuple
+import numpy as np
+
+from risk_engine import CHANNELS
+
+# -----------------------------
+# 합성 센서 스트림(부하 시험/장비 용량 산정용)
+# -----------------------------
+# app.py 데모 시나리오 4종을 정지 화면이 아니라 시간에 따라 변하는 다구역 스트림으로 만든다.
+# - seed 가 같고 next() 호출 순서가 같으면 항상 같은 값(결정적)
+# - 값 = 기준값 + 구역별 오프셋 + 느린 변동(사인파 2개, 시각의 함수) + 센서 잡음 + 고장 모드(onset 이후 ramp)
+# - 1 Hz ~ 구역당 초당 수천 샘플까지: 한 번에 (T, N, C) 배열로 생성(샘플 단위 파이썬 루프 없음)
+
+SCENARIOS: Tuple[str, ...] = ("일반", "산소량 급락", "물 흐름 저하", "여과 부담 증가")
+
+BASELINE: Dict[str, float] = {"do": 7.3, "temp": 16.7, "ph": 7.86, "sal": 31.0}
+NOISE: Dict[str, float] = {"do": 0.08, "temp": 0.03, "ph": 0.01, "sal": 0.05}    # 센서 잡음(표준편차)
+DRIFT: Dict[str, float] = {"do": 0.25, "temp": 0.30, "ph": 0.03, "sal": 0.15}    # 느린 변동 진폭
+
+# 고장 모드: ramp 완료 후 채널 변화량, 설비 사용률 목표, 급변(spike) 빈도/크기
+FAILURE_MODES: Dict[str, Dict[str, Any]] = {
+    "일반": dict(shift={}, util=0.72, spikes_per_hour=0.0, spike={}),
+    "산소량 급락": dict(shift={"do": -2.0, "ph": -0.15}, util=0.92, spikes_per_hour=8.0, spike={"do": -1.5}),
+    "물 흐름 저하": dict(shift={"do": -0.7, "temp": 0.4, "ph": -0.10}, util=0.88, spikes_per_hour=1.0, spike={"do": -0.8}),
+    "여과 부담 증가": dict(shift={"ph": -0.30, "do": -0.3}, util=0.84, spikes_per_hour=0.5, spike={"ph": -0.2}),
+}
+
+def zone_names(n: int) -> List[str]:
+    """구역 이름: 앞 2개는 데모와 같은 loop_a/loop_b, 이후 z003, z004, ..."""
+    base = ["loop_a", "loop_b"]
+    return base[:n] + [f"z{i + 1:03d}" for i in range(2, n)]
+
+class SyntheticStream:
+    """
+    결정적 다구역 센서 스트림.
+    - zones: 구역 수, rate_hz: 구역당 초당 샘플 수
+    - scenario: SCENARIOS 중 하나, affected: 고장 모드가 적용되는 앞쪽 구역 수
+    - onset_sec 이후 ramp_sec 동안 고장 모드 변화량이 선형으로 커짐
+    - next(duration_sec) → (ts (T,), values (T, N, C), util (T, N))
+    """
+
+    def __init__(self, zones: int = 2, rate_hz: float = 1.0, scenario: str = "일반", seed: int = 0,
+                 start: float = 0.0, affected: int = 1, onset_sec: float = 600.0, ramp_sec: float = 900.0,
+                 channels: Sequence[str] = CHANNELS):
+        if scenario not in FAILURE_MODES:
+            raise ValueError(f"unknown scenario {scenario!r} (known: {', '.join(SCENARIOS)})")
+        if rate_hz <= 0 or zones <= 0:
+            raise ValueError("zones and rate_hz must be positive")
+        self.zones = zone_names(int(zones))
+        self.channels = tuple(channels)
+        self.rate_hz = float(rate_hz)
+        self.scenario = scenario
+        self.start = float(start)
+        self.onset_sec = float(onset_sec)
+        self.ramp_sec = max(float(ramp_sec), 1e-9)
+        self.elapsed = 0.0  # 생성을 마친 구간 끝(시작 후 초)
+        self.emitted = 0    # 구역당 생성한 샘플 수
+
+        n, c = len(self.zones), len(self.channels)
+        init = np.random.default_rng([seed, 0])
+        self._noise = np.random.default_rng([seed, 1])
+        mode = FAILURE_MODES[scenario]
+        ch = {name: i for i, name in enumerate(self.channels)}
+
+        self._base = np.array([BASELINE[x] for x in self.channels]) + init.normal(0, 0.3, (n, c)) * np.array(
+            [NOISE[x] for x in self.channels])
+        self._sigma = np.array([NOISE[x] for x in self.channels])
+        # 느린 변동: 주기 6~30시간 / 20~90분 사인파 2개(구역·채널마다 위상 다름)
+        self._amp = np.array([DRIFT[x] for x in self.channels]) * init.uniform(0.5, 1.0, (2, n, c))
+        self._period = np.stack([init.uniform(6 * 3600, 30 * 3600, (n, c)), init.uniform(1200, 5400, (n, c))])
+        self._phase = init.uniform(0, 2 * np.pi, (2, n, c))
+
+        self._hit = np.arange(n) < int(affected)
+        self._shift = np.zeros(c)
+        for k, v in mode["shift"].items():
+            if k in ch:
+                self._shift[ch[k]] = v
+        self._spike = np.zeros(c)
+        for k, v in mode["spike"].items():
+            if k in ch:
+                self._spike[ch[k]] = v
+        self._spike_p = mode["spikes_per_hour"] / 3600.0 / self.rate_hz
+        self._util_base = init.uniform(0.60, 0.75, n)
+        self._util_fault = float(mode["util"])
+
+    def next(self, duration_sec: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """다음 duration_sec 구간의 샘플(구간 안에 샘플 시각이 없으면 T=0). 시각은 샘플 번호 / rate_hz."""
+        i0 = self.emitted
+        self.elapsed += float(duration_sec)
+        i1 = max(i0, int(np.ceil(self.elapsed * self.rate_hz - 1e-9)))
+        self.emitted = i1
+        k = np.arange(i0, i1, dtype=np.float64)
+        el = k / self.rate_hz                                   # 시작 후 경과 초 (T,)
+        ts = self.start + el
+        n, c = len(self.zones), len(self.channels)
+
+        w = 2 * np.pi * el[:, None, None]
+        x = self._base + (self._amp[0] * np.sin(w / self._period[0] + self._phase[0])
+                          + self._amp[1] * np.sin(w / self._period[1] + self._phase[1]))
+        x += self._noise.normal(0.0, 1.0, (ts.size, n, c)) * self._sigma
+
+        ramp = np.clip((el - self.onset_sec) / self.ramp_sec, 0.0, 1.0)   # (T,)
+        hit = self._hit[None, :, None]
+        x += np.where(hit, ramp[:, None, None] * self._shift, 0.0)
+
+        util = self._util_base + np.where(self._hit, ramp[:, None] * (self._util_fault - self._util_base), 0.0)
+        util = np.clip(util + self._noise.normal(0.0, 0.01, (ts.size, n)), 0.0, 1.0)
+
+        if self._spike_p > 0:
+            # 급변: onset 이후, 고장 구역에서만. 1샘플이 아니라 약 5초간 유지
+            hold = max(1, int(round(5.0 * self.rate_hz)))
+            start = (self._noise.random((ts.size, n)) < self._spike_p) & self._hit & (el >= self.onset_sec)[:, None]
+            on = _hold(start, hold)
+            x += on[:, :, None] * self._spike
+        return ts, x, util
+
+    def latest(self, values: np.ndarray, util: np.ndarray) -> Dict[str, Dict[str, float]]:
+        """next() 결과의 마지막 시각 값 → {구역: {채널: 값, util: 값}} (load_latest_metrics 의 구역 dict 형식)."""
+        out: Dict[str, Dict[str, float]] = {}
+        for i, z in enumerate(self.zones):
+            row = {ch: float(values[-1, i, j]) for j, ch in enumerate(self.channels)}
+            row["util"] = float(util[-1, i])
+            out[z] = row
+        return out
+
+def _hold(start: np.ndarray, hold: int) -> np.ndarray:
+    # (T, N) 시작 표시 → 시작 후 hold 샘플 동안 True (청크 경계에서는 잘림)
+    c = np.cumsum(start, axis=0)
+    lag = np.zeros_like(c)
+    if hold < len(c):
+        lag[hold:] = c[:-hold]
+    return (c - lag) > 0
@@ -0,0 +1,237 @@
+from __future__ import annotations
+from typing import Any, Callable, Deque, Dict, List
+from collections import deque
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:   # Windows: 메모리 기록 생략
+    resource = None
+
+# -----------------------------
+# 단계별 소요 시간/메모리 계측(span)
+# -----------------------------
+# 메트릭 로드 → payload → 차트 래스터화 → reportlab 조판(doc.build) → 다운로드 전달 중 어디가 느린지 보기 위한
+# 가벼운 계측. 이름별로 최근 WINDOW 개의 소요 시간만 보관하고 조회 시 p50/p95/p99 를 계산한다.
+# - 끄면(BIOOS_SPANS=0) span() 은 공용 no-op 객체를 돌려줄 뿐(시각/잠금/할당 없음)
+# - 메모리: 구간 동안 프로세스 최대 RSS 가 늘어난 양(어느 단계가 최고점을 올렸는지)
+# - 내보내기: Prometheus 텍스트 / JSON (파일 주기 기록 또는 로컬 HTTP)
+
+ENABLED = os.environ.get("BIOOS_SPANS", "1") != "0"
+WINDOW = int(os.environ.get("BIOOS_SPANS_WINDOW", "1024"))
+
+class _Stat:
+    __slots__ = ("count", "total", "recent", "rss_grow_kb", "last_at")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.recent: Deque[float] = deque(maxlen=WINDOW)
+        self.rss_grow_kb = 0
+        self.last_at = 0.0
+
+_stats: Dict[str, _Stat] = {}
+_lock = threading.Lock()
+
+def _maxrss_kb() -> int:
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss   # macOS: bytes, Linux: KB
+
+def record(name: str, seconds: float, rss_grow_kb: int = 0) -> None:
+    """소요 시간 1건 기록(외부에서 잰 시간도 여기로: 예) 작업 큐 대기 시간)."""
+    if not ENABLED:
+        return
+    with _lock:
+        st = _stats.get(name)
+        if st is None:
+            st = _stats[name] = _Stat()
+        st.count += 1
+        st.total += seconds
+        st.recent.append(seconds)
+        st.rss_grow_kb = max(st.rss_grow_kb, rss_grow_kb)
+        st.last_at = time.time()
+
+class _Span:
+    __slots__ = ("name", "t0", "rss0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.rss0 = _maxrss_kb()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        dt = time.perf_counter() - self.t0
+        record(self.name, dt, _maxrss_kb() - self.rss0)
+        return False
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoSpan":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+_NOOP = _NoSpan()
+
+def span(name: str):
+    """with span("pdf.layout.kr"): ... — 꺼져 있으면 no-op."""
+    return _Span(name) if ENABLED else _NOOP
+
+def traced(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """함수 전체를 span 으로 감싸는 데코레이터."""
+    def wrap(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with _Span(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+def set_enabled(flag: bool) -> None:
+    global ENABLED
+    ENABLED = bool(flag)
+
+def reset() -> None:
+    with _lock:
+        _stats.clear()
+
+# -----------------------------
+# 집계/내보내기
+# -----------------------------
+def _quantile(sorted_xs: List[float], q: float) -> float:
+    if not sorted_xs:
+        return 0.0
+    return sorted_xs[min(len(sorted_xs) - 1, int(round(q * (len(sorted_xs) - 1))))]
+
+def snapshot() -> List[Dict[str, Any]]:
+    """이름별 집계(최근 WINDOW 건 기준 분위수), 누적 시간 큰 순서."""
+    with _lock:
+        items = [(name, st.count, st.total, sorted(st.recent), st.rss_grow_kb, st.last_at)
+                 for name, st in _stats.items()]
+    rows = []
+    for name, count, total, xs, grow, last in items:
+        rows.append(dict(
+            span=name, count=count, total_s=round(total, 4),
+            p50_ms=round(_quantile(xs, 0.50) * 1000, 2), p95_ms=round(_quantile(xs, 0.95) * 1000, 2),
+            p99_ms=round(_quantile(xs, 0.99) * 1000, 2), max_ms=round((xs[-1] if xs else 0.0) * 1000, 2),
+            rss_grow_mb=round(grow / 1024, 1), last_at=last,
+        ))
+    rows.sort(key=lambda r: r["total_s"], reverse=True)
+    return rows
+
+def peak_rss_mb() -> float:
+    return round(_maxrss_kb() / 1024, 1)
+
+def _label(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def prometheus_text() -> str:
+    """Prometheus 텍스트 형식(summary: 분위수 + _sum/_count, 최대 RSS gauge)."""
+    out = [
+        "# HELP bioos_span_seconds Bio-OS stage latency (quantiles over recent window)",
+        "# TYPE bioos_span_seconds summary",
+    ]
+    for r in snapshot():
+        lab = _label(r["span"])
+        for q, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+            out.append(f'bioos_span_seconds{{span="{lab}",quantile="{q}"}} {r[key] / 1000:.6f}')
+        out.append(f'bioos_span_seconds_sum{{span="{lab}"}} {r["total_s"]:.6f}')
+        out.append(f'bioos_span_seconds_count{{span="{lab}"}} {r["count"]}')
+    out += [
+        "# HELP bioos_process_peak_rss_bytes Peak resident set size of the process",
+        "# TYPE bioos_process_peak_rss_bytes gauge",
+        f"bioos_process_peak_rss_bytes {_maxrss_kb() * 1024}",
+    ]
+    return "\n".join(out) + "\n"
+
+def to_json() -> str:
+    return json.dumps(dict(generated_at=time.time(), enabled=ENABLED, window=WINDOW,
+                           peak_rss_mb=peak_rss_mb(), spans=snapshot()), ensure_ascii=False, indent=2)
+
+def write_export(path: str) -> None:
+    """파일로 내보내기(.json 이면 JSON, 그 외 Prometheus 텍스트). 원자적으로 교체."""
+    text = to_json() if path.lower().endswith(".json") else prometheus_text()
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+# -----------------------------
+# 주기 기록 / 로컬 HTTP
+# -----------------------------
+_exporter_started = False
+exporter_errors: List[str] = []   # 내보내기 시작 실패(예: 포트 사용 중) — 관리자 패널 표시용
+
+def start_exporter() -> bool:
+    """
+    환경 변수에 따라 내보내기 시작(프로세스당 1회).
+    - BIOOS_SPANS_EXPORT: 파일 경로(.prom/.txt 또는 .json), BIOOS_SPANS_EXPORT_SEC 마다(기본 15초) 기록
+    - BIOOS_SPANS_PORT: 127.0.0.1:<port> 에서 /metrics(Prometheus), /metrics.json 제공
+    - 반환: 이번 호출에서 시작했으면 True
+    """
+    global _exporter_started
+    path = os.environ.get("BIOOS_SPANS_EXPORT")
+    port = os.environ.get("BIOOS_SPANS_PORT")
+    with _lock:
+        if _exporter_started or not (path or port):
+            return False
+        _exporter_started = True
+    if path:
+        every = float(os.environ.get("BIOOS_SPANS_EXPORT_SEC", "15"))
+
+        def loop() -> None:
+            while True:
+                try:
+                    write_export(path)
+                except OSError:
+                    pass   # 다음 주기에 다시 시도
+                time.sleep(every)
+        threading.Thread(target=loop, name="bioos-spans-export", daemon=True).start()
+    if port:
+        _serve(int(port))
+    return True
+
+def _serve(port: int) -> None:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.startswith("/metrics.json"):
+                body, ctype = to_json().encode("utf-8"), "application/json; charset=utf-8"
+            elif self.path.startswith("/metrics"):
+                body, ctype = prometheus_text().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    except OSError as e:
+        # 포트 사용 중(두 번째 인스턴스 등): 계측 HTTP 만 포기하고 앱은 계속 실행
+        msg = f"BIOOS_SPANS_PORT={port}: {e}"
+        exporter_errors.append(msg)
+        print(f"[spans] exporter not started: {msg}", file=sys.stderr)
+        return
+    threading.Thread(target=server.serve_forever, name="bioos-spans-http", daemon=True).start()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+from typing import Dict, List, Tuple
+import importlib
+import sys
+import threading
+import time
+
+# 프로세스 시작(이 모듈이 처음 import 된 시점) 기준 시각
+PROCESS_T0 = time.perf_counter()
+
+_times: Dict[str, float] = {}
+_lock = threading.Lock()
+
+def record(label: str, seconds: float) -> None:
+    """시작 단계별 소요 시간 기록(같은 label 은 최초 1회만)."""
+    with _lock:
+        _times.setdefault(label, float(seconds))
+
+def timed_import(name: str):
+    """
+    모듈 import + 최초 import 비용 기록.
+    - 이미 로드된 모듈은 sys.modules 에서 바로 반환(비용 0, 기록 안 함)
+    - 다른 스레드(워밍업)가 import 중인 모듈은 import_module 로 완료를 기다린다
+    """
+    mod = sys.modules.get(name)
+    if mod is not None and not getattr(getattr(mod, "__spec__", None), "_initializing", False):
+        return mod
+    t0 = time.perf_counter()
+    mod = importlib.import_module(name)
+    record(f"import {name}", time.perf_counter() - t0)
+    return mod
+
+def breakdown() -> List[Tuple[str, float]]:
+    """기록된 단계별 소요 시간(초), 큰 순서."""
+    with _lock:
+        return sorted(_times.items(), key=lambda kv: kv[1], reverse=True)
+
+# -----------------------------
+# 백그라운드 워밍업
+# -----------------------------
+_warm_started = False
+_warm_done = threading.Event()
+
+def warm_up_async(modules: Tuple[str, ...], extra=None) -> bool:
+    """
+    무거운 모듈을 백그라운드 스레드에서 미리 import(프로세스당 1회).
+    - 첫 화면을 그린 뒤 호출 → 사용자가 버튼을 누를 때는 이미 로드된 상태
+    - extra: import 후 실행할 추가 준비 함수(선택)
+    - 반환: 이번 호출에서 워밍업을 시작했으면 True
+    """
+    global _warm_started
+    with _lock:
+        if _warm_started:
+            return False
+        _warm_started = True
+
+    def run() -> None:
+        t0 = time.perf_counter()
+        try:
+            for name in modules:
+                timed_import(name)
+            if extra is not None:
+                extra()
+        except Exception:
+            pass   # 워밍업 실패는 무시: 실제 사용 시점에 다시 import 되며 그때 오류가 드러남
+        finally:
+            record("warm-up (background)", time.perf_counter() - t0)
+            _warm_done.set()
+
+    threading.Thread(target=run, name="bioos-warmup", daemon=True).start()
+    return True
+
+def warm_up_done() -> bool:
+    return _warm_done.is_set()
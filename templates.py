@@ -0,0 +1,153 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from io import BytesIO
+from types import SimpleNamespace
+import os
+import threading
+
+from reportlab.platypus import SimpleDocTemplate, Frame, Flowable
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.lib.pagesizes import A4
+
+from spans import span, traced
+
+# -----------------------------
+# 정적 페이지 템플릿 모드
+# -----------------------------
+# 백서 본문, 영문 용어집 페이지, 국문 제출용 섹션(7~9)은 내용이 고정이다.
+# 템플릿 모드에서는 이 본문을 템플릿 버전당 1회만 조판해 두고, 요청 시에는
+#   (1) 동적 페이지만 조판하고
+#   (2) 정적 페이지 위에 머리말/꼬리말(문서번호·Rev.·보안등급·쪽번호) 오버레이를 얹어
+# 합친다(pypdf 필요). pypdf 가 없거나 꺼져 있으면 기존 전체 조판 경로를 그대로 쓴다.
+#
+# BIOOS_TEMPLATE_MODE=1 로 켠다.
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:   # 선택 의존성
+    PdfReader = PdfWriter = None
+
+DOC_KW = dict(pagesize=A4, leftMargin=36, rightMargin=36, topMargin=40, bottomMargin=36)
+
+def template_mode_enabled() -> bool:
+    return PdfWriter is not None and os.environ.get("BIOOS_TEMPLATE_MODE", "0") == "1"
+
+class YMark(Flowable):
+    """조판 중 현재 세로 위치(캔버스 절대 y)와 쪽 번호를 기록하는 0 크기 flowable."""
+
+    def __init__(self, sink: Dict[str, Any]):
+        super().__init__()
+        self.sink = sink
+        self.width = self.height = 0
+
+    def wrap(self, aW: float, aH: float) -> Tuple[float, float]:
+        return 0, 0
+
+    def drawOn(self, canvas, x: float, y: float, _sW: float = 0) -> None:
+        self.sink["y"] = y
+        self.sink["page"] = canvas.getPageNumber()
+
+    def draw(self) -> None:
+        pass
+
+# -----------------------------
+# 정적 본문 캐시
+# -----------------------------
+_static: Dict[Tuple[str, str], Tuple[bytes, Dict[str, Any]]] = {}
+_static_lock = threading.Lock()
+_readers: Dict[bytes, Any] = {}
+
+def static_body(name: str, version: str, build_elements: Callable[[Dict[str, Any]], List[Any]]) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    정적 본문 PDF(머리말/꼬리말 없음)를 (name, version) 당 1회 조판해 캐시.
+    - build_elements(marks) → flowable 목록. YMark(marks) 로 위치를 기록할 수 있음
+    - 반환: (PDF bytes, marks) — marks["pages"] 에 쪽 수
+    """
+    key = (name, version)
+    with _static_lock:
+        hit = _static.get(key)
+    if hit is not None:
+        return hit
+    marks: Dict[str, Any] = {}
+    buf = BytesIO()
+    doc = SimpleDocTemplate(buf, **DOC_KW)
+    with span("pdf.layout.static"):
+        doc.build(build_elements(marks))
+    marks["pages"] = doc.page
+    out = (buf.getvalue(), marks)
+    _readers[out[0]] = PdfReader(BytesIO(out[0]))   # 정적 본문은 파싱도 1회만
+    with _static_lock:
+        _static.setdefault(key, out)
+    return out
+
+# -----------------------------
+# 오버레이/조립
+# -----------------------------
+def overlay_pages(n_pages: int, first_page_no: int, on_page: Callable[[Canvas, Any], None],
+                  fill: Optional[Callable[[Canvas, int], bool]] = None) -> Optional[bytes]:
+    """
+    머리말/꼬리말만 그린 오버레이 PDF(n_pages 쪽).
+    - on_page(canvas, doc): 기존 _on_page_kr/_on_page_en 과 같은 서명(doc.page 만 사용)
+    - fill(canvas, i): i 번째 쪽에 동적 내용을 추가로 조판. False 를 반환하면(공간 부족) None
+    """
+    buf = BytesIO()
+    c = Canvas(buf, pagesize=A4)
+    for i in range(n_pages):
+        page_no = first_page_no + i
+        on_page(c, SimpleNamespace(page=page_no))
+        if fill is not None and not fill(c, i):
+            return None
+        c.showPage()
+    c.save()
+    return buf.getvalue()
+
+def frame_below(y_top: float) -> Frame:
+    """정적 본문의 YMark 위치(y_top)부터 아래 여백까지의 조판 영역(SimpleDocTemplate 본문 프레임과 같은 x/폭/여백)."""
+    doc = SimpleDocTemplate(BytesIO(), **DOC_KW)
+    pad = 6
+    return Frame(doc.leftMargin, doc.bottomMargin, doc.width, (y_top - doc.bottomMargin) + pad,
+                 leftPadding=pad, rightPadding=pad, topPadding=pad, bottomPadding=pad)
+
+def fits_below(y_top: float, flowables: List[Any]) -> bool:
+    """flowables 가 frame_below(y_top) 에 모두 들어가는지(버리는 캔버스에 시험 조판)."""
+    rest = list(flowables)
+    frame_below(y_top).addFromList(rest, Canvas(BytesIO(), pagesize=A4))
+    return not rest
+
+def assemble(dynamic: bytes, static: bytes, overlay: Optional[bytes]) -> bytes:
+    """동적 페이지 + (오버레이를 얹은) 정적 페이지 → 하나의 PDF."""
+    w = PdfWriter()
+    w.append(PdfReader(BytesIO(dynamic)))
+    n_dyn = len(w.pages)
+    reader = _readers.get(static)
+    if reader is None:
+        w.append(PdfReader(BytesIO(static)))
+    else:
+        with _static_lock:   # PdfReader 는 스트림 위치를 공유 → 동시 사용 금지
+            w.append(reader)
+    if overlay is not None:
+        for i, ov in enumerate(PdfReader(BytesIO(overlay)).pages):
+            w.pages[n_dyn + i].merge_page(ov)
+            w.pages[n_dyn + i].compress_content_streams()   # 병합된 내용 스트림은 비압축 배열로 남음
+    # 동적/정적/오버레이 PDF 가 각자 가진 같은 글꼴·자원 객체를 하나로(병합 전 대비 용량 증가 방지)
+    w.compress_identical_objects()
+    out = BytesIO()
+    w.write(out)
+    return out.getvalue()
+
+@traced("pdf.merge")
+def merge_static(dynamic: bytes, n_dynamic: int, static: Tuple[bytes, Dict[str, Any]],
+                 on_page: Optional[Callable[[Canvas, Any], None]] = None,
+                 fill: Optional[Callable[[Canvas, int], bool]] = None) -> Optional[bytes]:
+    """
+    동적 PDF(n_dynamic 쪽) 뒤에 static_body() 결과를 붙인다.
+    - on_page/fill 이 있으면 정적 쪽마다 오버레이를 얹는다(쪽 번호는 n_dynamic + 1 부터)
+    - 오버레이 조판 공간이 부족하면 None → 호출 측에서 전체 조판으로 대체
+    """
+    pdf, marks = static
+    overlay = None
+    if on_page is not None or fill is not None:
+        overlay = overlay_pages(marks["pages"], n_dynamic + 1, on_page or (lambda c, d: None), fill)
+        if overlay is None:
+            return None
+    return assemble(dynamic, pdf, overlay)
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# 저장소 모듈은 평평한 구조(패키지 아님) → 루트를 import 경로에 추가
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# 테스트 중에는 백그라운드 예열/프리페치를 끈다
+os.environ.setdefault("BIOOS_WARMUP", "0")
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from archive import ReportArchive, revision_rows
+from batch import Job, _revision_preparer
+
+META = dict(facility_name="F1", doc_id="DOC-1", report_period="2026-02-10 ~ 2026-02-16")
+
+def _meta(rev, rev_date, rev_desc="-", **kw):
+    return dict(META, rev=rev, rev_date=rev_date, rev_desc=rev_desc, **kw)
+
+@pytest.fixture
+def arc(tmp_path):
+    a = ReportArchive(str(tmp_path))
+    yield a
+    a.close()
+
+def _blobs(root):
+    return sorted(f for _, _, files in os.walk(os.path.join(root, "blobs")) for f in files)
+
+def test_put_get_and_content_dedupe(arc, tmp_path):
+    pdf = b"%PDF-1.4 " + b"x" * 4000
+    a = arc.put(pdf, _meta("v1.0", "2026-02-01"), "kr_1p")
+    b = arc.put(pdf, _meta("v1.0", "2026-02-01"), "en_1p")        # 같은 bytes → blob 1개
+    assert a["sha256"] == b["sha256"] and arc.get(a["sha256"]) == pdf
+    s = arc.stats()
+    assert (s["reports"], s["blobs"], s["deduped"]) == (2, 1, 1)
+    assert s["stored_bytes"] < s["bytes"]                          # 압축 저장
+    assert len(_blobs(str(tmp_path))) == 1
+
+def test_replacing_a_report_removes_orphan_blob(arc, tmp_path):
+    old = arc.put(b"old", _meta("v1.0", "2026-02-01"), "kr_1p")
+    new = arc.put(b"new", _meta("v1.0", "2026-02-01"), "kr_1p")
+    assert arc.stats()["reports"] == 1
+    with pytest.raises(KeyError):
+        arc.get(old["sha256"])
+    assert _blobs(str(tmp_path)) == [new["sha256"]]
+
+def test_revisions_ordered_by_date_then_first_archived(arc):
+    arc.put(b"b", _meta("v1.1", "2026-03-01", "보완"), "kr_1p")
+    arc.put(b"a", _meta("v1.0", "2026-02-01", "최초 발행"), "kr_1p")
+    arc.put(b"c", _meta("v1.1", "2026-03-05", "나중 값"), "en_1p")   # 같은 개정: 처음 보관된 값 유지
+    arc.put(b"d", _meta("v1.2", "2026-03-01", "같은 날 두 번째"), "kr_1p")
+    assert arc.revisions("F1", "DOC-1") == [
+        ("v1.0", "2026-02-01", "최초 발행"),
+        ("v1.1", "2026-03-01", "보완"),
+        ("v1.2", "2026-03-01", "같은 날 두 번째"),
+    ]
+    assert arc.latest("F1", "DOC-1", "kr_1p")["rev"] == "v1.2"
+
+def test_listing_pages_by_id(arc):
+    for i in range(5):
+        arc.put(bytes([i]), _meta(f"v{i}", "2026-02-01"), "kr_1p")
+    first = arc.listing(limit=3)
+    rest = arc.listing(limit=3, before_id=first[-1]["id"])
+    assert [r["rev"] for r in first + rest] == ["v4", "v3", "v2", "v1", "v0"]
+
+def test_revision_rows_replaces_or_appends_current():
+    hist = [("v1.0", "2026-02-01", "최초 발행"), ("v1.1", "2026-03-01", "보완")]
+    assert revision_rows(hist, _meta("v1.1", "2026-03-02", "수정"))[-1] == ["v1.1", "2026-03-02", "수정"]
+    assert len(revision_rows(hist, _meta("v1.1", "2026-03-02"))) == 2
+    assert revision_rows(hist, _meta("v2.0", "2026-04-01"))[-1][0] == "v2.0"
+
+def test_batch_sees_earlier_revisions_in_the_same_batch(arc):
+    arc.put(b"a", _meta("v1.0", "2026-02-01", "최초 발행"), "kr_1p")
+    jobs = [Job(f"j{i}", i, "kr_3p", {}, _meta(rev, date)) for i, (rev, date) in
+            enumerate([("v1.1", "2026-03-01"), ("v1.2", "2026-04-01")])]
+    prepare = _revision_preparer(arc, jobs)
+    for job in reversed(jobs):          # 제출 순서와 무관하게 입력 순서로 판단
+        prepare(job)
+    assert [r[0] for r in jobs[0].revisions] == ["v1.0", "v1.1"]
+    assert [r[0] for r in jobs[1].revisions] == ["v1.0", "v1.1", "v1.2"]
@@ -0,0 +1,78 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+import ingest
+from ingest import IngestPoller, SqliteSource, append_sqlite, init_sqlite, open_source
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "sensors.db")
+    init_sqlite(path)
+    conn = sqlite3.connect(path)
+    src = SqliteSource(path)
+    yield path, conn, src
+    src.close()
+    conn.close()
+
+def _drain(poller, until, rounds=20):
+    seen = {}
+    for _ in range(rounds):
+        for z, (ts, x) in poller.poll(until).items():
+            seen.setdefault(z, []).extend(x[:, 0].tolist())
+    return seen
+
+def test_same_ts_rows_at_batch_boundary_are_not_lost(db):
+    _, conn, src = db
+    append_sqlite(conn, "a", [1, 2, 2, 2, 2, 2, 3], {"do": np.arange(7.0)})
+    append_sqlite(conn, "b", [1, 1, 1], {"do": np.arange(3.0)})
+    conn.commit()
+    # 폴링 1회 = 배치 1개(구역당 2행) → 같은 시각 5행이 여러 배치에 걸친다
+    poller = IngestPoller(src, backfill_sec=100, batch_rows=4, max_batches=1)
+    seen = _drain(poller, 10.0)
+    assert seen == {"a": [0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0], "b": [0.0, 1.0, 2.0]}
+
+def test_late_row_with_same_ts_is_picked_up(db):
+    _, conn, src = db
+    append_sqlite(conn, "a", [1, 2, 3], {"do": [1.0, 2.0, 3.0]})
+    conn.commit()
+    poller = IngestPoller(src, backfill_sec=100)
+    assert poller.poll(10.0)["a"][0].tolist() == [1.0, 2.0, 3.0]
+    append_sqlite(conn, "a", [3, 4], {"do": [30.0, 4.0]})     # 마지막 시각과 같은 시각이 나중에 커밋
+    conn.commit()
+    ts, x = poller.poll(10.0)["a"]
+    assert ts.tolist() == [3.0, 4.0] and x[:, 0].tolist() == [30.0, 4.0]
+    assert poller.poll(10.0) == {}
+    assert poller.watermarks["a"][0] == 4.0
+
+def test_until_and_backfill_bounds(db):
+    _, conn, src = db
+    append_sqlite(conn, "a", [1, 50, 95, 120], {"do": [1.0, 2.0, 3.0, 4.0], "util": [0.5, np.nan, 0.7, 0.9]})
+    conn.commit()
+    poller = IngestPoller(src, backfill_sec=60)
+    ts, x = poller.poll(100.0)["a"]
+    assert ts.tolist() == [50.0, 95.0]                        # (until - backfill, until]
+    assert poller.latest_zones()["a"]["util"] == 0.7          # 필드별 마지막 NaN 아닌 값
+    assert poller.poll(200.0)["a"][0].tolist() == [120.0]
+
+def test_many_zones_split_across_queries(db, monkeypatch):
+    _, conn, src = db
+    monkeypatch.setattr(ingest, "_ZONES_PER_QUERY", 2)
+    for i in range(5):
+        append_sqlite(conn, f"z{i}", [1, 2], {"do": [i, i]})
+    conn.commit()
+    got = IngestPoller(src, backfill_sec=100).poll(10.0)
+    assert sorted(got) == [f"z{i}" for i in range(5)]
+    assert all(ts.tolist() == [1.0, 2.0] for ts, _ in got.values())
+
+def test_read_only_pool_and_open_source(db):
+    path, _, src = db
+    with src.connection() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO readings (zone, ts) VALUES ('x', 1)")
+    assert isinstance(open_source(f"sqlite://{path}"), SqliteSource)
+    with pytest.raises(ValueError):
+        open_source("nosuch://db")
+    with pytest.raises(ValueError):
+        SqliteSource(path, table="readings; DROP TABLE readings")
@@ -0,0 +1,44 @@
+from common import DocMeta, TEMPLATE_VERSION, build_report_payload
+from demo_data import load_latest_metrics
+from render_cache import RenderCache, cache_key
+
+def _payload(**meta):
+    return build_report_payload(load_latest_metrics("일반"), DocMeta(**meta))
+
+def test_key_ignores_generated_at():
+    a = _payload()
+    b = dict(a, generated_at="1999-01-01 00:00")
+    assert cache_key("kr_1p", a, TEMPLATE_VERSION) == cache_key("kr_1p", b, TEMPLATE_VERSION)
+
+def test_key_changes_with_content_variant_and_version():
+    a = _payload()
+    base = cache_key("kr_1p", a, TEMPLATE_VERSION)
+    assert cache_key("kr_1p", _payload(rev="v9.9"), TEMPLATE_VERSION) != base
+    assert cache_key("en_1p", a, TEMPLATE_VERSION) != base
+    assert cache_key("kr_1p", a, TEMPLATE_VERSION + "x") != base
+
+def test_memory_lru_budget():
+    c = RenderCache(max_bytes=10)
+    c.put("a", b"12345")
+    c.put("b", b"12345")
+    assert c.get("a") == b"12345"    # a 가 최근 사용
+    c.put("c", b"12345")             # b 가 밀려남
+    assert c.get("b") is None
+    assert c.get("a") is not None and c.get("c") is not None
+    assert c.stats()["evictions"] == 1
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    RenderCache(disk_dir=str(tmp_path)).put("k", b"%PDF-data")
+    c = RenderCache(disk_dir=str(tmp_path))
+    assert c.get("k") == b"%PDF-data"
+    assert c.stats()["disk_hits"] == 1
+
+def test_get_or_render_renders_once():
+    c = RenderCache()
+    calls = []
+    def render():
+        calls.append(1)
+        return b"pdf"
+    assert c.get_or_render("k", render) == b"pdf"
+    assert c.get_or_render("k", render) == b"pdf"
+    assert len(calls) == 1
@@ -0,0 +1,114 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+import render_server
+from demo_data import load_latest_metrics
+from render_cache import RenderCache
+from render_server import RenderService, ServiceBusy, _etag_match, serve
+
+@pytest.fixture
+def gate(monkeypatch):
+    """렌더 대신 gate 가 열릴 때까지 기다렸다가 가짜 PDF 를 돌려준다(조판 없이 대기열만 시험)."""
+    ev = threading.Event()
+    calls = []
+    def fake(variant, payload):
+        calls.append(variant)
+        ev.wait(10)
+        return b"%PDF-fake " + payload["meta"]["rev"].encode()
+    monkeypatch.setattr(render_server, "render_uncached", fake)
+    ev.calls = calls
+    return ev
+
+@pytest.fixture
+def server(gate):
+    svc = RenderService(workers=1, queue_size=0, timeout=10, processes=False, cache=RenderCache())
+    srv = serve(svc, port=0, quiet=True)
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield svc, srv.server_address[1]
+    srv.shutdown()
+    srv.server_close()
+    svc.close()
+
+def _post(port, variant="kr_1p", rev="v1.0", headers=None, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    if body is None:
+        body = json.dumps({"metrics": load_latest_metrics("일반"), "meta": {"rev": rev}})
+    conn.request("POST", f"/render/{variant}", body=body.encode("utf-8"), headers=headers or {})
+    r = conn.getresponse()
+    out = r.status, dict(r.getheaders()), r.read()
+    conn.close()
+    return out
+
+def test_etag_and_not_modified(server, gate):
+    svc, port = server
+    gate.set()
+    code, h, body = _post(port)
+    assert code == 200 and body == b"%PDF-fake v1.0" and h["X-Render-Source"] == "render"
+    etag = h["ETag"]
+    assert etag.startswith('W/"')
+    code, h, body = _post(port, headers={"If-None-Match": etag})
+    assert code == 304 and body == b"" and h["ETag"] == etag
+    code, h, _ = _post(port)
+    assert code == 200 and h["ETag"] == etag and h["X-Render-Source"] == "cache"
+    code, h, _ = _post(port, rev="v1.1", headers={"If-None-Match": etag})
+    assert code == 200 and h["ETag"] != etag
+    assert gate.calls == ["kr_1p", "kr_1p"]
+    assert svc.stats()["not_modified"] == 1
+
+def test_queue_full_returns_503_and_same_key_is_shared(server, gate):
+    svc, port = server
+    results = {}
+    first = threading.Thread(target=lambda: results.setdefault("a", _post(port)))
+    first.start()
+    for _ in range(100):                       # 첫 렌더가 워커 자리를 잡을 때까지
+        if gate.calls:
+            break
+        threading.Event().wait(0.02)
+    code, h, _ = _post(port, rev="v9.9")
+    assert code == 503 and int(h["Retry-After"]) >= 1
+    shared = threading.Thread(target=lambda: results.setdefault("b", _post(port)))
+    shared.start()
+    for _ in range(100):
+        if svc.stats()["shared"]:
+            break
+        threading.Event().wait(0.02)
+    gate.set()
+    first.join(10)
+    shared.join(10)
+    assert results["a"][0] == results["b"][0] == 200
+    assert results["b"][1]["X-Render-Source"] == "shared"
+    assert gate.calls == ["kr_1p"]
+    assert svc.stats()["rejected"] == 1
+
+def test_bad_requests(server, gate):
+    _, port = server
+    assert _post(port, variant="nope")[0] == 404
+    assert _post(port, body="{not json")[0] == 400
+    assert _post(port, body='{"metrics": []}')[0] == 400
+    assert gate.calls == []
+
+def test_service_busy_without_http(gate):
+    svc = RenderService(workers=1, queue_size=0, timeout=10, processes=False, cache=RenderCache())
+    payload = {"meta": {"rev": "a"}}
+    t = threading.Thread(target=svc.render, args=("kr_1p", payload))
+    t.start()
+    while not gate.calls:
+        threading.Event().wait(0.01)
+    with pytest.raises(ServiceBusy):
+        svc.render("kr_1p", {"meta": {"rev": "b"}})
+    gate.set()
+    t.join(10)
+    assert svc.render("kr_1p", payload) == (b"%PDF-fake a", "cache")
+    svc.close()
+
+def test_etag_match_weak_comparison():
+    assert _etag_match('W/"k"', 'W/"k"')
+    assert _etag_match('"k"', 'W/"k"')
+    assert _etag_match('"x", W/"k"', 'W/"k"')
+    assert _etag_match("*", 'W/"k"')
+    assert not _etag_match('"x"', 'W/"k"')
+    assert not _etag_match(None, 'W/"k"')
@@ -0,0 +1,44 @@
+import numpy as np
+
+from ringbuf import BucketRing
+
+def test_values_expire_after_window():
+    r = BucketRing(window_sec=60, bucket_sec=10)
+    r.add(0.0, 1.0)
+    r.add(25.0, 2.0)
+    assert r.window_total(59.0) == 3.0
+    assert r.window_total(60.0) == 2.0     # 0~10 버킷이 밀려남
+    assert r.window_total(85.0) == 0.0     # 20~30 버킷도 밀려남
+
+def test_gap_longer_than_window_clears_everything():
+    r = BucketRing(window_sec=60, bucket_sec=10, shape=2)
+    r.add(5.0, [1.0, 2.0])
+    r.add(1000.0, [0.5, 0.0])
+    assert r.window_total().tolist() == [0.5, 0.0]
+    assert r.buckets.sum() == 0.5          # 이전 값은 버킷에도 남지 않음
+
+def test_add_many_matches_add_and_drops_stale_rows():
+    ts = np.array([0.0, 5.0, 15.0, 70.0, 95.0])
+    v = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+    a = BucketRing(window_sec=60, bucket_sec=10)
+    for t, x in zip(ts, v):
+        a.add(t, x)
+    b = BucketRing(window_sec=60, bucket_sec=10)
+    b.add_many(ts, v)
+    assert a.window_total() == b.window_total() == 9.0   # 95 기준 40 이상만: 70, 95
+    a.add(10.0, 100.0)                                   # 윈도우보다 오래된 값은 버림
+    assert a.window_total() == 9.0
+
+def test_add_many_into_one_index_and_grow():
+    r = BucketRing(window_sec=60, bucket_sec=10, shape=2)
+    r.add_many([0.0, 1.0], [1.0, 1.0], index=1)
+    r.grow(3)
+    r.add_many([2.0], [4.0], index=2)
+    assert r.window_total().tolist() == [0.0, 2.0, 4.0]
+    assert r.window_total(100.0).tolist() == [0.0, 0.0, 0.0]
+
+def test_total_stays_exact_over_many_laps():
+    r = BucketRing(window_sec=60, bucket_sec=10)
+    for t in np.arange(0.0, 10_000.0, 1.0):
+        r.add(t, 0.1)
+    assert abs(r.window_total() - r.buckets.sum()) < 1e-9
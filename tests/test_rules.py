@@ -0,0 +1,79 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from demo_data import DEMO_SCENARIOS, load_latest_metrics
+from rules import RULES_PATH, CompiledRules, RuleEngine, fill_rules
+
+EXPECTED_ACTIONS = {
+    "일반": [("P2", "일일 점검 수행"), ("P3", "운영 기록 정리")],
+    "산소량 급락": [("P1", "산소 공급 단계 상향"), ("P2", "pH 안정화 점검"),
+                ("P2", "급변 구간 센서/설비 점검"), ("P2", "노출 구역 운영 조건 점검")],
+    "물 흐름 저하": [("P1", "펌프/밸브 점검 및 유량 복구")],
+    "여과 부담 증가": [("P1", "여과 단계 강화/역세척 점검"), ("P2", "배관/필터 점검")],
+}
+
+@pytest.fixture(scope="module")
+def engine():
+    return RuleEngine(RULES_PATH)
+
+@pytest.mark.parametrize("scenario", DEMO_SCENARIOS)
+def test_scenario_actions(engine, scenario):
+    m = fill_rules(load_latest_metrics(scenario), engine)
+    assert [(p, a) for p, a, _ in m["actions"]] == EXPECTED_ACTIONS[scenario]
+    assert 0 < len(m["evidence"]) <= 6
+
+@pytest.mark.parametrize("scenario", DEMO_SCENARIOS)
+def test_one_rule_per_zone_and_field(engine, scenario):
+    rules = engine.current()
+    m = fill_rules(load_latest_metrics(scenario), engine)
+    idx = {rid: i for i, rid in enumerate(rules.rule_ids)}
+    for ids in m["zone_rules"].values():
+        cols = [int(rules.col[idx[r]]) for r in ids]
+        assert len(cols) == len(set(cols))
+
+def test_evidence_uses_reference_band_or_inner_threshold(engine):
+    m = fill_rules(load_latest_metrics("산소량 급락"), engine)
+    assert any("(기준 6.0~10.0)" in e for e in m["evidence"])     # 기준 범위 밖
+    assert any("(기준 7.70 이상)" in e for e in m["evidence"])    # 범위 안쪽 주의 임계값
+
+def _spec(rules, fields=None):
+    return {"version": "t", "fields": fields or {}, "rules": rules,
+            "default_actions": [["P3", "기본", "계획"]]}
+
+def test_same_field_keeps_highest_priority_and_unless():
+    r = CompiledRules(_spec([
+        {"id": "hi1", "field": "u", "above": 0.9, "severity": "P1", "action": "a1"},
+        {"id": "hi2", "field": "u", "above": 0.8, "severity": "P2", "action": "a2"},
+        {"id": "low", "field": "v", "below": 1.0, "severity": "P1", "action": "b"},
+        {"id": "dep", "field": "w", "above": 0.0, "severity": "P2", "action": "c", "unless": ["low"]},
+    ]))
+    x = np.array([[0.95, 2.0, 1.0], [0.85, 0.5, 1.0], [np.nan, np.nan, 1.0]])
+    assert r.fire(x).tolist() == [[True, False, False, True],
+                                  [False, True, True, False],
+                                  [False, False, False, True]]
+    with pytest.raises(ValueError):
+        CompiledRules(_spec([{"id": "x", "field": "u", "above": 1, "severity": "P1", "action": "a", "unless": ["nope"]}]))
+
+def test_rejects_band_and_bad_severity():
+    with pytest.raises(ValueError):
+        CompiledRules(_spec([], fields={"do": {"band": [1, 2]}}))
+    with pytest.raises(ValueError):
+        CompiledRules(_spec([{"id": "x", "field": "u", "above": 1, "severity": "P9", "action": "a"}]))
+
+def test_hot_reload_keeps_previous_table_on_error(tmp_path):
+    with open(RULES_PATH, encoding="utf-8") as f:
+        spec = json.load(f)
+    p = tmp_path / "rules.json"
+    p.write_text(json.dumps(spec, ensure_ascii=False), encoding="utf-8")
+    eng = RuleEngine(str(p), check_sec=0.0)
+    first = eng.current()
+    p.write_text("{broken", encoding="utf-8")
+    os.utime(p, (first.mtime + 5, first.mtime + 5))
+    assert eng.current() is first and eng.last_error
+    spec["version"] = "next"
+    p.write_text(json.dumps(spec, ensure_ascii=False), encoding="utf-8")
+    os.utime(p, (first.mtime + 10, first.mtime + 10))
+    assert eng.current().version == "next" and eng.reloads == 1
@@ -0,0 +1,42 @@
+import numpy as np
+
+from shock_detector import ShockDetector
+from tsstore import TimeSeriesStore
+
+def _series(n, spike_at=(), seed=0):
+    rng = np.random.default_rng(seed)
+    x = 7.0 + rng.normal(0.0, 0.05, size=(n, 4))
+    for i in spike_at:
+        x[i:i + 3, 0] += 3.0       # 3 샘플 이어지는 급변 1회
+    return x
+
+def test_spike_counts_once_and_expires_after_24h():
+    sd = ShockDetector(["A"], warmup=30)
+    x = _series(300, spike_at=[200])
+    fired = sd.update_batch(np.arange(300.0) * 60, x[:, None, :])
+    assert fired.tolist() == [1]
+    assert sd.counts_24h(300 * 60).tolist() == [1]
+    assert sd.counts_24h(200 * 60 + 24 * 3600 + 120).tolist() == [0]
+
+def test_update_zone_matches_update_batch():
+    x = _series(400, spike_at=[150, 300], seed=1)
+    ts = np.arange(400.0) * 60
+    a = ShockDetector(["A", "B"], warmup=30)
+    b = ShockDetector(["A", "B"], warmup=30)
+    a.update_batch(ts, np.stack([x, np.full_like(x, np.nan)], axis=1))
+    assert b.update_zone("A", ts, x) == 2
+    assert np.allclose(a.mean, b.mean, equal_nan=True) and np.allclose(a.var, b.var)
+    assert a.counts_24h(ts[-1]).tolist() == b.counts_24h(ts[-1]).tolist() == [2, 0]
+
+def test_ingest_store_reads_late_committed_rows_once(tmp_path):
+    w = TimeSeriesStore(str(tmp_path), writable=True)
+    w.create_zone("A", ["do", "temp", "ph", "sal"])
+    t0 = 1_000_000.0
+    w.append("A", t0 + np.arange(60.0), {"do": np.full(60, 7.0)})
+    sd = ShockDetector(["A"], warmup=5)
+    assert sd.ingest_store(w, t0 + 100) == 60
+    # 이전 until 보다 이른 시각이지만 나중에 커밋된 행
+    w.append("A", t0 + 59 + np.arange(3.0), {"do": np.full(3, 7.0)})
+    assert sd.ingest_store(w, t0 + 200) == 3
+    assert sd.ingest_store(w, t0 + 300) == 0
+    w.close()
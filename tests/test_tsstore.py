@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import pytest
+
+from tsstore import StoreCursor, TimeSeriesStore
+
+CH = ["do", "temp"]
+
+@pytest.fixture
+def store(tmp_path):
+    s = TimeSeriesStore(str(tmp_path), writable=True)
+    s.create_zone("A", CH)
+    yield s
+    s.close()
+
+def test_append_and_half_open_range(store):
+    assert store.append("A", np.arange(10.0), {"do": np.arange(10.0) + 100}) == 10
+    ts, cols = store.read_range("A", 2.0, 5.0)
+    assert ts.tolist() == [2.0, 3.0, 4.0]            # [t0, t1): 5.0 제외
+    assert cols["do"].tolist() == [102.0, 103.0, 104.0]
+    assert np.isnan(cols["temp"]).all()              # 누락 채널은 NaN
+    assert store.read_range("A", 9.0)[0].tolist() == [9.0]
+    assert store.read_range("A", 10.0)[0].size == 0
+
+def test_rejects_out_of_order(store):
+    store.append("A", [1.0, 2.0], {})
+    with pytest.raises(ValueError):
+        store.append("A", [1.5], {})
+    with pytest.raises(ValueError):
+        store.append("A", [3.0, 2.5], {})
+    store.append("A", [2.0], {})                    # 같은 시각은 허용
+    assert store.committed("A") == 3
+
+def test_reader_sees_committed_rows_only(store, tmp_path):
+    store.append("A", [1.0, 2.0], {"do": [7.0, 8.0]})
+    # 커밋 없이 꼬리만 기록된 상태(쓰는 중/비정상 종료)
+    for ch in ["ts"] + CH:
+        with open(os.path.join(str(tmp_path), "A", f"{ch}.f8"), "ab") as f:
+            f.write(np.array([3.0]).tobytes())
+    r = TimeSeriesStore(str(tmp_path))
+    assert r.read_range("A")[0].tolist() == [1.0, 2.0]
+    assert r.latest("A")["do"] == 8.0
+
+def test_recover_truncates_uncommitted_tail(tmp_path):
+    w = TimeSeriesStore(str(tmp_path), writable=True)
+    w.create_zone("A", CH)
+    w.append("A", [1.0, 2.0], {"do": [7.0, 8.0]})
+    with open(os.path.join(str(tmp_path), "A", "do.f8"), "ab") as f:
+        f.write(np.array([9.0, 9.0]).tobytes())      # 열 하나만 앞서 나간 꼬리
+    w.close()
+    w = TimeSeriesStore(str(tmp_path), writable=True)
+    assert os.path.getsize(os.path.join(str(tmp_path), "A", "do.f8")) == 2 * 8
+    w.append("A", [3.0], {"do": [9.5]})
+    ts, cols = w.read_range("A")
+    assert ts.tolist() == [1.0, 2.0, 3.0]
+    assert cols["do"].tolist() == [7.0, 8.0, 9.5]
+    w.close()
+
+def test_single_writer(store, tmp_path):
+    with pytest.raises(RuntimeError):
+        TimeSeriesStore(str(tmp_path), writable=True)
+
+def test_cursor_reads_each_row_once_including_late_commits(store):
+    store.append("A", np.arange(0.0, 60.0), {"do": np.ones(60)})
+    cur = StoreCursor()
+    ts, x = cur.read_new(store, "A", ["do", "ph"], start=10.0)
+    assert ts[0] == 10.0 and ts.size == 50
+    assert x.shape == (50, 2) and np.isnan(x[:, 1]).all()   # 저장소에 없는 채널은 NaN
+    # 이전 조회 뒤에 커밋됐지만 센서 시각은 같은 행 → 시각 커서라면 놓친다
+    store.append("A", [59.0, 59.0], {"do": [2.0, 3.0]})
+    ts, x = cur.read_new(store, "A", ["do"], start=10.0)
+    assert ts.tolist() == [59.0, 59.0] and x[:, 0].tolist() == [2.0, 3.0]
+    assert cur.read_new(store, "A", ["do"], start=10.0)[0].size == 0
+
+def test_cursor_lookback(store):
+    store.append("A", np.arange(0.0, 20.0), {})
+    ts, _ = StoreCursor().read_new(store, "A", CH, start=10.0, lookback=3)
+    assert ts[0] == 7.0
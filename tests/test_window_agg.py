@@ -0,0 +1,42 @@
+import numpy as np
+
+from tsstore import TimeSeriesStore
+from window_agg import WindowedAggregator
+
+OK = [7.0, 17.0, 7.9, 31.0]     # 모든 채널이 기준 범위 안
+LOW_DO = [5.0, 17.0, 7.9, 31.0]
+
+def test_exposure_and_util_are_time_weighted():
+    agg = WindowedAggregator(["A", "B"], window_sec=3600, bucket_sec=60)
+    ts = np.arange(0.0, 600.0, 60.0)                          # 10 샘플
+    x = np.array([[OK, OK]] * 10)
+    x[:3, 0] = LOW_DO                                          # A 는 30% 구간 기준 밖
+    util = np.column_stack([np.full(10, 0.5), np.full(10, np.nan)])
+    agg.backfill(ts, x, util=util, dt=60.0)
+    assert np.allclose(agg.exposure(), [0.3, 0.0])
+    assert np.allclose(agg.utilization(), [0.5, 0.0])
+    m = {"zones": {"id": ["A", "B"], "util": [0.1, 0.2]}}
+    agg.fill_metrics(m, 600.0)
+    assert m["zones"]["util"][1] == 0.2                        # 사용률 측정이 없는 구역은 기존값 유지
+
+def test_window_expiry():
+    agg = WindowedAggregator(["A"], window_sec=3600, bucket_sec=60)
+    agg.update(0.0, [LOW_DO])
+    agg.update(3000.0, [OK])
+    assert np.allclose(agg.exposure(), [0.5])
+    assert np.allclose(agg.exposure(3700.0), [0.0])
+
+def test_ingest_store_reads_late_committed_rows_once(tmp_path):
+    w = TimeSeriesStore(str(tmp_path), writable=True)
+    w.create_zone("A", ["do", "temp", "ph", "sal"])
+    t0 = 1_000_000.0
+    w.append("A", t0 + np.arange(60.0), {"do": np.full(60, 5.0)})
+    agg = WindowedAggregator(["A", "missing"])
+    assert agg.ingest_store(w, t0 + 100) == 60
+    # 앞선 조회의 until 보다 이른 시각이지만 나중에 커밋된 행
+    w.append("A", t0 + 60 + np.arange(30.0), {"do": np.full(30, 5.0)})
+    assert agg.ingest_store(w, t0 + 200) == 30
+    assert agg.ingest_store(w, t0 + 300) == 0
+    assert agg.observed.window_total(t0 + 300).tolist() == [90.0, 0.0]
+    assert np.allclose(agg.exposure(t0 + 300), [1.0, 0.0])
+    w.close()
@@ -0,0 +1,268 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import json
+import os
+import re
+import threading
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:   # Windows: 잠금 파일(O_EXCL) 방식으로 대체
+    fcntl = None
+
+_DTYPE = np.dtype("<f8")
+_COMMIT = "commit"
+_META = "meta.json"
+
+def _zone_dir(name: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "zone"
+
+class TimeSeriesStore:
+    """
+    Seed-M1 센서 이력 저장소(구역별 컬럼형, append-only, memory-mapped).
+
+    디렉터리 구조:
+        root/<zone>/meta.json   구역명/채널 목록
+        root/<zone>/ts.f8       시각(epoch 초, 오름차순)
+        root/<zone>/<ch>.f8     채널 값(ts 와 같은 행 순서)
+        root/<zone>/commit      확정된 행 수(이 값까지만 읽기 허용)
+
+    동시 접근:
+    - 쓰기: 프로세스 1개(root/.writer.lock 배타 잠금). 데이터를 먼저 쓰고 commit 을 원자적으로 교체
+    - 읽기: 여러 프로세스 가능. commit 까지만 memmap → 쓰는 중인 행은 보이지 않음
+    - 구간 조회는 memmap 슬라이스(복사 없음)
+    """
+
+    def __init__(self, root: str, writable: bool = False, fsync: bool = False):
+        self.root = root
+        self.writable = writable
+        self.fsync = fsync
+        self._maps: Dict[Tuple[str, str], Tuple[int, np.ndarray]] = {}
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._lock_fd: Optional[int] = None
+        os.makedirs(root, exist_ok=True)
+        if writable:
+            self._acquire_writer()
+            for z in self.zones():
+                self._recover(z)
+
+    # -----------------------------
+    # 쓰기 잠금
+    # -----------------------------
+    def _acquire_writer(self) -> None:
+        path = os.path.join(self.root, ".writer.lock")
+        if fcntl is not None:
+            fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                raise RuntimeError(f"another writer holds {path}")
+        else:
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_RDWR, 0o644)
+            except FileExistsError:
+                raise RuntimeError(f"another writer holds {path}")
+        self._lock_fd = fd
+
+    def close(self) -> None:
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+            if fcntl is None:
+                try:
+                    os.remove(os.path.join(self.root, ".writer.lock"))
+                except OSError:
+                    pass
+        self._maps.clear()
+
+    def __enter__(self) -> "TimeSeriesStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -----------------------------
+    # 메타/커밋
+    # -----------------------------
+    def _path(self, zone: str, name: str) -> str:
+        return os.path.join(self.root, _zone_dir(zone), name)
+
+    def zones(self) -> List[str]:
+        out = []
+        for d in sorted(os.listdir(self.root)):
+            p = os.path.join(self.root, d, _META)
+            if os.path.exists(p):
+                with open(p, encoding="utf-8") as f:
+                    out.append(json.load(f)["name"])
+        return out
+
+    def channels(self, zone: str) -> List[str]:
+        meta = self._meta.get(zone)
+        if meta is None:
+            with open(self._path(zone, _META), encoding="utf-8") as f:
+                meta = self._meta[zone] = json.load(f)
+        return list(meta["channels"])
+
+    def committed(self, zone: str) -> int:
+        try:
+            with open(self._path(zone, _COMMIT), "rb") as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _write_commit(self, zone: str, n: int) -> None:
+        p = self._path(zone, _COMMIT)
+        tmp = p + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(str(int(n)).encode("ascii"))
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, p)
+
+    def _recover(self, zone: str) -> None:
+        # 비정상 종료로 commit 이후에 남은 꼬리 데이터를 잘라낸다
+        n = self.committed(zone)
+        for ch in ["ts"] + self.channels(zone):
+            p = self._path(zone, f"{ch}.f8")
+            if os.path.exists(p) and os.path.getsize(p) > n * _DTYPE.itemsize:
+                os.truncate(p, n * _DTYPE.itemsize)
+
+    # -----------------------------
+    # 쓰기
+    # -----------------------------
+    def create_zone(self, zone: str, channels: Sequence[str]) -> None:
+        if not self.writable:
+            raise RuntimeError("store opened read-only")
+        d = os.path.join(self.root, _zone_dir(zone))
+        os.makedirs(d, exist_ok=True)
+        meta_path = os.path.join(d, _META)
+        if os.path.exists(meta_path):
+            if self.channels(zone) != list(channels):
+                raise ValueError(f"zone {zone!r} already exists with channels {self.channels(zone)}")
+            return
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(dict(name=zone, channels=list(channels), dtype=_DTYPE.str), f, ensure_ascii=False)
+        os.replace(meta_path + ".tmp", meta_path)
+        self._write_commit(zone, 0)
+
+    def append(self, zone: str, ts: Any, values: Dict[str, Any]) -> int:
+        """
+        행 추가(마이크로 배치 단위 권장). 반환: 확정된 전체 행 수.
+        - ts: (T,) 오름차순, 기존 마지막 시각 이상
+        - values: {채널: (T,)} — 누락 채널은 NaN
+        """
+        if not self.writable:
+            raise RuntimeError("store opened read-only")
+        ts = np.ascontiguousarray(ts, dtype=_DTYPE)
+        if ts.size == 0:
+            return self.committed(zone)
+        if np.any(np.diff(ts) < 0):
+            raise ValueError("timestamps must be non-decreasing")
+        n = self.committed(zone)
+        if n:
+            last = self.read_range(zone)[0][-1]
+            if ts[0] < last:
+                raise ValueError(f"timestamp {ts[0]} precedes last stored {last}")
+        cols = [("ts", ts)]
+        for ch in self.channels(zone):
+            v = values.get(ch)
+            v = np.full(ts.shape, np.nan, dtype=_DTYPE) if v is None else np.ascontiguousarray(v, dtype=_DTYPE)
+            if v.shape != ts.shape:
+                raise ValueError(f"channel {ch!r} has shape {v.shape}, expected {ts.shape}")
+            cols.append((ch, v))
+        try:
+            for ch, arr in cols:
+                with open(self._path(zone, f"{ch}.f8"), "ab") as f:
+                    f.write(arr.tobytes())
+                    if self.fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+            self._write_commit(zone, n + ts.size)
+        except BaseException:
+            # 일부 열만 기록된 채 실패(디스크 가득 등) → 확정 크기로 되돌려 다음 append 의 열 길이를 맞춘다
+            self._recover(zone)
+            raise
+        return n + ts.size
+
+    # -----------------------------
+    # 읽기
+    # -----------------------------
+    def _column(self, zone: str, ch: str, n: int) -> np.ndarray:
+        key = (zone, ch)
+        with self._lock:
+            cached = self._maps.get(key)
+            if cached is not None and cached[0] >= n:
+                return cached[1][:n]
+            if n == 0:
+                return np.empty(0, dtype=_DTYPE)
+            mm = np.memmap(self._path(zone, f"{ch}.f8"), dtype=_DTYPE, mode="r", shape=(n,))
+            self._maps[key] = (n, mm)
+            return mm
+
+    def read_range(self, zone: str, t0: Optional[float] = None, t1: Optional[float] = None,
+                   channels: Optional[Sequence[str]] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        [t0, t1) 구간 조회. 반환: (ts, {채널: 값}) — 모두 memmap 슬라이스(복사 없음).
+        """
+        n = self.committed(zone)
+        ts = self._column(zone, "ts", n)
+        i0 = 0 if t0 is None else int(np.searchsorted(ts, t0, side="left"))
+        i1 = n if t1 is None else int(np.searchsorted(ts, t1, side="left"))
+        return self._slice(zone, n, i0, i1, channels)
+
+    def read_rows(self, zone: str, i0: int, i1: Optional[int] = None,
+                  channels: Optional[Sequence[str]] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """행 번호 [i0, i1) 조회(i1 기본: 확정된 행 수). 반환 형식은 read_range 와 같음."""
+        n = self.committed(zone)
+        i1 = n if i1 is None else min(int(i1), n)
+        return self._slice(zone, n, min(int(i0), i1), i1, channels)
+
+    def row_at(self, zone: str, t: float) -> int:
+        """시각 t 이상인 첫 행 번호(없으면 확정된 행 수)."""
+        n = self.committed(zone)
+        return int(np.searchsorted(self._column(zone, "ts", n), t, side="left"))
+
+    def _slice(self, zone: str, n: int, i0: int, i1: int,
+               channels: Optional[Sequence[str]]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        chs = self.channels(zone) if channels is None else list(channels)
+        return self._column(zone, "ts", n)[i0:i1], {ch: self._column(zone, ch, n)[i0:i1] for ch in chs}
+
+    def latest(self, zone: str) -> Dict[str, float]:
+        """구역 최신 행(없으면 빈 dict)."""
+        n = self.committed(zone)
+        if n == 0:
+            return {}
+        out = {"ts": float(self._column(zone, "ts", n)[n - 1])}
+        for ch in self.channels(zone):
+            out[ch] = float(self._column(zone, ch, n)[n - 1])
+        return out
+
+# -----------------------------
+# 증분 읽기 커서(윈도우 집계/변화 감지 공용)
+# -----------------------------
+class StoreCursor:
+    """
+    구역별 "여기까지 반영함" 행 번호.
+    - 저장소는 추가 전용이라 확정된 행 수로 이어 읽으면, 벽시계보다 늦게 커밋됐거나
+      센서 시각이 앞선 행도 빠짐없이 한 번씩 읽힌다(시각 커서는 [t0, t1) 경계 뒤에 들어온 행을 놓침)
+    - 처음 읽는 구역은 start 시각부터(lookback 행만큼 더 앞에서) 시작
+    """
+
+    def __init__(self):
+        self.rows: Dict[str, int] = {}
+
+    def read_new(self, store: TimeSeriesStore, zone: str, channels: Sequence[str], start: float,
+                 lookback: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """새 행 → (ts (T,), 값 (T, C)). 저장소에 없는 채널은 NaN."""
+        i0 = self.rows.get(zone)
+        if i0 is None:
+            i0 = max(0, store.row_at(zone, start) - max(0, int(lookback)))
+        have = set(store.channels(zone))
+        ts, cols = store.read_rows(zone, i0, channels=[c for c in channels if c in have])
+        self.rows[zone] = i0 + int(ts.size)
+        x = np.stack([np.asarray(cols[c]) if c in cols else np.full(ts.size, np.nan) for c in channels], axis=-1)
+        return ts, x.reshape(ts.size, len(channels))
@@ -1,35 +1,18 @@
 from __future__ import annotations
-from typing import Dict, Any
+from typing import Dict, Any, List
 from io import BytesIO
 
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.pagesizes import A4
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.cidfonts import UnicodeCIDFont
 
-_PDF_FONT = "HYSMyeongJo-Medium"
-try:
-    pdfmetrics.registerFont(UnicodeCIDFont(_PDF_FONT))
-except Exception:
-    pass
-
-def make_whitepaper_12p(payload: Dict[str, Any]) -> bytes:
-    buf = BytesIO()
-    doc = SimpleDocTemplate(buf, pagesize=A4, leftMargin=36, rightMargin=36, topMargin=40, bottomMargin=36)
-    styles = getSampleStyleSheet()
-    h1 = ParagraphStyle("h1", parent=styles["Heading1"], fontName=_PDF_FONT, fontSize=18, leading=22)
-    h2 = ParagraphStyle("h2", parent=styles["Heading2"], fontName=_PDF_FONT, fontSize=13, leading=17)
-    body = ParagraphStyle("body", parent=styles["BodyText"], fontName=_PDF_FONT, fontSize=10.8, leading=15)
-
-    meta = payload.get("meta", {})
-    elements = []
-    elements.append(Paragraph("Bio-OS Global Standard Whitepaper", h1))
-    elements.append(Spacer(1, 10))
-    elements.append(Paragraph(f"Facility: {meta.get('facility_name','-')} · Version: {meta.get('system_version','-')}", body))
-    elements.append(Paragraph(f"Generated at: {payload.get('generated_at','-')}", body))
-    elements.append(PageBreak())
+from common import TEMPLATE_VERSION
+from pdf_resources import paragraph_styles
+from spans import span
+from templates import merge_static, static_body, template_mode_enabled
 
+def _sections(st) -> List[Any]:
+    # 본문 1~12: 고정 문구
+    h2, body = st["h2"], st["body"]
     sections = [
         ("1. Executive Vision", "Bio-OS는 ‘최소비용-최고효율’ 운영을 데이터로 증명하는 운영 표준 체계다."),
         ("2. Problem Definition", "양식 운영 리스크는 ‘감지 지연’과 ‘과잉투자’가 동시에 발생한다."),
@@ -44,11 +27,36 @@ def make_whitepaper_12p(payload: Dict[str, Any]) -> bytes:
         ("11. Deployment Model", "클라우드 콘솔 + 현장 센서/DB 연동으로 단계적 확장이 가능하다."),
         ("12. Future Expansion", "다종 생물/다산업으로 확장 가능한 Bio-OS 아키텍처."),
     ]
+    elements: List[Any] = []
     for title, desc in sections:
         elements.append(Paragraph(title, h2))
         elements.append(Spacer(1, 8))
         elements.append(Paragraph(desc, body))
         elements.append(PageBreak())
+    return elements
 
-    doc.build(elements)
+def make_whitepaper_12p(payload: Dict[str, Any]) -> bytes:
+    buf = BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=A4, leftMargin=36, rightMargin=36, topMargin=40, bottomMargin=36)
+    st = paragraph_styles("whitepaper")
+    h1, body = st["h1"], st["body"]
+
+    meta = payload.get("meta", {})
+    elements = []
+    elements.append(Paragraph("Bio-OS Global Standard Whitepaper", h1))
+    elements.append(Spacer(1, 10))
+    elements.append(Paragraph(f"Facility: {meta.get('facility_name','-')} · Version: {meta.get('system_version','-')}", body))
+    elements.append(Paragraph(f"Generated at: {payload.get('generated_at','-')}", body))
+
+    if template_mode_enabled():
+        # 본문 12쪽은 정적 본문(1회 조판), 표지만 조판 후 합침
+        with span("pdf.layout.whitepaper"):
+            doc.build(elements)
+        static = static_body("whitepaper_sections", TEMPLATE_VERSION, lambda marks: _sections(st))
+        return merge_static(buf.getvalue(), doc.page, static)
+
+    elements.append(PageBreak())
+    elements += _sections(st)
+    with span("pdf.layout.whitepaper"):
+        doc.build(elements)
     return buf.getvalue()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+from typing import Any, Dict, Optional, Sequence
+import numpy as np
+
+from ringbuf import BucketRing
+from risk_engine import CHANNELS, REFERENCE_BANDS, risk_from_deviation, signed_deviation
+from tsstore import StoreCursor
+from zones import set_zone_field
+
+class WindowedAggregator:
+    """
+    위험 노출 시간(7일) / 설비 사용률 슬라이딩 윈도우 집계.
+    - 분 단위 버킷 링(기본 7일 = 10,080 버킷)에 구역별 시간 합계를 누적
+    - 조회(대시보드 새로고침/보고서 생성)는 유지 중인 윈도우 합계를 나누기만 하므로 O(1)
+    - backfill(): 과거 데이터를 한 번의 벡터 연산으로 버킷에 채움
+    - 최근 recent_sec(기본 1시간) 동안의 채널별 점수/편차 합계도 함께 유지 → 원인 분석(attribution.py)
+    """
+
+    def __init__(self, zones: Sequence[str], channels: Sequence[str] = CHANNELS,
+                 window_sec: float = 7 * 24 * 3600, bucket_sec: float = 60.0, recent_sec: float = 3600.0):
+        self.zones = list(zones)
+        self.channels = tuple(channels)
+        n = len(self.zones)
+        self._lo = np.array([REFERENCE_BANDS[c][0] for c in self.channels])
+        self._hi = np.array([REFERENCE_BANDS[c][1] for c in self.channels])
+        self.observed = BucketRing(window_sec, bucket_sec, shape=n)    # 측정된 시간(초)
+        self.outside = BucketRing(window_sec, bucket_sec, shape=n)     # 기준 범위 밖 시간(초)
+        self.util_time = BucketRing(window_sec, bucket_sec, shape=n)   # 사용률이 측정된 시간(초)
+        self.util_sum = BucketRing(window_sec, bucket_sec, shape=n)    # 사용률 × 시간
+        nc = (n, len(self.channels))
+        self.chan_time = BucketRing(recent_sec, bucket_sec, shape=nc)  # 채널별 측정 시간(초)
+        self.chan_risk = BucketRing(recent_sec, bucket_sec, shape=nc)  # 채널 점수 × 시간
+        self.chan_dev = BucketRing(recent_sec, bucket_sec, shape=nc)   # 부호 있는 편차 × 시간(방향)
+        self._cursor = StoreCursor()                                   # ingest_store: 구역별 반영 완료 행
+
+    def add_zones(self, zones: Sequence[str]) -> None:
+        """새 구역 추가(기존 구역의 누적값 유지, 새 구역은 0 에서 시작)."""
+        new = [z for z in zones if z not in self.zones]
+        if not new:
+            return
+        self.zones += new
+        for ring in (self.observed, self.outside, self.util_time, self.util_sum,
+                     self.chan_time, self.chan_risk, self.chan_dev):
+            ring.grow(len(self.zones))
+
+    def _outside_band(self, values: np.ndarray) -> np.ndarray:
+        # values: (..., N, C) → (..., N) 기준 범위를 벗어난 채널이 하나라도 있는지
+        out = (values < self._lo) | (values > self._hi)
+        return np.any(out & ~np.isnan(values), axis=-1)
+
+    def _channel_terms(self, values: np.ndarray):
+        # values: (..., C) → (측정 여부, 채널 점수, 부호 있는 편차), NaN 은 0
+        x = np.moveaxis(values, -1, 0)
+        sd = signed_deviation(x, self.channels)
+        ok = ~np.isnan(x)
+        r = risk_from_deviation(np.abs(sd))
+        return tuple(np.moveaxis(np.where(ok, a, 0.0), 0, -1) for a in (ok.astype(np.float64), r, sd))
+
+    def update(self, ts: float, values: Any, util: Optional[Any] = None, dt: float = 1.0) -> None:
+        """
+        한 시각 측정값 반영.
+        - values: (N, C) 수질 채널, util: (N,) 0~1 사용률(선택), dt: 샘플이 대표하는 시간(초)
+        """
+        x = np.asarray(values, dtype=np.float64)
+        seen = np.any(~np.isnan(x), axis=-1)
+        self.observed.add(ts, seen * dt)
+        self.outside.add(ts, self._outside_band(x) * dt)
+        for ring, term in zip((self.chan_time, self.chan_risk, self.chan_dev), self._channel_terms(x)):
+            ring.add(ts, term * dt)
+        if util is not None:
+            u = np.asarray(util, dtype=np.float64)
+            ok = ~np.isnan(u)
+            self.util_time.add(ts, ok * dt)
+            self.util_sum.add(ts, np.where(ok, u, 0.0) * dt)
+
+    def backfill(self, ts: Any, values: Any, util: Optional[Any] = None, dt: Optional[float] = None,
+                 zone: Optional[str] = None) -> None:
+        """
+        과거 데이터 일괄 반영(벡터화).
+        - ts: (T,), values: (T, N, C), util: (T, N)
+        - zone 지정 시 그 구역만: values (T, C), util (T,)
+        - dt 미지정 시 ts 간격의 중앙값 사용
+        """
+        ts = np.asarray(ts, dtype=np.float64)
+        if ts.size == 0:
+            return
+        if dt is None:
+            dt = float(np.median(np.diff(ts))) if ts.size > 1 else 1.0
+        idx = None if zone is None else self.zones.index(zone)
+        x = np.asarray(values, dtype=np.float64)
+        self.observed.add_many(ts, np.any(~np.isnan(x), axis=-1) * dt, index=idx)
+        self.outside.add_many(ts, self._outside_band(x) * dt, index=idx)
+        for ring, term in zip((self.chan_time, self.chan_risk, self.chan_dev), self._channel_terms(x)):
+            ring.add_many(ts, term * dt, index=idx)
+        if util is not None:
+            u = np.asarray(util, dtype=np.float64)
+            ok = ~np.isnan(u)
+            self.util_time.add_many(ts, ok * dt, index=idx)
+            self.util_sum.add_many(ts, np.where(ok, u, 0.0) * dt, index=idx)
+
+    def ingest_store(self, store: Any, until: float) -> int:
+        """
+        센서 이력 저장소(tsstore)의 새 행만 반영(구역별 마지막으로 읽은 행 다음부터, 확정된 행까지).
+        - 첫 호출은 until 기준 윈도우 길이만큼 백필, 이후에는 증분만 읽음
+        - 반환: 반영한 행 수
+        """
+        n = 0
+        start = until - self.observed.n_buckets * self.observed.bucket_sec
+        present = set(store.zones())
+        for zone in self.zones:
+            if zone not in present:
+                continue
+            ts, x = self._cursor.read_new(store, zone, self.channels, start)
+            if ts.size:
+                self.backfill(ts, x, zone=zone)
+                n += int(ts.size)
+        return n
+
+    @staticmethod
+    def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+        return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+    def exposure(self, now: Optional[float] = None) -> np.ndarray:
+        """구역별 위험 노출 비율(0~1) = 기준 범위 밖 시간 / 측정 시간."""
+        return self._ratio(self.outside.window_total(now), self.observed.window_total(now))
+
+    def utilization(self, now: Optional[float] = None) -> np.ndarray:
+        """구역별 평균 설비 사용률(0~1, 시간 가중)."""
+        return self._ratio(self.util_sum.window_total(now), self.util_time.window_total(now))
+
+    def channel_scores(self, now: Optional[float] = None) -> np.ndarray:
+        """(N, C) 최근 recent_sec 동안 채널별 평균 위험 점수(0~100, 시간 가중)."""
+        return self._ratio(self.chan_risk.window_total(now), self.chan_time.window_total(now))
+
+    def channel_direction(self, now: Optional[float] = None) -> np.ndarray:
+        """(N, C) 최근 평균 편차의 부호(-1: 기준 중앙보다 낮음, +1: 높음, 0: 데이터 없음)."""
+        return np.sign(self._ratio(self.chan_dev.window_total(now), self.chan_time.window_total(now)))
+
+    def fill_metrics(self, m: Dict[str, Any], now: float) -> Dict[str, Any]:
+        """load_latest_metrics 결과의 구역 지표에 exposure_7d / util 을 채운다."""
+        exp, util = self.exposure(now), self.utilization(now)
+        has_util = self.util_time.window_total(now) > 0
+        set_zone_field(m, self.zones, "exposure_7d", [float(v) for v in exp])
+        set_zone_field(m, self.zones, "util", [float(v) for v in util], mask=has_util)
+        return m
@@ -0,0 +1,97 @@
+from __future__ import annotations
+from typing import Dict, Any, List, Mapping, Optional, Sequence
+import numpy as np
+
+# -----------------------------
+# 구역(N개) 표 모델
+# -----------------------------
+# 구역 수가 2개(loop_a/loop_b)로 고정되지 않도록 구역 지표를 열(column) 단위 배열로 보관한다.
+#   {"name": [...], "label": [...], "risk": ndarray, "shock_24h": ndarray, "exposure_7d": ndarray, "util": ndarray}
+# 시설 전체 값(최대 위험, 기준 구역, 변화 합계, 노출/사용률 최대)은 배열 축약 1회로 계산한다.
+
+ZONE_FIELDS = ("risk", "shock_24h", "exposure_7d", "util")
+ZONE_LABELS_KR = {"loop_a": "A구역", "loop_b": "B구역"}
+
+# common.risk_label_kr 과 같은 경계
+_STATUS_EDGES = np.array([40.0, 60.0, 75.0])
+_STATUS_KR = np.array(["정상", "주의", "경계", "위험"])
+
+def zone_table(zones: Mapping[str, Mapping[str, Any]]) -> Dict[str, Any]:
+    """구역 이름 → 지표 dict 묶음을 열 배열 표로 변환(없는 지표는 NaN)."""
+    names = list(zones.keys())
+    out: Dict[str, Any] = {
+        "name": names,
+        "label": [str(zones[n].get("label") or ZONE_LABELS_KR.get(n, n)) for n in names],
+    }
+    for f in ZONE_FIELDS:
+        out[f] = np.array([zones[n].get(f, np.nan) for n in names], dtype=np.float64)
+    return out
+
+def _is_columnar(z: Mapping[str, Any]) -> bool:
+    return "name" in z and isinstance(z["name"], (list, tuple, np.ndarray))
+
+def zones_from_metrics(m: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    메트릭 dict 에서 구역 표를 꺼낸다.
+    - m["zones"]: 구역 이름 → dict, 또는 이미 열 배열 표({"name": [...], "risk": [...], ...})
+    - 이전 형식(m["loop_a"], m["loop_b"])도 허용
+    """
+    if "zones" in m:
+        z = m["zones"]
+        if _is_columnar(z):
+            names = [str(n) for n in z["name"]]
+            labels = z.get("label")
+            out: Dict[str, Any] = {
+                "name": names,
+                "label": [str(x) for x in labels] if labels is not None else [ZONE_LABELS_KR.get(n, n) for n in names],
+            }
+            for f in ZONE_FIELDS:
+                col = z.get(f)
+                out[f] = np.full(len(names), np.nan) if col is None else np.asarray(col, dtype=np.float64)
+        else:
+            out = zone_table(z)
+    else:
+        out = zone_table({k: m[k] for k in ("loop_a", "loop_b")})
+    if not out["name"]:
+        raise ValueError("metrics has no zones")
+    return out
+
+def zone_rollup(zt: Mapping[str, Any]) -> Dict[str, Any]:
+    """시설 전체 값: 최대 위험 점수와 그 구역, 24시간 변화 합계, 노출/사용률 최대값(NaN 무시)."""
+    risk = np.asarray(zt["risk"], dtype=np.float64)
+    i = int(np.nanargmax(risk)) if np.isfinite(risk).any() else 0
+    def nanmax(a: np.ndarray) -> float:
+        return float(np.nanmax(a)) if np.isfinite(a).any() else 0.0
+    return dict(
+        r_max=nanmax(risk),
+        culprit=zt["label"][i],
+        shock_24h=int(np.nansum(zt["shock_24h"])),
+        exposure_7d=nanmax(np.asarray(zt["exposure_7d"])),
+        util=nanmax(np.asarray(zt["util"])),
+    )
+
+def zone_status_kr(risk: np.ndarray) -> List[str]:
+    """구역별 상태 라벨(배열 한 번에)."""
+    return _STATUS_KR[np.digitize(np.nan_to_num(risk, nan=0.0), _STATUS_EDGES)].tolist()
+
+def set_zone_field(m: Dict[str, Any], names: Sequence[str], field: str, values: Sequence[Any],
+                   mask: Optional[Sequence[bool]] = None) -> None:
+    """
+    메트릭 dict 의 구역 지표를 구역 이름 기준으로 갱신(윈도우 집계/변화 감지 → load_latest_metrics 결과).
+    - m["zones"] 가 dict 묶음이든 열 배열 표든, 이전 형식(m["loop_a"] 등)이든 같은 방식으로 호출
+    - mask[i] 가 False 인 구역은 건너뜀, m 에 없는 구역도 건너뜀
+    """
+    z = m.get("zones")
+    if z is not None and _is_columnar(z):
+        pos = {str(n): i for i, n in enumerate(z["name"])}
+        col = z.get(field)
+        col = np.full(len(pos), np.nan) if col is None else np.array(col, dtype=np.float64)
+        for i, name in enumerate(names):
+            if name in pos and (mask is None or mask[i]):
+                col[pos[name]] = values[i]
+        z[field] = col
+        return
+    target = m if z is None else z
+    for i, name in enumerate(names):
+        if name in target and (mask is None or mask[i]):
+            target[name][field] = values[i]